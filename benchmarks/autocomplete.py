@@ -0,0 +1,87 @@
+"""
+Times ChoiceIndex against filtering the choices in Python on every autocomplete.
+
+The corpus is made of random multi-word names, some of them repeated or
+differing only by case, as in real choice lists. The queries are 1 to 8
+character slices of those names, plus an empty query and a few misses.
+
+    python benchmarks/autocomplete.py [--size 100000] [--queries 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from dismake import Choice, ChoiceIndex
+
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "zen", "dor", "bel", "an", "or", "ix", "qua", "mel")
+
+
+def corpus(size: int, rng: random.Random) -> List[str]:
+    def word() -> str:
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    names: List[str] = []
+    while len(names) < size:
+        if names and rng.random() < 0.02:
+            # Duplicates and names that only differ by case share a casefolded key.
+            name = rng.choice(names)
+            names.append(rng.choice((name, name.lower(), name.upper())))
+        else:
+            names.append(" ".join(word() for _ in range(rng.randint(1, 3))))
+    return names
+
+
+def queries(names: List[str], number: int, rng: random.Random) -> List[str]:
+    result = []
+    for _ in range(number):
+        name = rng.choice(names).casefold()
+        start = rng.randint(0, max(0, len(name) - 3))
+        result.append(name[start : start + rng.randint(1, 8)])
+    return result + ["", "zzzz", "xqy"]
+
+
+def naive(value: str, names: List[str]) -> List[Dict[str, Any]]:
+    """What an autocomplete callback filtering a static list does."""
+    value = value.casefold()
+    return [Choice(name=name).to_dict() for name in names if value in name.casefold()][:25]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--size", type=int, default=100000, help="number of choices")
+    parser.add_argument("--queries", type=int, default=2000, help="number of queries")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = corpus(args.size, rng)
+    values = queries(names, args.queries, rng)
+
+    start = time.perf_counter()
+    index = ChoiceIndex(names)
+    print(f"{len(names)} choices, index built in {time.perf_counter() - start:.2f}s")
+
+    timings = []
+    for value in values:
+        start = time.perf_counter()
+        index.search(value)
+        timings.append((time.perf_counter() - start) * 1e6)
+    percentiles = statistics.quantiles(timings, n=100)
+    print(
+        f"ChoiceIndex: {statistics.median(timings):.0f}us p50, {percentiles[98]:.0f}us p99 "
+        f"over {len(values)} queries"
+    )
+
+    sample = values[:200]
+    start = time.perf_counter()
+    for value in sample:
+        naive(value, names)
+    print(f"filtering in Python: {(time.perf_counter() - start) / len(sample) * 1e3:.1f}ms per query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Times the JSON codecs on interaction payloads and response bodies.
+
+Every installed codec decodes and encodes a slash command, a component
+and a modal submit interaction, and reports the best time per call.
+
+    python benchmarks/codec.py [--number 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from dismake.codec import JSONCodec, MsgspecCodec, OrjsonCodec, StdlibCodec
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "public_flags": 131141,
+}
+
+MEMBER = {
+    "user": USER,
+    "roles": ["539082325061763073", "539082325061763074"],
+    "premium_since": None,
+    "permissions": "2147483647",
+    "pending": False,
+    "nick": None,
+    "mute": False,
+    "joined_at": "2017-03-13T19:19:14.040000+00:00",
+    "is_pending": False,
+    "deaf": False,
+}
+
+BASE = {
+    "id": "786008729715212338",
+    "application_id": "775799577604522054",
+    "token": "A_UNIQUE_TOKEN" * 10,
+    "version": 1,
+    "guild_id": "290926798626357999",
+    "channel_id": "645027906669510667",
+    "member": MEMBER,
+    "locale": "en-US",
+    "guild_locale": "en-US",
+    "app_permissions": "442368",
+}
+
+BUTTONS = [
+    {
+        "type": 1,
+        "components": [
+            {"type": 2, "style": 1, "label": f"Button {row}{col}", "custom_id": f"btn:{row}:{col}"}
+            for col in range(5)
+        ],
+    }
+    for row in range(4)
+]
+
+PAYLOADS: Dict[str, Dict[str, Any]] = {
+    "slash": {
+        **BASE,
+        "type": 2,
+        "data": {
+            "id": "771825006014889984",
+            "name": "blep",
+            "type": 1,
+            "options": [
+                {"type": 3, "name": "animal", "value": "animal_dog"},
+                {"type": 6, "name": "owner", "value": USER["id"]},
+            ],
+            "resolved": {"users": {USER["id"]: USER}, "members": {USER["id"]: {**MEMBER, "user": None}}},
+        },
+    },
+    "component": {
+        **BASE,
+        "type": 3,
+        "data": {"custom_id": "btn:0:1", "component_type": 2},
+        "message": {
+            "id": "1041407470127108186",
+            "channel_id": BASE["channel_id"],
+            "author": USER,
+            "content": "Pick one " * 20,
+            "timestamp": "2022-11-13T14:08:49.181000+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+            "components": BUTTONS,
+        },
+    },
+    "modal": {
+        **BASE,
+        "type": 5,
+        "data": {
+            "custom_id": "feedback",
+            "components": [
+                {
+                    "type": 1,
+                    "components": [
+                        {"type": 4, "custom_id": f"field:{i}", "value": "Some feedback " * 15}
+                    ],
+                }
+                for i in range(5)
+            ],
+        },
+    },
+}
+
+
+def codecs() -> List[JSONCodec]:
+    installed: List[JSONCodec] = [StdlibCodec()]
+    for codec_cls in (OrjsonCodec, MsgspecCodec):
+        try:
+            installed.append(codec_cls())
+        except RuntimeError:
+            print(f"{codec_cls.name} is not installed, skipping it.")
+    return installed
+
+
+def best(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Returns the best time of a call in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing")
+    args = parser.parse_args()
+
+    installed = codecs()
+    print(f"{'payload':<10} {'size':>6}  " + "  ".join(f"{c.name + ' loads/dumps':>22}" for c in installed))
+    for name, payload in PAYLOADS.items():
+        raw = StdlibCodec().dumps(payload)
+        cells = []
+        for codec in installed:
+            loads = best(lambda: codec.loads(raw), args.number)
+            dumps = best(lambda: codec.dumps(payload), args.number)
+            cells.append(f"{loads:>9.1f}/{dumps:.1f}us")
+        print(f"{name:<10} {len(raw):>5}B  " + "  ".join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
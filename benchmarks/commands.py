@@ -0,0 +1,85 @@
+"""
+Times Command.invoke binding the options of an interaction to its callback.
+
+Commands with 0, 5 and 25 options, half of them with a default, are invoked
+with a no-op callback. The binder Command precomputes is compared with reading
+the callback signature on every call, which Command.invoke used to do.
+
+    python benchmarks/commands.py [--number 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import time
+from typing import Annotated, Any, Callable, Coroutine
+
+import dismake
+from dismake.models.interaction import ApplicationCommandOption, Namespace
+
+
+class FakeInteraction:
+    """The attributes Command.invoke reads, with the option values already parsed."""
+
+    def __init__(self, count: int) -> None:
+        options = [ApplicationCommandOption(name=f"o{i}", type=4, value=i) for i in range(count)]
+        self.namespace = Namespace(options)
+        self.data = None
+        self.bot = None
+
+
+def make_command(count: int) -> dismake.Command:
+    params = "".join(
+        f", o{i}: Annotated[int, Option()]" + (" = 0" if i >= count // 2 else "")
+        for i in range(count)
+    )
+    namespace = {"Annotated": Annotated, "Option": dismake.Option, "Interaction": dismake.Interaction}
+    exec(f"async def callback(interaction: Interaction{params}):\n    pass\n", namespace)
+    return dismake.Command(f"options{count}", "A command.", callback=namespace["callback"])
+
+
+async def signature_invoke(command: dismake.Command, interaction: Any) -> None:
+    """The binding Command.invoke used to do."""
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = {}
+    for name, param in inspect.signature(command.callback).parameters.items():
+        value = interaction.namespace.get(name)
+        if value is not None:
+            if param.default is not inspect.Parameter.empty:
+                kwargs[name] = value
+            else:
+                args += (value,)
+    await command.callback(interaction, *args, **kwargs)
+
+
+async def best(invoke: Callable[[], Coroutine[Any, Any, Any]], number: int, repeat: int = 5) -> float:
+    """Returns the best time of a call in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await invoke()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1e6
+
+
+async def run(number: int) -> None:
+    print(f"{'options':>7} {'signature':>12} {'binder':>10}")
+    for count in (0, 5, 25):
+        command = make_command(count)
+        interaction = FakeInteraction(count)
+        old = await best(lambda: signature_invoke(command, interaction), number)
+        new = await best(lambda: command.invoke(interaction), number)  # type: ignore
+        print(f"{count:>7} {old:>10.2f}us {new:>8.2f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing")
+    args = parser.parse_args()
+    asyncio.run(run(args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Times signed slash commands going through InteractionHandler.handle_interactions.
+
+Every request is verified, decoded once into an Interaction and routed to
+a command whose callback does nothing, so the time is the framework's own
+cost per request. It is compared with the steps of a request taken alone,
+and with decoding the body and building the Interaction twice, which the
+handler used to do.
+
+    python benchmarks/handler.py [--number 3000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Tuple
+
+from nacl.signing import SigningKey
+from starlette.requests import Request
+
+import dismake
+from dismake.codec import StdlibCodec
+from dismake.models import Interaction
+
+SIGNING_KEY = SigningKey.generate()
+PUBLIC_KEY = SIGNING_KEY.verify_key.encode().hex()
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "public_flags": 131141,
+}
+
+MEMBER = {
+    "user": USER,
+    "roles": ["539082325061763073", "539082325061763074"],
+    "premium_since": None,
+    "permissions": "2147483647",
+    "pending": False,
+    "nick": None,
+    "mute": False,
+    "joined_at": "2017-03-13T19:19:14.040000+00:00",
+    "deaf": False,
+}
+
+Signed = Tuple[bytes, List[Tuple[bytes, bytes]]]
+
+_ids = itertools.count()
+
+
+def payload(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(786008729715212338 + i),
+        "application_id": "775799577604522054",
+        "type": 2,
+        "token": "A_UNIQUE_TOKEN" * 10,
+        "version": 1,
+        "guild_id": "290926798626357999",
+        "channel_id": "645027906669510667",
+        "member": MEMBER,
+        "locale": "en-US",
+        "data": {
+            "id": "771825006014889984",
+            "name": "blep",
+            "type": 1,
+            "options": [
+                {"type": 3, "name": "animal", "value": "animal_dog"},
+                {"type": 4, "name": "count", "value": 3},
+            ],
+        },
+    }
+
+
+def signed_requests(number: int) -> List[Signed]:
+    """Signs distinct bodies, so none of them is rejected as a replay."""
+    codec = StdlibCodec()
+    timestamp = str(int(time.time()))
+    requests = []
+    for _ in range(number):
+        body = codec.dumps(payload(next(_ids)))
+        signature = SIGNING_KEY.sign(timestamp.encode() + body).signature.hex()
+        headers = [
+            (b"x-signature-ed25519", signature.encode()),
+            (b"x-signature-timestamp", timestamp.encode()),
+            (b"content-type", b"application/json"),
+        ]
+        requests.append((body, headers))
+    return requests
+
+
+def make_request(body: bytes, headers: List[Tuple[bytes, bytes]]) -> Request:
+    scope = {"type": "http", "method": "POST", "path": "/interactions", "headers": headers}
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+def make_bot() -> dismake.Bot:
+    bot = dismake.Bot(token="token", client_public_key=PUBLIC_KEY, client_id=1)
+
+    @bot.command(name="blep", description="Send a random adorable animal photo")
+    async def blep(
+        interaction: dismake.Interaction,
+        animal: Annotated[str, dismake.Option()],
+        count: Annotated[int, dismake.Option()] = 1,
+    ):
+        pass
+
+    return bot
+
+
+async def per_request(step: Callable[[Signed], Awaitable[Any]], requests: List[Signed]) -> float:
+    """Returns the CPU time of a step per request in microseconds."""
+    start = time.process_time()
+    for request in requests:
+        await step(request)
+    return (time.process_time() - start) / len(requests) * 1e6
+
+
+async def run(number: int) -> None:
+    bot = make_bot()
+    handler = bot._interaction_handler
+    codec = bot._codec
+
+    async def handle(request: Signed) -> Any:
+        response = await handler.handle_interactions(make_request(*request))
+        assert response.status_code == 200, response.body
+
+    async def verify(request: Signed) -> Any:
+        body, headers = request
+        await handler.verify_request(body, headers[0][1].decode(), headers[1][1].decode())
+
+    async def parse_once(request: Signed) -> Any:
+        Interaction(request=None, data=codec.loads(request[0]), strict=bot.strict)
+
+    async def parse_twice(request: Signed) -> Any:
+        for _ in range(2):
+            Interaction(request=None, data=codec.loads(request[0]), strict=bot.strict)
+
+    # Warms up the imports, the command table and the lazily built models.
+    for request in signed_requests(200):
+        await handle(request)
+    # Verification keeps the signatures it accepted, every step gets its own requests.
+    timings = {
+        "verify only": await per_request(verify, signed_requests(number)),
+        "decode + build once": await per_request(parse_once, signed_requests(number)),
+        "decode + build twice": await per_request(parse_twice, signed_requests(number)),
+        "handle_interactions": await per_request(handle, signed_requests(number)),
+    }
+    for name, timing in timings.items():
+        print(f"{name:<22} {timing:>8.1f}us CPU per request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=3000, help="requests per timing")
+    args = parser.parse_args()
+    asyncio.run(run(args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Times building an Interaction from a decoded payload, lazily and strictly.
+
+A slash command and a button click on a message are built the default way,
+which validates models on first access, and with strict=True, which validates
+the whole payload up front as Interaction used to. Each is timed with a callback
+that only reads the command name or custom id, and with one that reads everything.
+
+    python benchmarks/interaction.py [--number 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+from dismake.models import Interaction
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "public_flags": 131141,
+}
+
+MEMBER = {
+    "user": USER,
+    "roles": ["539082325061763073", "539082325061763074"],
+    "premium_since": None,
+    "permissions": "2147483647",
+    "pending": False,
+    "nick": None,
+    "mute": False,
+    "joined_at": "2017-03-13T19:19:14.040000+00:00",
+    "deaf": False,
+}
+
+BASE = {
+    "id": "786008729715212338",
+    "application_id": "775799577604522054",
+    "token": "A_UNIQUE_TOKEN" * 10,
+    "version": 1,
+    "guild_id": "290926798626357999",
+    "channel_id": "645027906669510667",
+    "member": MEMBER,
+    "locale": "en-US",
+}
+
+MESSAGE = {
+    "id": "1041407470127108186",
+    "channel_id": BASE["channel_id"],
+    "author": USER,
+    "content": "Vote below.",
+    "timestamp": "2022-11-13T14:08:49.181000+00:00",
+    "edited_timestamp": None,
+    "tts": False,
+    "mention_everyone": False,
+    "mentions": [USER, USER],
+    "mention_roles": [],
+    "attachments": [],
+    "embeds": [
+        {
+            "title": "Poll",
+            "description": "Which one?",
+            "fields": [{"name": f"Option {i}", "value": "0 votes", "inline": True} for i in range(4)],
+        }
+    ],
+    "pinned": False,
+    "type": 0,
+    "components": [],
+}
+
+PAYLOADS: Dict[str, Dict[str, Any]] = {
+    "slash": {
+        **BASE,
+        "type": 2,
+        "data": {
+            "id": "771825006014889984",
+            "name": "blep",
+            "type": 1,
+            "options": [
+                {"type": 3, "name": "animal", "value": "animal_dog"},
+                {"type": 6, "name": "owner", "value": USER["id"]},
+            ],
+            "resolved": {"users": {USER["id"]: USER}, "members": {USER["id"]: MEMBER}},
+        },
+    },
+    "component": {
+        **BASE,
+        "type": 3,
+        "data": {"custom_id": "vote:1:yes", "component_type": 2},
+        "message": MESSAGE,
+    },
+}
+
+
+def read_name(interaction: Interaction) -> None:
+    if interaction.type == 2:
+        interaction.data.name  # type: ignore
+    else:
+        interaction.data.custom_id  # type: ignore
+
+
+def read_all(interaction: Interaction) -> None:
+    read_name(interaction)
+    interaction.user
+    interaction.message
+    interaction.namespace.animal
+    interaction.namespace.owner
+
+
+def best(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Returns the best time of a call in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=5000, help="interactions per timing")
+    args = parser.parse_args()
+
+    print(f"{'payload':<10} {'callback':<10} {'strict':>10} {'lazy':>10}")
+    for name, payload in PAYLOADS.items():
+        for read in (read_name, read_all):
+            timings = [
+                best(lambda: read(Interaction(request=None, data=payload, strict=strict)), args.number)
+                for strict in (True, False)
+            ]
+            label = "name" if read is read_name else "all"
+            print(f"{name:<10} {label:<10} " + " ".join(f"{t:>8.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
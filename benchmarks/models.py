@@ -0,0 +1,142 @@
+"""
+Compares BaseModel.from_payload with the validating constructor of the models.
+
+Users, members, roles, channels, messages and application commands are parsed
+from Discord payloads both ways. Both results are checked to be equal before
+they are timed.
+
+    python benchmarks/models.py [--number 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from dismake.models import AppCommand, BaseModel, Member, Message, Role, TextChannel, User
+
+USER = {
+    "id": "80351110224678912",
+    "username": "Nelly",
+    "discriminator": "1337",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "public_flags": 131141,
+}
+
+MEMBER = {
+    "user": USER,
+    "roles": ["41771983423143936"],
+    "joined_at": "2015-04-26T06:26:56.936000+00:00",
+    "deaf": False,
+    "mute": False,
+    "permissions": "2147483647",
+}
+
+ROLE = {
+    "id": "41771983423143936",
+    "name": "WE DEM BOYZZ!!!!!!",
+    "color": 3447003,
+    "hoist": True,
+    "icon": "cf3ced8600b777c9486c6d8d84fb4327",
+    "unicode_emoji": None,
+    "position": 1,
+    "permissions": "66321471",
+    "managed": False,
+    "mentionable": False,
+}
+
+CHANNEL = {
+    "id": "41771983423143937",
+    "guild_id": "41771983423143937",
+    "name": "general",
+    "type": 0,
+    "position": 6,
+    "permission_overwrites": [],
+    "rate_limit_per_user": 2,
+    "nsfw": True,
+    "topic": "24/7 chat about how to gank Mike #2",
+    "last_message_id": "155117677105512449",
+    "parent_id": "399942396007890945",
+    "default_auto_archive_duration": 60,
+}
+
+MESSAGE = {
+    "id": "1041407470127108186",
+    "channel_id": "645027906669510667",
+    "author": USER,
+    "content": "hello",
+    "timestamp": "2015-04-26T06:26:56.936000+00:00",
+    "edited_timestamp": None,
+    "tts": False,
+    "mention_everyone": False,
+    "mentions": [USER, USER],
+    "mention_roles": [ROLE["id"]],
+    "attachments": [],
+    "embeds": [
+        {
+            "title": "t",
+            "description": "d",
+            "timestamp": "2015-04-26T06:26:56.936000+00:00",
+            "fields": [{"name": "a", "value": "b", "inline": False}],
+            "footer": {"text": "f"},
+        }
+    ],
+    "pinned": False,
+    "type": 0,
+    "components": [],
+    "nonce": 123,
+}
+
+APP_COMMAND = {
+    "id": "771825006014889984",
+    "application_id": "775799577604522054",
+    "version": "1",
+    "type": 1,
+    "name": "blep",
+    "description": "Send a random adorable animal photo",
+    "default_member_permissions": None,
+    "dm_permission": True,
+    "options": [{"type": 3, "name": "animal", "description": "The type of animal", "required": True}],
+}
+
+CASES: List[Tuple[Type[BaseModel], Dict[str, Any]]] = [
+    (User, USER),
+    (Member, MEMBER),
+    (Role, ROLE),
+    (TextChannel, CHANNEL),
+    (Message, MESSAGE),
+    (AppCommand, APP_COMMAND),
+]
+
+
+def best(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Returns the best time of a call in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=5000, help="parses per timing")
+    args = parser.parse_args()
+
+    print(f"{'model':<12} {'constructor':>12} {'from_payload':>13}")
+    for cls, payload in CASES:
+        validated, parsed = cls(**payload), cls.from_payload(payload)
+        assert validated.dict() == parsed.dict(), cls.__name__
+        assert validated.__fields_set__ == parsed.__fields_set__, cls.__name__
+        constructor = best(lambda: cls(**payload), args.number)
+        from_payload = best(lambda: cls.from_payload(payload), args.number)
+        print(
+            f"{cls.__name__:<12} {constructor:>10.1f}us {from_payload:>11.1f}us"
+            f"  ({constructor / from_payload:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
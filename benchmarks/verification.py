@@ -0,0 +1,108 @@
+"""
+Compares SignatureVerifier with checking signatures with PyNaCl's VerifyKey.verify.
+
+Valid, forged, malformed, stale and replayed requests are checked at
+several body sizes, and the throughput of each is reported. The last line
+times concurrent 64KB requests with and without a thread pool, which only
+helps on hosts with more than one core.
+
+    python benchmarks/verification.py [--number 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from nacl.exceptions import BadSignatureError
+from nacl.signing import SigningKey, VerifyKey
+
+from dismake.verification import SignatureVerifier
+
+Request = Tuple[bytes, str, str]
+
+SIGNING_KEY = SigningKey.generate()
+PUBLIC_KEY = SIGNING_KEY.verify_key.encode().hex()
+VERIFY_KEY = VerifyKey(bytes.fromhex(PUBLIC_KEY))
+
+
+def verify_key(body: bytes, signature: str, timestamp: str) -> bool:
+    """The check the interaction handler used to make."""
+    try:
+        VERIFY_KEY.verify(timestamp.encode() + body, bytes.fromhex(signature))
+    except (BadSignatureError, ValueError):
+        return False
+    return True
+
+
+def sign(body: bytes, timestamp: str) -> Request:
+    return body, SIGNING_KEY.sign(timestamp.encode() + body).signature.hex(), timestamp
+
+
+def throughput(check: Callable[[bytes, str, str], bool], requests: List[Request], repeat: int = 5) -> float:
+    """Returns the best number of requests checked per second."""
+    elapsed = min(_time(check, requests) for _ in range(repeat))
+    return len(requests) / elapsed
+
+
+def _time(check: Callable[[bytes, str, str], bool], requests: List[Request]) -> float:
+    start = time.perf_counter()
+    for request in requests:
+        check(*request)
+    return time.perf_counter() - start
+
+
+async def concurrent(executor: Optional[Executor], number: int, concurrency: int = 64) -> float:
+    timestamp = str(int(time.time()))
+    requests = iter([sign(b"x" * 65536 + b"%d" % i, timestamp) for i in range(number)])
+    verifier = SignatureVerifier(PUBLIC_KEY, executor=executor, offload_threshold=1)
+
+    async def worker() -> None:
+        for request in requests:
+            await verifier.verify(*request, load=concurrency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return number / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--number", type=int, default=2000, help="requests per timing")
+    args = parser.parse_args()
+
+    print(f"{'body':>6} {'request':<10} {'VerifyKey/s':>12} {'SignatureVerifier/s':>20}")
+    for size in (512, 8192, 65536):
+        timestamp = str(int(time.time()))
+        valid = [sign(b'{"n":%d,"pad":"%s"}' % (i, b"x" * size), timestamp) for i in range(args.number)]
+        cases = {
+            "valid": valid,
+            "forged": [(body, valid[i - 1][1], ts) for i, (body, _, ts) in enumerate(valid)],
+            "malformed": [(body, "zz" * 64, ts) for body, _, ts in valid],
+            "stale": [(body, signature, "1") for body, signature, _ in valid],
+        }
+        for name, requests in cases.items():
+            # A fresh verifier per run, so valid requests are not rejected as replays.
+            elapsed = min(_time(SignatureVerifier(PUBLIC_KEY).check, requests) for _ in range(5))
+            print(
+                f"{size:>5}B {name:<10} {throughput(verify_key, requests):>12.0f} "
+                f"{len(requests) / elapsed:>20.0f}"
+            )
+        replays = SignatureVerifier(PUBLIC_KEY)
+        for request in valid:
+            replays.check(*request)
+        print(
+            f"{size:>5}B {'replayed':<10} {throughput(verify_key, valid):>12.0f} "
+            f"{throughput(replays.check, valid):>20.0f}  (accepted by VerifyKey)"
+        )
+
+    inline = asyncio.run(concurrent(None, args.number))
+    with ThreadPoolExecutor(4) as executor:
+        offloaded = asyncio.run(concurrent(executor, args.number))
+    print(f"64KB x 64 concurrent: inline {inline:.0f}/s, thread pool of 4 {offloaded:.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
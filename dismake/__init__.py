@@ -6,5 +6,13 @@ from .permissions import *
 from .plugin import *
 from .errors import *
 from .commands import *
+from .codec import *
+from .ratelimit import *
+from .sync import *
+from .coordination import *
+from .events import *
+from .verification import *
+from .autocomplete import *
+from .entities import *
 
 __version__ = "0.0.23"
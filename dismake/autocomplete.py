@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from bisect import bisect_left
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from .cache import TTLCache
+
+if TYPE_CHECKING:
+    from .commands import Choice, Command
+    from .models import Interaction
+
+
+__all__ = ("AutocompleteCache", "AutocompleteCoalescer", "ChoiceIndex")
+
+# Discord shows at most this many autocomplete choices.
+_MAX_CHOICES = 25
+
+_SCOPES = (None, "guild", "user")
+
+_WORD_START = re.compile(r"(?<=\W)\w")
+
+
+def _user_id(interaction: Interaction) -> Optional[str]:
+    raw = interaction._raw
+    user = (raw.get("member") or raw).get("user") or {}
+    return user.get("id")
+
+
+def _contains(choice: Choice, value: str) -> bool:
+    return value.casefold() in choice.name.casefold()
+
+
+class _Entry:
+    __slots__ = ("choices", "data", "complete")
+
+    def __init__(self, choices: List[Choice]) -> None:
+        self.choices = choices
+        self.data = [choice.to_dict() for choice in choices]
+        # A truncated result may lack choices matching a longer value.
+        self.complete = len(choices) < _MAX_CHOICES
+
+
+class AutocompleteCache:
+    """
+    Caches the choices returned by autocomplete callbacks.
+
+    Results are keyed by the command path, the option name, the focused value and,
+    depending on `per`, the guild or the user. They are stored already serialized,
+    so a hit costs no call of the callback and no :meth:`Choice.to_dict`.
+
+    With `prefix_reuse`, when a value is not cached, the results of its prefixes are tried,
+    longest first: if the results for ``"app"`` were not truncated to 25 choices, the results
+    for ``"appl"`` are computed by filtering them with `matcher` instead of calling the callback.
+
+    Parameters
+    ----------
+    ttl: :class:`float`
+        Seconds a result is cached for, by default 60.
+    maxsize: :class:`int`
+        The maximum number of cached results, the least recently used ones are evicted
+        beyond it. By default 1024.
+    per: Optional[:class:`str`]
+        ``"guild"`` or ``"user"`` to cache results separately for every guild or user,
+        for callbacks whose choices depend on them. By default results are shared.
+    prefix_reuse: :class:`bool`
+        Whether to filter the cached results of a prefix of the value, by default False.
+        Only enable it if the callback returns exactly the choices that `matcher` matches
+        with the value, in an order that does not depend on the value, e.g. the choices whose
+        name contains it. Otherwise the reused results differ from what the callback would
+        return. A callback matching names by their start needs a `matcher` doing the same.
+    matcher: Callable[[:class:`Choice`, :class:`str`], :class:`bool`]
+        Whether a choice matches a value when reusing the results of a prefix,
+        by default a case-insensitive substring match on the choice name.
+    """
+
+    __slots__ = ("per", "prefix_reuse", "matcher", "hits", "prefix_hits", "misses", "_cache")
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        maxsize: int = 1024,
+        per: Optional[str] = None,
+        prefix_reuse: bool = False,
+        matcher: Callable[[Choice, str], bool] = _contains,
+    ) -> None:
+        if per not in _SCOPES:
+            raise ValueError(f"per must be 'guild', 'user' or None, not {per!r}.")
+        self.per = per
+        self.prefix_reuse = prefix_reuse
+        self.matcher = matcher
+        self._cache: TTLCache[Tuple[Hashable, ...], _Entry] = TTLCache(maxsize, ttl=ttl)
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+
+    def _scope(self, interaction: Interaction) -> Optional[str]:
+        if self.per is None:
+            return None
+        if self.per == "guild":
+            return interaction._raw.get("guild_id")
+        return _user_id(interaction)
+
+    def get(
+        self, interaction: Interaction, path: Tuple[str, ...], option: str, value: Any
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the serialized choices cached for a value, or None on a miss.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The autocomplete interaction.
+        path: tuple[:class:`str`, ...]
+            The names of the command and its parents.
+        option: :class:`str`
+            The name of the focused option.
+        value: Any
+            The focused value.
+        """
+        scope = self._scope(interaction)
+        entry = self._cache.get((path, option, scope, value))
+        if entry is not None:
+            self.hits += 1
+            return entry.data
+        if self.prefix_reuse and isinstance(value, str):
+            for end in range(len(value) - 1, -1, -1):
+                key = (path, option, scope, value[:end])
+                if key not in self._cache:
+                    continue
+                prefix = self._cache.get(key)
+                if not prefix.complete:
+                    break
+                self.prefix_hits += 1
+                entry = _Entry([c for c in prefix.choices if self.matcher(c, value)])
+                self._cache.set((path, option, scope, value), entry)
+                return entry.data
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        interaction: Interaction,
+        path: Tuple[str, ...],
+        option: str,
+        value: Any,
+        choices: List[Choice],
+    ) -> List[Dict[str, Any]]:
+        """
+        Caches the choices returned for a value.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The autocomplete interaction.
+        path: tuple[:class:`str`, ...]
+            The names of the command and its parents.
+        option: :class:`str`
+            The name of the focused option.
+        value: Any
+            The focused value.
+        choices: list[:class:`Choice`]
+            The choices returned by the callback.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The serialized choices.
+        """
+        entry = _Entry(list(choices))
+        self._cache.set((path, option, self._scope(interaction), value), entry)
+        return entry.data
+
+    def clear(self) -> None:
+        """Removes every cached result."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the size and the counters of the cache.
+
+        Returns
+        -------
+        dict[str, int]
+            The size of the cache, the ``hits``, the ``prefix_hits``, i.e. the values answered
+            by filtering the results of a prefix, and the ``misses``, which called the callback.
+        """
+        stats = self._cache.stats()
+        stats.update(hits=self.hits, prefix_hits=self.prefix_hits, misses=self.misses)
+        return stats
+
+
+class _Pending:
+    __slots__ = ("value", "task")
+
+    def __init__(self, value: Any, task: asyncio.Task[Optional[List[Dict[str, Any]]]]) -> None:
+        self.value = value
+        self.task = task
+
+
+class AutocompleteCoalescer:
+    """
+    Coalesces the autocomplete requests of a user for the same command option.
+
+    Discord sends a request per keystroke and only displays the response to the latest,
+    so a request supersedes the ones of the same user, command and option still running:
+
+    - if it has the same value, it shares their result instead of calling the callback again.
+    - otherwise, their callback is cancelled and they get no response.
+    """
+
+    __slots__ = ("_pending", "shared", "cancelled")
+
+    def __init__(self) -> None:
+        self._pending: Dict[Tuple[Hashable, ...], _Pending] = {}
+        self.shared = 0
+        self.cancelled = 0
+
+    async def run(self, interaction: Interaction, command: Command, option: str) -> Any:
+        """
+        Runs the autocomplete of a command option and responds with its choices.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The autocomplete interaction.
+        command: :class:`Command`
+            The command.
+        option: :class:`str`
+            The name of the focused option.
+        """
+        key = (_user_id(interaction), command.qualified_path, option)
+        value = interaction.namespace.get(option)
+        pending = self._pending.get(key)
+        if pending is not None and pending.value == value:
+            self.shared += 1
+        else:
+            if pending is not None:
+                pending.task.cancel()
+                self.cancelled += 1
+            task = asyncio.ensure_future(command._autocomplete_choices(interaction, option))
+            pending = self._pending[key] = _Pending(value, task)
+            task.add_done_callback(lambda _, p=pending: self._done(key, p))
+        task = pending.task
+        try:
+            # Shielded so a request that goes away does not cancel the requests sharing it.
+            data = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                # Superseded by a newer keystroke.
+                return None
+            raise
+        if data is None:
+            return None
+        return await interaction._send_autocomplete(data)
+
+    def _done(self, key: Tuple[Hashable, ...], pending: _Pending) -> None:
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of the coalescer.
+
+        Returns
+        -------
+        dict[str, int]
+            The number of running autocompletes, of requests that shared the result of an
+            identical one and of autocompletes cancelled by a newer request.
+        """
+        return {"running": len(self._pending), "shared": self.shared, "cancelled": self.cancelled}
+
+
+class ChoiceIndex:
+    """
+    Searches a static list of choices, to answer autocompletes without a callback.
+
+    The index is built once: the choice names are sorted for prefix lookups and their
+    trigrams are indexed for substring lookups, so a search never scans the whole list.
+    Matches are case-insensitive and ranked by where the value matches the name:
+
+    1. the start of the name, alphabetically, an exact match first.
+    2. the start of another word of the name.
+    3. anywhere else in the name, alphabetically.
+
+    Parameters
+    ----------
+    choices: Iterable[Union[:class:`Choice`, :class:`str`]]
+        The choices, strings being choices whose name is their value.
+    limit: :class:`int`
+        The maximum number of choices returned by a search, by default 25.
+        An empty value returns the first choices, in their original order.
+    """
+
+    __slots__ = ("limit", "_names", "_data", "_first", "_words", "_word_ids", "_trigrams")
+
+    def __init__(self, choices: Iterable[Union[Choice, str]], limit: int = _MAX_CHOICES) -> None:
+        from .commands import Choice
+
+        self.limit = limit
+        choices = [Choice(name=c) if isinstance(c, str) else c for c in choices]
+        self._first = [choice.to_dict() for choice in choices[:limit]]
+        # Sorted on the name only: names equal once casefolded keep their original order.
+        entries = sorted(
+            ((choice.name.casefold(), choice.to_dict()) for choice in choices), key=lambda e: e[0]
+        )
+        # A choice is identified by its rank in alphabetical order, so lists of ids are sorted alphabetically.
+        self._names: List[str] = [name for name, _ in entries]
+        self._data: List[Dict[str, Any]] = [data for _, data in entries]
+
+        words: List[Tuple[str, int]] = []
+        trigrams: Dict[str, List[int]] = {}
+        for id, name in enumerate(self._names):
+            for match in _WORD_START.finditer(name):
+                words.append((name[match.start() :], id))
+            for gram in {name[i : i + 3] for i in range(len(name) - 2)}:
+                trigrams.setdefault(gram, []).append(id)
+        words.sort()
+        self._words = [word for word, _ in words]
+        self._word_ids = [id for _, id in words]
+        self._trigrams = trigrams
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, value: Any) -> List[Dict[str, Any]]:
+        """
+        Returns the serialized choices matching a value.
+
+        Parameters
+        ----------
+        value: Any
+            The focused value.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            At most `limit` serialized choices, best matches first.
+        """
+        query = str(value or "").casefold()
+        if not query:
+            return self._first
+        limit = self.limit
+        names = self._names
+        found: List[int] = []
+        seen: Set[int] = set()
+
+        index = bisect_left(names, query)
+        while index < len(names) and len(found) < limit and names[index].startswith(query):
+            found.append(index)
+            seen.add(index)
+            index += 1
+
+        index = bisect_left(self._words, query)
+        while (
+            index < len(self._words)
+            and len(found) < limit
+            and self._words[index].startswith(query)
+        ):
+            id = self._word_ids[index]
+            if id not in seen:
+                found.append(id)
+                seen.add(id)
+            index += 1
+
+        if len(found) < limit:
+            if len(query) < 3:
+                # Too short for a trigram, but so short that matches are rarely scarce.
+                candidates: Iterable[int] = range(len(names))
+            else:
+                postings = [self._trigrams.get(query[i : i + 3]) for i in range(len(query) - 2)]
+                if not all(postings):
+                    candidates = ()
+                else:
+                    candidates = min(postings, key=len)  # type: ignore
+            for id in candidates:
+                if id not in seen and query in names[id]:
+                    found.append(id)
+                    if len(found) >= limit:
+                        break
+
+        return [self._data[id] for id in found]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Iterator, Optional, TypeVar
+
+__all__ = ("TTLCache",)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    A mapping with least recently used eviction and per entry expiry.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        The maximum number of entries, the least recently used entry is evicted beyond it.
+    ttl: Optional[:class:`float`]
+        The default number of seconds an entry lives for, None to never expire.
+    on_evict: Callable[[K, V], None]
+        Called with the key and the value of every entry that is evicted or expires.
+        It is not called for entries removed with :meth:`pop`.
+    """
+
+    __slots__ = (
+        "maxsize",
+        "ttl",
+        "on_evict",
+        "_data",
+        "hits",
+        "misses",
+        "evictions",
+        "expirations",
+    )
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        # key -> (value, expires_at)
+        self._data: OrderedDict[K, tuple[V, Optional[float]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._data.get(key)  # type: ignore
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """
+        Returns the value of a key and marks it as recently used.
+
+        Parameters
+        ----------
+        key: K
+            The key.
+        default: Any
+            Returned if the key is missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._expire(key, value)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = _MISSING) -> None:
+        """
+        Sets the value of a key, evicting the least recently used entry if the cache is full.
+
+        Parameters
+        ----------
+        key: K
+            The key.
+        value: V
+            The value.
+        ttl: Optional[:class:`float`]
+            Overrides the cache's default `ttl` for this entry, None to never expire.
+        """
+        if ttl is _MISSING:
+            ttl = self.ttl
+        self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            old_key, (old_value, _) = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        """
+        Removes a key without calling `on_evict`.
+
+        Parameters
+        ----------
+        key: K
+            The key.
+        default: Any
+            Returned if the key is missing.
+        """
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def _expire(self, key: K, value: V) -> None:
+        del self._data[key]
+        self.expirations += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def expire(self) -> int:
+        """
+        Removes every expired entry.
+
+        Returns
+        -------
+        :class:`int`
+            The number of removed entries.
+        """
+        now = time.monotonic()
+        expired = [
+            (key, value)
+            for key, (value, expires_at) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key, value in expired:
+            self._expire(key, value)
+        return len(expired)
+
+    def clear(self) -> None:
+        """Removes every entry without calling `on_evict`."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the size and the counters of the cache.
+
+        Returns
+        -------
+        dict[str, int]
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,28 +1,64 @@
 from __future__ import annotations
 import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import Counter
 from functools import wraps
 from logging import config, getLogger
-from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Union
-
-from fastapi import FastAPI
-
-from .commands import Command, Group
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TYPE_CHECKING,
+    Union,
+)
+
+from fastapi import FastAPI, Request, Response
+from httpx import Limits, Timeout
+
+from .codec import JSONCodec, get_codec
+from .commands import Command, CommandTable, Group
+from .coordination import FileLockBackend, LeaderElection, LockBackend
+from .entities import EntityCache
 from .errors import CommandInvokeError
+from .enums import InteractionType
+from .events import EventBus, _interaction_filter
 from .handler import InteractionHandler
 from .http import HttpClient
-from .models import Guild
+from .ratelimit import RateLimitBackend
+from .sync import CommandSyncer, SyncResult
+from .verification import SignatureVerifier
+from .ui.registry import ComponentRegistry
+from .ui.router import ComponentRoute, ComponentRouter
+from .models import Channel, Guild, Member, Role
 from .models import User
 from .utils import LOGGING_CONFIG
 
 if TYPE_CHECKING:
-    from .ui import View, Component, Modal
+    from .ui import View, Modal
     from .types import AsyncFunction
     from .permissions import Permissions
-    from .models import Interaction, AppCommand
+    from .models import Interaction
 
 
 log = getLogger("dismake")
 
+# Seconds between two sweeps of the view and modal registry.
+_EXPIRY_INTERVAL = 30.0
+# Seconds until the leader lease of a worker that stopped renewing it expires.
+_LEADER_TTL = 30.0
+# Seconds the cached bot user is shared between workers for.
+_USER_CACHE_TTL = 3600.0
+# Seconds a follower waits for the leader to cache the bot user.
+_USER_CACHE_WAIT = 5.0
+
 
 __all__ = ("Bot",)
 
@@ -46,9 +82,92 @@ class Bot(FastAPI):
         The route to listen for Discord interactions on, by default "/interactions".
     interaction_handler: :class:`InteractionHandler`
         An interaction handler to process incoming Discord interactions, by default :class:`InteractionHandler`.
+    json_codec: Union[:class:`JSONCodec`, :class:`str`]
+        The JSON codec used to decode interactions and encode REST payloads,
+        either a :class:`JSONCodec` or one of ``"json"``, ``"orjson"`` and ``"msgspec"``.
+        Defaults to the fastest one installed.
+    inline_responses: :class:`bool`
+        If set to True, the first response to an interaction is returned as the body of
+        the webhook HTTP response instead of being posted to the interaction callback endpoint.
+        Follow-ups still go through the REST API.
+    defer_after: :class:`float`
+        Seconds after which a command interaction is deferred automatically if its callback
+        has not responded yet, by default None. Discord fails interactions that are not
+        acknowledged within 3 seconds.
+    defer_ephemeral: :class:`bool`
+        Whether automatic deferrals are ephemeral, by default False. The response that
+        replaces the loading message has the same visibility whatever its `ephemeral`.
+    ratelimit_backend: :class:`RateLimitBackend`
+        Where the rate limit state is stored, by default in memory. Use a shared backend such as
+        :class:`SQLiteBackend` or :class:`RedisBackend` when several workers or hosts run the same bot.
+    max_connections: :class:`int`
+        The maximum number of concurrent connections to the Discord API, by default 100.
+    max_keepalive_connections: :class:`int`
+        The maximum number of idle connections kept alive, by default 20.
+    keepalive_expiry: :class:`float`
+        Seconds an idle connection is kept alive for, by default 5.
+    http2: :class:`bool`
+        Whether to multiplex requests over HTTP/2, requires the ``h2`` package.
+    timeout: Union[:class:`float`, :class:`httpx.Timeout`]
+        The timeout of requests to the Discord API in seconds, by default 10. Pass a
+        :class:`httpx.Timeout` to set the connect, read, write and pool timeouts separately.
+    shutdown_timeout: :class:`float`
+        Seconds to wait for background tasks and in-flight requests on shutdown, by default 10.
+    metrics_route: :class:`str`
+        If set, :meth:`get_stats` is served as JSON on this route.
+    max_views: :class:`int`
+        The maximum number of views with a timeout listening at once, by default 1000.
+        The least recently used view is evicted beyond it.
+    max_modals: :class:`int`
+        The maximum number of modals listening at once, by default 1000.
+    sync_cache: :class:`str`
+        The path of a file remembering the commands of the last :meth:`sync_commands`,
+        so a restart with unchanged commands does not need to fetch them from Discord.
+    strict: :class:`bool`
+        If set to True, interaction payloads are fully validated as soon as they are received,
+        which is useful during development. By default the user, the message and the resolved
+        data of an interaction are only validated when they are first accessed.
+    leader_election: :class:`bool`
+        If set to True, the workers sharing `lock_backend` elect a single leader, which
+        dispatches the ``leader`` event. This is where one-shot startup work such as
+        :meth:`sync_commands` belongs. The leader also caches the bot user in `state_dir`,
+        so the other workers do not fetch it. By default every worker is its own leader.
+        A worker dispatches ``leader`` at most once, the first time it is elected, even if
+        it loses the lease and wins it back. A worker taking over from a leader that stopped
+        dispatches it too, so the work it starts must be safe to repeat.
+    lock_backend: :class:`LockBackend`
+        Where the leader lease is stored, by default a :class:`FileLockBackend` in `state_dir`.
+        Passing one enables `leader_election`.
+    state_dir: :class:`str`
+        The directory of the state shared by the workers of a host when `leader_election`
+        is enabled, by default the temporary directory.
+    event_concurrency: :class:`int`
+        The number of listener calls of an event running at once, by default 4.
+    event_queue_size: :class:`int`
+        The number of listener calls of an event waiting to run, by default 1000.
+    event_overflow: :class:`str`
+        What to do with events dispatched to a full queue, one of ``"drop"``, ``"block"``
+        and ``"sample"``, by default ``"drop"``. See :class:`EventBus`.
+    verifier: :class:`SignatureVerifier`
+        Verifies the signature, the timestamp and the freshness of interaction requests,
+        by default a :class:`SignatureVerifier` rejecting requests older than 5 minutes
+        and replays. Pass one with an `executor` to verify in a thread pool under load.
+        It replaces the verifier of `interaction_handler` too.
+    cache_ttl: dict[:class:`str`, Optional[:class:`float`]]
+        Seconds the fetched guilds, channels, roles and members are cached for, by
+        ``"guild"``, ``"channel"``, ``"role"`` or ``"member"``. See :class:`EntityCache`.
+    cache_maxsize: dict[:class:`str`, :class:`int`]
+        The maximum number of cached guilds, channels, roles and members, by kind.
+    cache_warm: :class:`bool`
+        Whether the member and the resolved roles and members of every interaction are cached,
+        by default True.
 
     Attributes
     ----------
+    cache: :class:`EntityCache`
+        The cache of the guilds, channels, roles and members, filled from interactions.
+    metrics: :class:`collections.Counter`
+        Counters of notable runtime events, e.g. ``auto_defers``.
     user: :class:`User`
         The user within this bot.
     """
@@ -60,25 +179,108 @@ class Bot(FastAPI):
         client_id: int,
         route: str = "/interactions",
         interaction_handler: Optional[InteractionHandler] = None,
+        json_codec: Optional[Union[JSONCodec, str]] = None,
+        inline_responses: bool = False,
+        defer_after: Optional[float] = None,
+        defer_ephemeral: bool = False,
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        timeout: Union[float, Timeout] = 10.0,
+        shutdown_timeout: float = 10.0,
+        metrics_route: Optional[str] = None,
+        max_views: int = 1000,
+        max_modals: int = 1000,
+        strict: bool = False,
+        sync_cache: Optional[str] = None,
+        leader_election: bool = False,
+        lock_backend: Optional[LockBackend] = None,
+        state_dir: Optional[str] = None,
+        event_concurrency: int = 4,
+        event_queue_size: int = 1000,
+        event_overflow: str = "drop",
+        verifier: Optional[SignatureVerifier] = None,
+        cache_ttl: Optional[Dict[str, Optional[float]]] = None,
+        cache_maxsize: Optional[Dict[str, int]] = None,
+        cache_warm: bool = True,
         **kwargs: Any,
     ) -> None:
         super().__init__(**kwargs)
         self._client_id = client_id
         self._client_public_key = client_public_key
-        self._interaction_handler = interaction_handler or InteractionHandler(self)
-        self._http = HttpClient(token=token, client_id=client_id)
+        self._codec = get_codec(json_codec)
+        self.inline_responses = inline_responses
+        self.defer_after = defer_after
+        self.defer_ephemeral = defer_ephemeral
+        self.strict = strict
+        self.metrics: Counter[str] = Counter()
+        self._tasks: Set[asyncio.Task[Any]] = set()
+        self._interaction_handler = interaction_handler or InteractionHandler(self, verifier)
+        if interaction_handler is not None and verifier is not None:
+            interaction_handler.verifier = verifier
+        self._http = HttpClient(
+            token=token,
+            client_id=client_id,
+            codec=self._codec,
+            ratelimit_backend=ratelimit_backend,
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            http2=http2,
+        )
+        self._syncer = CommandSyncer(self._http, sync_cache)
+        self.cache = EntityCache(
+            self._http,
+            ttl=cache_ttl,
+            maxsize=cache_maxsize,
+            strict=strict,
+            warm_interactions=cache_warm,
+        )
+        self.shutdown_timeout = shutdown_timeout
+        if metrics_route is not None:
+            self.add_route(
+                path=metrics_route,
+                route=self._serve_stats,
+                methods=["GET"],
+                include_in_schema=False,
+            )
         self.add_route(
             path=route,
             route=self._interaction_handler.handle_interactions,
             methods=["POST"],
             include_in_schema=False,
         )
-        self.add_event_handler("startup", self._http.fetch_me)
-        self._events: Dict[str, List[AsyncFunction]] = {}
-        self.add_event_handler("startup", lambda: self.dispatch("ready"))
-        self._components: Dict[str, Component] = {}
+        state_dir = state_dir or tempfile.gettempdir()
+        self._lock_backend: Optional[LockBackend] = None
+        self._election: Optional[LeaderElection] = None
+        if leader_election or lock_backend is not None:
+            self._lock_backend = lock_backend or FileLockBackend(state_dir)
+            self._election = LeaderElection(
+                self._lock_backend,
+                f"dismake-{client_id}-leader",
+                ttl=_LEADER_TTL,
+                on_elected=self._on_elected,
+            )
+        self._elected = False
+        self._user_cache = os.path.join(state_dir, f"dismake-{client_id}-user.json")
+        self._bus = EventBus(
+            concurrency=event_concurrency, max_queue=event_queue_size, overflow=event_overflow
+        )
+        self.add_event_handler("startup", self._startup)
+        self.add_event_handler("startup", self._start_expiry)
+        self.add_event_handler("shutdown", self._shutdown)
+        self._registry = ComponentRegistry(
+            max_views=max_views, max_modals=max_modals, on_timeout=self._on_timeout
+        )
+        self._expiry_task: Optional[asyncio.Task[None]] = None
+        self._router = ComponentRouter()
         self._commands: Dict[str, Union[Group, Command]] = {}
-        self._modals: Dict[str, Modal] = {}
+        self._command_table = CommandTable(self._commands)
         self.error_handler: Optional[AsyncFunction] = None
         config.dictConfig(LOGGING_CONFIG)
 
@@ -96,6 +298,156 @@ class Bot(FastAPI):
         """
         return self._http._user
 
+    @property
+    def is_leader(self) -> bool:
+        """
+        Whether this worker is the elected leader of the workers sharing the lock backend.
+
+        Always True if leader election is not enabled.
+
+        Returns
+        -------
+        :class:`bool`
+        """
+        return self._election is None or self._election.is_leader
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Returns runtime statistics of the bot.
+
+        Returns
+        -------
+        dict[str, Any]
+            The :attr:`metrics` counters, the number of background tasks,
+            the HTTP connection pool statistics, the size of the view and modal registry
+            and the counters of the events, the signature checks, the autocomplete caches,
+            the coalesced autocomplete requests and the entity cache.
+        """
+        return {
+            "metrics": dict(self.metrics),
+            "background_tasks": len(self._tasks),
+            "http": self._http.pool_stats(),
+            "components": self._registry.stats(),
+            "leader": self.is_leader,
+            "events": self._bus.stats(),
+            "signatures": dict(self._interaction_handler.verifier.stats),
+            "autocomplete": {
+                f"{' '.join(path)}:{option}": cache.stats()
+                for path, command in self._command_table.items()
+                for option, cache in command.autocomplete_caches.items()
+            },
+            "autocomplete_requests": self._interaction_handler.autocompletes.stats(),
+            "cache": self.cache.stats(),
+        }
+
+    async def _serve_stats(self, request: Request) -> Response:
+        return Response(
+            content=self._codec.dumps(self.get_stats()), media_type="application/json"
+        )
+
+    async def _startup(self) -> None:
+        """Runs the leader election, loads the bot user and dispatches the ``ready`` event."""
+        # A bot that was shut down before starts again with a new connection pool.
+        self._http.start()
+        self._bus.start()
+        if self._election is not None:
+            await self._election.start()
+        else:
+            self._on_elected()
+        await self._load_user()
+        self.dispatch("ready")
+
+    def _on_elected(self) -> None:
+        # A worker losing the lease and winning it back must not redo the one-shot work.
+        if not self._elected:
+            self._elected = True
+            self.dispatch("leader")
+
+    async def _load_user(self) -> None:
+        """
+        Fetches the bot user on the leader and shares it through the user cache file.
+
+        Followers read it from the file, waiting a little for the leader to write it,
+        and only fetch it themselves if it does not show up. Without leader election
+        the bot user is always fetched.
+        """
+        if self._election is None:
+            await self._http.fetch_me()
+            return
+        if not self._election.is_leader:
+            deadline = time.monotonic() + _USER_CACHE_WAIT
+            while True:
+                data = await asyncio.to_thread(self._read_user_cache)
+                if data is not None:
+                    self._http._user = User(**data)
+                    return
+                if time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(0.1)
+        data = await self._http.fetch_me()
+        await asyncio.to_thread(self._write_user_cache, data)
+
+    def _read_user_cache(self) -> Optional[dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(self._user_cache) > _USER_CACHE_TTL:
+                return None
+            with open(self._user_cache, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_user_cache(self, data: dict[str, Any]) -> None:
+        tmp = f"{self._user_cache}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self._user_cache)
+        except OSError as e:
+            log.warning("Could not write the user cache %s: %s", self._user_cache, e)
+
+    async def _shutdown(self) -> None:
+        """
+        Waits for queued event listeners and background tasks to finish, cancelling
+        them after :attr:`shutdown_timeout`, then closes the HTTP client.
+        """
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+        if self._election is not None:
+            await self._election.stop()
+        # The next startup elects a leader again.
+        self._elected = False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.shutdown_timeout
+        await self._bus.close(timeout=self.shutdown_timeout)
+        if self._tasks:
+            log.info("Waiting for %s background tasks.", len(self._tasks))
+            _, pending = await asyncio.wait(
+                set(self._tasks), timeout=max(0.0, deadline - loop.time())
+            )
+            for task in pending:
+                task.cancel()
+        await self._http.close(timeout=self.shutdown_timeout)
+        if self._lock_backend is not None:
+            await self._lock_backend.close()
+
+    async def _start_expiry(self) -> None:
+        self._expiry_task = asyncio.ensure_future(self._expire_components())
+
+    async def _expire_components(self) -> None:
+        """Periodically removes the views and modals that timed out and the expired cache entries."""
+        while True:
+            await asyncio.sleep(_EXPIRY_INTERVAL)
+            self._registry.expire()
+            self.cache.expire()
+
+    def _on_timeout(self, item: Union[View, Modal]) -> None:
+        """Schedules the timeout hook of an expired or evicted view or modal."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._create_task(item.on_timeout())
+
     def get_command(self, name: str) -> Optional[Union[Command, Group]]:
         """
         Returns the slash command with the specified name, or None if it doesn't exist.
@@ -112,28 +464,45 @@ class Bot(FastAPI):
         """
         return self._commands.get(name)
 
-    async def _dispatch_callback(self, coro: AsyncFunction, *args: Any, **kwargs: Any) -> None:
+    def _create_task(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
         """
-        Dispatches an event to a single event listener.
-
-        This method is used internally to dispatch an event to a single event listener.
-        It calls the specified coroutine function with the given arguments and keyword arguments.
-        If the coroutine raises an exception, the exception is logged using the `log` module's `error()` method.
+        Schedules a coroutine as a task that is referenced by the bot until it is done.
 
         Parameters
         ----------
         coro:
-            The coroutine function to call.
+            The coroutine to schedule.
         """
-        try:
-            await coro(*args, **kwargs)
-        except Exception as e:
-            log.error("An error occured in %s" % coro.__name__, exc_info=e)
+        return self._track_task(asyncio.ensure_future(coro))
+
+    def _track_task(self, task: asyncio.Task[Any]) -> asyncio.Task[Any]:
+        """
+        Keeps a reference to a running task until it is done.
+
+        Exceptions raised by the task are logged.
+
+        Parameters
+        ----------
+        task:
+            The task to track.
+        """
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task: asyncio.Task[Any]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            log.error("An error occured in a background task", exc_info=exc)
 
     def dispatch(self, event_name: str, *args: Any, **kwargs: Any) -> None:
         """
         Dispatches an event to all registered event listeners.
 
+        The listener calls are queued on the event bus of the bot and run by its workers.
+        If the queue of the event is full, the event is dropped or sampled according to
+        its overflow policy, see :meth:`configure_event`.
+
         Parameters
         ----------
         event_name: :class:`str`
@@ -143,22 +512,84 @@ class Bot(FastAPI):
         **kwargs: Any
             keyword arguments to pass to the event listeners.
         """
-        if not event_name.startswith("on_"):
-            event_name = "on_" + event_name
-        event = self._events.get(event_name)
-        if not event:
-            return
-        for coro in event:
-            asyncio.ensure_future(self._dispatch_callback(coro, *args, **kwargs))
+        self._bus.dispatch(event_name, *args, **kwargs)
 
-    def event(self, event_name: str | None = None) -> Callable[[AsyncFunction], AsyncFunction]:
+    async def emit(self, event_name: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Dispatches an event, waiting for room in its queue if its overflow policy is ``"block"``.
+
+        Parameters
+        ----------
+        event_name: :class:`str`
+            The name of the event to dispatch.
+        *args: Any
+            positional arguments to pass to the event listeners.
+        **kwargs: Any
+            keyword arguments to pass to the event listeners.
+        """
+        await self._bus.emit(event_name, *args, **kwargs)
+
+    def configure_event(
+        self,
+        event_name: str,
+        *,
+        concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        overflow: Optional[str] = None,
+    ) -> None:
+        """
+        Overrides the queue settings of an event, before it is first dispatched.
+
+        Parameters
+        ----------
+        event_name: :class:`str`
+            The name of the event.
+        concurrency: Optional[:class:`int`]
+            The number of listener calls running at once.
+        max_queue: Optional[:class:`int`]
+            The number of listener calls waiting to run.
+        overflow: Optional[:class:`str`]
+            What to do with events dispatched to a full queue,
+            one of ``"drop"``, ``"block"`` and ``"sample"``.
+
+        Example usage
+        -------------
+            >>> app = dismake.Bot(...)
+            >>> app.configure_event("interaction_create", max_queue=100, overflow="sample")
+        """
+        self._bus.configure(
+            event_name, concurrency=concurrency, max_queue=max_queue, overflow=overflow
+        )
+
+    def event(
+        self,
+        event_name: str | None = None,
+        *,
+        sample: float = 1.0,
+        types: Optional[Sequence[Union[InteractionType, int]]] = None,
+        commands: Optional[Sequence[str]] = None,
+        filter: Optional[Callable[..., bool]] = None,
+    ) -> Callable[[AsyncFunction], AsyncFunction]:
         """
         A decorator that registers an event to listen to.
 
+        Sampling and filters are checked when the event is dispatched, so the events
+        they skip cost no task and no queue slot.
+
         Parameters
         ----------
         event_name: :class:`str`
             The event name you want to listen.
+        sample: :class:`float`
+            The fraction of the events the listener is called for, by default 1.
+        types: Optional[Sequence[Union[:class:`InteractionType`, :class:`int`]]]
+            Only call the listener for interactions of these types.
+            For events whose first argument is an :class:`Interaction`, e.g. ``interaction_create``.
+        commands: Optional[Sequence[:class:`str`]]
+            Only call the listener for interactions of these commands, by their top-level name.
+            For events whose first argument is an :class:`Interaction`.
+        filter: Optional[Callable[..., :class:`bool`]]
+            Called with the arguments of the event, the listener is only called if it returns True.
 
         Example usage
         -------------
@@ -167,35 +598,64 @@ class Bot(FastAPI):
             >>> @app.event()
             ... async def on_ready():
             ...     print(f"Logged in as {app.user}.")
+            >>> @app.event("interaction_create", sample=0.01, commands=["ban", "kick"])
+            ... async def audit(interaction, payload):
+            ...     ...
         """
+        check = _interaction_filter(types, commands, filter)
 
         def decorator(coro: AsyncFunction) -> AsyncFunction:
             @wraps(coro)
             def wrapper(*_: Any, **__: Any) -> AsyncFunction:
-                name = event_name or coro.__name__
-                if self._events.get(name) is not None:
-                    self._events[name].append(coro)
-                else:
-                    self._events[name] = [coro]
+                self._bus.add_listener(
+                    event_name or coro.__name__, coro, sample=sample, filter=check
+                )
                 return coro
 
             return wrapper()
 
         return decorator
 
-    async def sync_commands(self, guild_ids: Optional[int] = None) -> list[AppCommand]:
+    async def sync_commands(
+        self,
+        guild_ids: Optional[Sequence[int]] = None,
+        *,
+        force: bool = False,
+        concurrency: int = 8,
+        purge: bool = False,
+    ) -> list[SyncResult]:
         """
         Synchronizes all application commands to Discord.
 
+        The commands are partitioned by their `guild_id` and every scope is synced to its own
+        endpoint, up to `concurrency` guilds at once. Only the commands that were added,
+        changed or removed are created, edited or deleted. With `sync_cache`, scopes that
+        did not change since the last sync are skipped without any request, which also lets
+        an interrupted sync resume where it stopped.
+
+        A scope without any command, e.g. a guild of `guild_ids` that no command is bound to,
+        is skipped with a warning rather than having its registered commands deleted,
+        unless `purge` is True.
+
         Parameters
         ----------
-        guild_ids: Optional[:class:`int`]
-            An optional list of guild IDs to sync commands for. If not specified, commands will be synced globally.
+        guild_ids: Optional[Sequence[:class:`int`]]
+            An optional list of guild IDs to sync the commands bound to them with their
+            `guild_id`. If not specified, the global commands and the commands of every
+            guild used by a command are synced.
+        force: :class:`bool`
+            If set to True, the remote commands are fetched even if the sync cache is up to date.
+        concurrency: :class:`int`
+            The maximum number of scopes synced at once, by default 8.
+        purge: :class:`bool`
+            If set to True, the commands registered in scopes without any command are deleted.
 
         Returns
         -------
-        command: list[:class:`AppCommand`]
-            A list of the updated application commands on success.
+        list[:class:`SyncResult`]
+            The result of every synced scope. A scope that failed has its `error` set.
+            This used to be the list of :class:`AppCommand` returned by Discord, which
+            is not fetched anymore when nothing changed.
 
         Example usage
         -------------
@@ -204,13 +664,32 @@ class Bot(FastAPI):
             >>> @app.command()
             ... async def hello(ctx):
             ...     await ctx.respond("Hello, world!")
-            >>> @app.event('ready')
-            ... async def on_ready():
+            >>> @app.event()
+            ... async def on_leader():
             ...     await app.sync_commands()
+
+        With `leader_election` enabled, only the leader of the workers syncs the commands.
         """
-        return await self._http.bulk_override_commands(
-            [command for command in self._commands.values()]
-        )
+        scopes: Dict[Optional[int], List[Union[Command, Group]]] = {}
+        if guild_ids is None:
+            scopes[None] = []
+        else:
+            for guild_id in guild_ids:
+                scopes[int(guild_id)] = []
+        for command in self._commands.values():
+            guild_id = int(command.guild_id) if command.guild_id is not None else None
+            if guild_ids is None:
+                scopes.setdefault(guild_id, [])
+            if guild_id in scopes:
+                scopes[guild_id].append(command)
+        if not purge:
+            for guild_id in [guild_id for guild_id, commands in scopes.items() if not commands]:
+                log.warning(
+                    "No command to sync to %s, skipping it. Pass purge=True to delete its commands.",
+                    "the global scope" if guild_id is None else f"the guild {guild_id}",
+                )
+                del scopes[guild_id]
+        return await self._syncer.sync_many(scopes, concurrency=concurrency, force=force)
 
     def on_error(self, coro: AsyncFunction) -> AsyncFunction:
         """
@@ -249,7 +728,7 @@ class Bot(FastAPI):
 
     async def fetch_guild(self, guild_id: int) -> Guild:
         """
-        Fetches a guild from discord by its ID.
+        Fetches a guild from discord by its ID, or from :attr:`cache`.
 
         Parameters
         ----------
@@ -265,41 +744,153 @@ class Bot(FastAPI):
         ------
         HTTPStatusError: If the API request fails.
         """
-        res = await self._http.client.request(method="GET", url=f"/guilds/{guild_id}")
-        res.raise_for_status()
-        return Guild(**res.json())
+        return await self.cache.fetch_guild(guild_id)
+
+    async def fetch_channel(self, channel_id: int) -> Channel:
+        """
+        Fetches a channel from discord by its ID, or from :attr:`cache`.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The ID of the channel to fetch.
+
+        Returns
+        -------
+        channel: :class:`Channel`
+            The requested channel.
+
+        Raises
+        ------
+        HTTPStatusError: If the API request fails.
+        """
+        return await self.cache.fetch_channel(channel_id)
+
+    async def fetch_role(self, guild_id: int, role_id: int) -> Role:
+        """
+        Fetches a role of a guild from discord, or from :attr:`cache`.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild of the role.
+        role_id: :class:`int`
+            The ID of the role to fetch.
+
+        Returns
+        -------
+        role: :class:`Role`
+            The requested role.
+
+        Raises
+        ------
+        HTTPStatusError: If the API request fails.
+        """
+        return await self.cache.fetch_role(guild_id, role_id)
+
+    async def fetch_member(self, guild_id: int, user_id: int) -> Member:
+        """
+        Fetches a member of a guild from discord, or from :attr:`cache`.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild of the member.
+        user_id: :class:`int`
+            The ID of the user to fetch.
+
+        Returns
+        -------
+        member: :class:`Member`
+            The requested member.
+
+        Raises
+        ------
+        HTTPStatusError: If the API request fails.
+        """
+        return await self.cache.fetch_member(guild_id, user_id)
 
     def add_view(self, view: View) -> None:
         """
-        Registers a :class:`View` for persistent listening.
+        Registers a :class:`View` for listening.
+
+        The view listens until its `timeout` elapses without any interaction, or until it is
+        evicted to make room for newer views; :meth:`View.on_timeout` is called in both cases.
+        Views whose `timeout` is None listen until :meth:`remove_view` is called.
 
         Parameters
         ----------
         view: :class:`View`
             The view object to register for dispatching.
         """
-        components = list()
-        for row in view.rows:
-            for component in row.components:
-                components.append(component)
+        self._registry.add_view(view)
 
-        if not components:
-            return
-        for component in components:
-            if self._components.get((custom_id := component.custom_id)):
-                continue
-            self._components[custom_id] = component
+    def remove_view(self, view: View) -> None:
+        """
+        Stops listening to a :class:`View`. Its timeout hook is not called.
+
+        Parameters
+        ----------
+        view: :class:`View`
+            The view object to unregister.
+        """
+        self._registry.remove_view(view)
 
     def add_modal(self, modal: Modal) -> None:
         """
-        Registers a :class:`Modal` for presistent listening.
+        Registers a :class:`Modal` for listening.
+
+        The modal listens until its `timeout` elapses or it is evicted to make room
+        for newer modals; :meth:`Modal.on_timeout` is called in both cases.
 
         Parameters
         ----------
         modal: :class:`Modal`
             The modal object to register for dispatching.
         """
-        self._modals[modal.custom_id] = modal
+        self._registry.add_modal(modal)
+
+    def remove_modal(self, modal: Modal) -> None:
+        """
+        Stops listening to a :class:`Modal`. Its timeout hook is not called.
+
+        Parameters
+        ----------
+        modal: :class:`Modal`
+            The modal object to unregister.
+        """
+        self._registry.remove_modal(modal)
+
+    def component(self, custom_id: str) -> Callable[[AsyncFunction], ComponentRoute]:
+        """
+        A decorator that registers a component callback for every custom_id matching a template.
+
+        Unlike views, routes hold no per-message state: they survive restarts and work on
+        every worker. Parameters of the template are parsed from the custom_id and passed to
+        the callback as keyword arguments. Components of registered views take precedence.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom_id template. Parameters are written as ``{name}`` or ``{name:type}``,
+            where type is one of ``str``, ``int`` and ``float``.
+
+        Example usage
+        -------------
+            >>> @app.component("vote:{poll_id:int}:{choice}")
+            ... async def vote(interaction, poll_id: int, choice: str):
+            ...     await interaction.respond(f"Voted {choice} on poll {poll_id}.")
+            >>> button = ui.Button(label="Yes", custom_id=vote.format(poll_id=1, choice="yes"))
+        """
+
+        def decorator(coro: AsyncFunction) -> ComponentRoute:
+            @wraps(coro)
+            def wrapper(*_: Any, **__: Any) -> ComponentRoute:
+                return self._router.add_route(ComponentRoute(custom_id, coro))
+
+            return wrapper()
+
+        return decorator
 
     def add_command(self, command: Union[Command, Group]) -> Union[Command, Group]:
         """
@@ -316,6 +907,7 @@ class Bot(FastAPI):
             The command you added to :class:`dismake.Bot`.
         """
         self._commands[command.name] = command
+        self._command_table.add(command)
         return command
 
     def command(
@@ -329,6 +921,8 @@ class Bot(FastAPI):
         nsfw: bool | None = None,
         name_localizations: dict[str, str] | None = None,
         description_localizations: dict[str, str] | None = None,
+        defer_after: float | None = None,
+        defer_ephemeral: bool | None = None,
     ) -> Callable[[AsyncFunction], Command]:
         """
         The `command` function is a decorator that registers a function as an application command.
@@ -351,6 +945,11 @@ class Bot(FastAPI):
             Localization dictionary for name field. Values follow the same restrictions as name
         description_localizations: dict[:class:`str`, :class:`str`] | None
             Localization dictionary for description field. Values follow the same restrictions as description
+        defer_after: :class:`float` | None
+            Seconds after which the interaction is deferred automatically if the command has not responded.
+            Overrides the bot wide `defer_after`.
+        defer_ephemeral: :class:`bool` | None
+            Whether the automatic deferral is ephemeral. Overrides the bot wide `defer_ephemeral`.
         """
 
         def decorator(coro: AsyncFunction) -> Command:
@@ -366,9 +965,10 @@ class Bot(FastAPI):
                     guild_only=guild_only,
                     name_localizations=name_localizations,
                     description_localizations=description_localizations,
+                    defer_after=defer_after,
+                    defer_ephemeral=defer_ephemeral,
                 )
-                self._commands[command.name] = command
-                return command
+                return self.add_command(command)
 
             return wrapper()
 
@@ -417,5 +1017,5 @@ class Bot(FastAPI):
             guild_only=guild_only,
             nsfw=nsfw,
         )
-        self._commands[command.name] = command
+        self.add_command(command)
         return command
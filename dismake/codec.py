@@ -0,0 +1,222 @@
+from __future__ import annotations
+import json
+import uuid
+from logging import getLogger
+from typing import Any, Callable, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore
+
+log = getLogger("dismake")
+
+__all__ = (
+    "RawJSON",
+    "JSONCodec",
+    "StdlibCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "get_codec",
+)
+
+# Stands in for a RawJSON while the document around it is encoded. The random part
+# keeps it from matching a string of the document.
+_RAW_MARKER = "dismake-raw-" + uuid.uuid4().hex + "-"
+
+
+class RawJSON:
+    """
+    A JSON document that is already encoded.
+
+    :meth:`JSONCodec.dumps` inserts it as is wherever it appears in the object it
+    encodes, so a payload that never changes is encoded only once.
+
+    Parameters
+    ----------
+    data: :class:`bytes`
+        The UTF-8 encoded JSON document.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"<RawJSON data={self.data!r}>"
+
+
+def _raw_placeholders(raws: List[RawJSON]) -> Callable[[Any], str]:
+    """Returns a `default` hook replacing every RawJSON with a placeholder string."""
+
+    def default(obj: Any) -> str:
+        if isinstance(obj, RawJSON):
+            raws.append(obj)
+            return f"{_RAW_MARKER}{len(raws) - 1}"
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+    return default
+
+
+def _splice(data: bytes, raws: List[RawJSON]) -> bytes:
+    """Replaces the placeholders of `_raw_placeholders` with the documents they stand for."""
+    marker = _RAW_MARKER.encode()
+    for i, raw in enumerate(raws):
+        data = data.replace(b'"%s%d"' % (marker, i), raw.data, 1)
+    return data
+
+
+class JSONCodec:
+    """
+    Base class for the JSON codec used to decode interaction payloads
+    and encode REST request bodies.
+
+    Subclass this to plug in another JSON library. :meth:`dumps` must insert
+    the :class:`RawJSON` documents of the object as they are.
+
+    Attributes
+    ----------
+    name: :class:`str`
+        The name of the codec.
+    """
+
+    name: str = "base"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes a JSON document.
+
+        Parameters
+        ----------
+        data: Union[:class:`bytes`, :class:`str`]
+            The JSON document.
+
+        Returns
+        -------
+        The decoded python object.
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encodes a python object into a JSON document.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to encode.
+
+        Returns
+        -------
+        :class:`bytes`
+            The UTF-8 encoded JSON document.
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+
+class StdlibCodec(JSONCodec):
+    """A JSON codec backed by the standard library :mod:`json` module."""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        raws: List[RawJSON] = []
+        data = json.dumps(
+            obj, separators=(",", ":"), ensure_ascii=False, default=_raw_placeholders(raws)
+        ).encode()
+        return _splice(data, raws) if raws else data
+
+
+class OrjsonCodec(JSONCodec):
+    """A JSON codec backed by `orjson`."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise RuntimeError("orjson is not installed.")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        raws: List[RawJSON] = []
+        data = orjson.dumps(obj, default=_raw_placeholders(raws), option=orjson.OPT_NON_STR_KEYS)
+        return _splice(data, raws) if raws else data
+
+
+class MsgspecCodec(JSONCodec):
+    """A JSON codec backed by `msgspec`."""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise RuntimeError("msgspec is not installed.")
+        self._encoder = msgspec.json.Encoder(enc_hook=self._enc_hook)
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+    @staticmethod
+    def _enc_hook(obj: Any) -> Any:
+        if isinstance(obj, RawJSON):
+            return msgspec.Raw(obj.data)
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_codecs: dict[str, type[JSONCodec]] = {
+    StdlibCodec.name: StdlibCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+
+def get_codec(codec: Optional[Union[JSONCodec, str]] = None) -> JSONCodec:
+    """
+    Resolves a :class:`JSONCodec`.
+
+    Parameters
+    ----------
+    codec: Optional[Union[:class:`JSONCodec`, :class:`str`]]
+        A codec instance, or one of ``"json"``, ``"orjson"`` and ``"msgspec"``.
+        If not given, the fastest installed codec is used. A named codec whose
+        library is not installed falls back to the standard library.
+
+    Returns
+    -------
+    :class:`JSONCodec`
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None:
+        if orjson is not None:
+            return OrjsonCodec()
+        if msgspec is not None:
+            return MsgspecCodec()
+        return StdlibCodec()
+    try:
+        codec_cls = _codecs[codec]
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec {codec!r}.") from None
+    try:
+        return codec_cls()
+    except RuntimeError:
+        log.warning("%s is not installed, falling back to the json module.", codec)
+        return StdlibCodec()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from functools import wraps
 import inspect
-from typing import Any, Optional, TYPE_CHECKING, get_args, get_type_hints, Callable
+from typing import Any, Iterable, Optional, TYPE_CHECKING, Union, get_args, get_type_hints, Callable
 
+from .autocomplete import AutocompleteCache, ChoiceIndex
 from .enums import ChannelType, CommandType, Locale, OptionType
 from .errors import CommandInvokeError
 from .models import (
@@ -21,6 +22,7 @@ if TYPE_CHECKING:
     from .types import AsyncFunction
     from .permissions import Permissions
     from .plugin import Plugin
+    from .models.interaction import ApplicationCommandOption
 
 
 __all__ = ("Command", "Option", "Choice", "Group")
@@ -42,9 +44,12 @@ _option_types = {
 }
 
 
-def _get_options(func: AsyncFunction) -> tuple[Option, ...]:
+def _get_options(
+    func: AsyncFunction,
+) -> tuple[tuple[Option, ...], tuple[tuple[str, str, bool], ...]]:
     """
-    Extracts options from the given command callback.
+    Extracts options from the given command callback, along with the plan
+    used to bind their values to the callback's parameters.
 
     Parameters
     ----------
@@ -53,9 +58,12 @@ def _get_options(func: AsyncFunction) -> tuple[Option, ...]:
 
     Returns
     -------
-    tuple[Option]
+    tuple[tuple[Option], tuple[tuple[str, str, bool]]]
+        The options, and for each of them the option name, the parameter name
+        and whether the parameter is positional only.
     """
     ret: tuple[Option, ...] = tuple()
+    binder: tuple[tuple[str, str, bool], ...] = tuple()
     params = get_type_hints(func, include_extras=True)
     signature = inspect.signature(func)
     for k, v in params.items():
@@ -68,10 +76,14 @@ def _get_options(func: AsyncFunction) -> tuple[Option, ...]:
         if option_object.name is None:
             option_object.name = k
 
+        parameter = signature.parameters[k]
         if option_object.required is None:
-            option_object.required = signature.parameters[k].default == inspect._empty
+            option_object.required = parameter.default is inspect.Parameter.empty
         ret += (option_object,)
-    return ret
+        binder += (
+            (option_object.name, k, parameter.kind is inspect.Parameter.POSITIONAL_ONLY),
+        )
+    return ret, binder
 
 
 def _populate_locales(locale: dict[Locale, str]) -> dict[str, str]:
@@ -107,6 +119,11 @@ class Command:
         Whether the command can be executed in DMs or not.
     nsfw: :class:`bool`
         Whether the command can only be executed in channels marked as NSFW or not.
+    defer_after: :class:`float`
+        Seconds after which the interaction is deferred automatically if the callback
+        has not responded yet. Overrides the bot wide `defer_after`.
+    defer_ephemeral: :class:`bool`
+        Whether the automatic deferral is ephemeral. Overrides the bot wide `defer_ephemeral`.
     """
 
     def __init__(
@@ -120,6 +137,8 @@ class Command:
         default_member_permissions: Permissions | None = None,
         guild_only: bool | None = None,
         nsfw: bool | None = None,
+        defer_after: float | None = None,
+        defer_ephemeral: bool | None = None,
     ) -> None:
         self.name = name
         self.description = description
@@ -134,10 +153,14 @@ class Command:
         self.type: CommandType | OptionType = (
             CommandType.SLASH if self.parent is not None else OptionType.SUB_COMMAND
         )
-        self.options = _get_options(self.callback)
+        self.options, self._binder = _get_options(self.callback)
         self.plugin: Plugin | None = None
         self.autocompletes: dict[str, AsyncFunction] = {}
+        self.autocomplete_caches: dict[str, AutocompleteCache] = {}
+        self.autocomplete_indexes: dict[str, ChoiceIndex] = {}
         self.error_handler: Optional[AsyncFunction] = None
+        self.defer_after = defer_after
+        self.defer_ephemeral = defer_ephemeral
 
     def __str__(self) -> str:
         return self.name
@@ -177,17 +200,18 @@ class Command:
         CommandInvokeError
             The command failed to invoke.
         """
-        args: tuple[Any, ...] = tuple()
-        kwargs: dict[str, Any] = dict()
-        options = interaction.namespace.__dict__
-        params = inspect.signature(self.callback).parameters
-        for k, v in params.items():
-            option: type | None = options.get(k)
-            if option is not None:
-                if v.default != inspect._empty:
-                    kwargs[k] = option
+        args: list[Any] = []
+        kwargs: dict[str, Any] = {}
+        if self._binder:
+            namespace = interaction.namespace
+            for option_name, param, positional in self._binder:
+                value = namespace.get(option_name)
+                if value is None:
+                    continue
+                if positional:
+                    args.append(value)
                 else:
-                    args += (option,)
+                    kwargs[param] = value
         try:
             await self.callback(interaction, *args, **kwargs)
         except Exception as e:
@@ -213,17 +237,61 @@ class Command:
         CommandInvokeError
             The command failed to invoke.
         """
+        data = await self._autocomplete_choices(interaction, name)
+        if data is not None:
+            return await interaction._send_autocomplete(data)
+
+    async def _autocomplete_choices(
+        self, interaction: Interaction, name: str
+    ) -> list[dict[str, Any]] | None:
+        """
+        Returns the serialized choices of an autocomplete, from its cache if it has one.
+
+        Parameters
+        ----------
+        interaction: Interaction
+            The autocomplete interaction.
+        name: str
+            The name of the option to autocomplete.
+        """
+        index = self.autocomplete_indexes.get(name)
+        if index is not None:
+            return index.search(interaction.namespace.get(name))
+
         autocomplete = self.autocompletes.get(name)
         if not autocomplete:
             return None
 
-        choices: list[Choice] | None = await autocomplete(
-            interaction, name=interaction.namespace.__dict__[name]
-        )
-        if choices is not None:
-            return await interaction.autocomplete(choices)
-
-    def autocomplete(self, option: str) -> Callable[[AsyncFunction], AsyncFunction]:
+        value = interaction.namespace.get(name)
+        cache = self.autocomplete_caches.get(name)
+        if cache is None:
+            choices: list[Choice] | None = await autocomplete(interaction, name=value)
+            if choices is None:
+                return None
+            return [choice.to_dict() for choice in choices]
+
+        path = self.qualified_path
+        data = cache.get(interaction, path, name, value)
+        if data is None:
+            choices = await autocomplete(interaction, name=value)
+            if choices is None:
+                return None
+            data = cache.set(interaction, path, name, value, choices)
+        return data
+
+    @property
+    def qualified_path(self) -> tuple[str, ...]:
+        """tuple[:class:`str`, ...]: The names of the parent groups of the command and its name."""
+        path = [self.name]
+        parent = self.parent
+        while parent is not None:
+            path.append(parent.name)
+            parent = parent.parent
+        return tuple(reversed(path))
+
+    def autocomplete(
+        self, option: str, cache: Union[AutocompleteCache, bool, None] = None
+    ) -> Callable[[AsyncFunction], AsyncFunction]:
         """
         Decorator that registers an autocomplete for the command.
 
@@ -231,23 +299,71 @@ class Command:
         ----------
         option: str
             The name of the option to autocomplete.
+        cache: Union[:class:`AutocompleteCache`, bool, None]
+            Caches the choices returned by the autocomplete, either True for an
+            :class:`AutocompleteCache` with the default settings or a configured one.
 
         Returns
         -------
         Callable[[AsyncFunction], AsyncFunction]
             The decorator.
+
+        Example usage
+        -------------
+            >>> @hello.autocomplete("name", cache=dismake.AutocompleteCache(ttl=300, per="guild"))
+            ... async def name_autocomplete(interaction, name):
+            ...     return [dismake.Choice(name=n) for n in await search(name)]
         """
+        if cache is True:
+            cache = AutocompleteCache()
 
         def decorator(coro: AsyncFunction) -> AsyncFunction:
             @wraps(coro)
             def wrapper(*_: Any, **__: Any) -> AsyncFunction:
                 self.autocompletes[option] = coro
+                if cache:
+                    self.autocomplete_caches[option] = cache
+                else:
+                    self.autocomplete_caches.pop(option, None)
                 return coro
 
             return wrapper()
 
         return decorator
 
+    def autocomplete_from(
+        self, option: str, choices: Union[ChoiceIndex, Iterable[Union[Choice, str]]]
+    ) -> ChoiceIndex:
+        """
+        Answers the autocompletes of an option by searching a static list of choices.
+
+        No callback is called: the choices are indexed once and every request is answered
+        with the 25 best matches from the index. This takes precedence over a callback
+        registered with :meth:`autocomplete`.
+
+        Parameters
+        ----------
+        option: str
+            The name of the option to autocomplete.
+        choices: Union[:class:`ChoiceIndex`, Iterable[Union[:class:`Choice`, str]]]
+            The choices, or an index of them to share between options.
+
+        Returns
+        -------
+        :class:`ChoiceIndex`
+            The index of the choices.
+
+        Example usage
+        -------------
+            >>> hello.autocomplete_from("fruit", ["Apple", "Banana", "Mango"])
+        """
+        index = choices if isinstance(choices, ChoiceIndex) else ChoiceIndex(choices)
+        self.autocomplete_indexes[option] = index
+        for opt in self.options:
+            if opt.name == option:
+                opt.autocomplete = True
+        return index
+
     def to_dict(self) -> dict[str, Any]:
         """
         Converts the command into a dictionary.
@@ -277,7 +393,7 @@ class Command:
                     "default_member_permissions"
                 ] = self.default_member_permissions.value
             if self.dm_permission is not None:
-                base["dm_permissions"] = self.dm_permission
+                base["dm_permission"] = self.dm_permission
             if self.nsfw is not None:
                 base["nsfw"] = self.nsfw
         return base
@@ -337,6 +453,7 @@ class Group:
         )
         self.commands: dict[str, Command | Group] = {}
         self.plugin: Plugin | None = None
+        self._table: CommandTable | None = None
         if self.parent:
             if self.parent.parent:
                 raise ValueError("groups can only be nested at most one level")
@@ -371,6 +488,11 @@ class Group:
             raise TypeError("expected Group or Command but got %s" % type(command))
         self.commands[command.name] = command
         command.parent = self
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root._table is not None:
+            root._table.add(root)
         return command
 
     def command(
@@ -384,6 +506,8 @@ class Group:
         nsfw: bool | None = None,
         name_localizations: dict[str, str] | None = None,
         description_localizations: dict[str, str] | None = None,
+        defer_after: float | None = None,
+        defer_ephemeral: bool | None = None,
     ) -> Callable[[AsyncFunction], Command]:
         """
         Decorator that creates a sub command.
@@ -406,6 +530,10 @@ class Group:
             A dictionary of localized names for the command, keyed by language code.
         description_localizations: dict[str, str]|None
             A dictionary of localized descriptions for the command, keyed by
+        defer_after: float | None
+            Seconds after which the interaction is deferred automatically if the command has not responded.
+        defer_ephemeral: bool | None
+            Whether the automatic deferral is ephemeral.
         """
 
         def decorator(coro: AsyncFunction) -> Command:
@@ -419,6 +547,8 @@ class Group:
                 guild_only=guild_only,
                 name_localizations=name_localizations,
                 description_localizations=description_localizations,
+                defer_after=defer_after,
+                defer_ephemeral=defer_ephemeral,
             )
             self.add_command(command)
             return command
@@ -472,6 +602,113 @@ class Group:
         return base
 
 
+_SUB_COMMAND_TYPES = (OptionType.SUB_COMMAND.value, OptionType.SUB_COMMAND_GROUP.value)
+
+
+class CommandTable:
+    """
+    A flat index of the command tree, keyed by the full path of every command,
+    e.g. ``("config", "role", "add")`` for ``/config role add``.
+
+    Root groups indexed by the table reindex themselves when a command is added
+    to them or to one of their sub groups.
+
+    Parameters
+    ----------
+    commands: dict[:class:`str`, Union[:class:`Command`, :class:`Group`]]
+        The root commands of the bot, by name.
+    """
+
+    __slots__ = ("commands", "_table", "_roots")
+
+    def __init__(self, commands: dict[str, Command | Group]) -> None:
+        self.commands = commands
+        self._table: dict[tuple[str, ...], Command] = {}
+        self._roots: dict[str, Command | Group] = {}
+
+    def add(self, command: Command | Group) -> None:
+        """
+        Indexes a root command or group, replacing the previous one with the same name.
+
+        Parameters
+        ----------
+        command: Union[:class:`Command`, :class:`Group`]
+            The root command to index.
+        """
+        self.remove(command.name)
+        self._roots[command.name] = command
+        if isinstance(command, Command):
+            self._table[(command.name,)] = command
+            return
+        command._table = self
+        for child in command.commands.values():
+            if isinstance(child, Command):
+                self._table[(command.name, child.name)] = child
+                continue
+            for leaf in child.commands.values():
+                if isinstance(leaf, Command):
+                    self._table[(command.name, child.name, leaf.name)] = leaf
+
+    def remove(self, name: str) -> None:
+        """
+        Removes a root command or group and all of its sub commands from the index.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The name of the root command.
+        """
+        root = self._roots.pop(name, None)
+        if root is None:
+            return
+        if isinstance(root, Group) and root._table is self:
+            root._table = None
+        for path in [path for path in self._table if path[0] == name]:
+            del self._table[path]
+
+    def items(self) -> list[tuple[tuple[str, ...], Command]]:
+        """
+        Returns the indexed commands with their paths.
+
+        Returns
+        -------
+        list[tuple[tuple[:class:`str`, ...], :class:`Command`]]
+        """
+        return list(self._table.items())
+
+    def resolve(
+        self, data: ApplicationCommandData
+    ) -> tuple[Command, list[ApplicationCommandOption]] | None:
+        """
+        Resolves the command targeted by an interaction.
+
+        Parameters
+        ----------
+        data: :class:`ApplicationCommandData`
+            The data of the interaction.
+
+        Returns
+        -------
+        Optional[tuple[:class:`Command`, list[ApplicationCommandOption]]]
+            The command and its own options, or None if the command is unknown.
+        """
+        path = (data.name,)
+        options = data.options or []
+        while options and options[0].type in _SUB_COMMAND_TYPES:
+            path += (options[0].name,)
+            options = options[0].options or []
+        root = self.commands.get(data.name)
+        if root is None:
+            return None
+        if self._roots.get(data.name) is not root:
+            # The root was replaced without going through the table.
+            self.add(root)
+        command = self._table.get(path)
+        if command is None:
+            return None
+        return command, options
+
+
 class Option:
     """
     Represents a slash command option.
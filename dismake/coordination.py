@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from logging import getLogger
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+    import msvcrt
+
+log = getLogger("dismake")
+
+__all__ = (
+    "LockBackend",
+    "MemoryLockBackend",
+    "FileLockBackend",
+    "LeaderElection",
+)
+
+
+class LockBackend:
+    """
+    Base class for the storage of leases, used to elect a leader among workers.
+
+    A lease is held by one token until it expires or is released. Backends that
+    store leases outside of the process let several workers, or several hosts,
+    running the same bot agree on a single leader.
+    """
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        """
+        Acquires or renews a lease.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The lease key.
+        token: :class:`str`
+            The token identifying the holder.
+        ttl: :class:`float`
+            Seconds until the lease expires if it is not renewed.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether `token` holds the lease, which is the case if the lease was free,
+            expired or already held by `token`.
+        """
+        raise NotImplementedError
+
+    async def release(self, key: str, token: str) -> None:
+        """
+        Releases a lease if it is held by `token`.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The lease key.
+        token: :class:`str`
+            The token identifying the holder.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Releases the resources held by the backend."""
+
+
+class MemoryLockBackend(LockBackend):
+    """Keeps leases in the current process, which makes every process its own leader."""
+
+    def __init__(self) -> None:
+        # key -> (token, expires_at)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        if lease is not None and lease[0] != token and lease[1] > now:
+            return False
+        self._leases[key] = (token, now + ttl)
+        return True
+
+    async def release(self, key: str, token: str) -> None:
+        lease = self._leases.get(key)
+        if lease is not None and lease[0] == token:
+            del self._leases[key]
+
+
+@contextmanager
+def _locked(file: IO[str]) -> Iterator[None]:
+    """Holds an exclusive lock on a file, blocking until it is available."""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileLockBackend(LockBackend):
+    """
+    Keeps leases in lock files, so every process on a host shares them.
+
+    Each lease is a small file holding its token and expiry. It is read and written
+    under an exclusive file lock, in a worker thread so lock contention never blocks
+    the event loop.
+
+    Parameters
+    ----------
+    directory: Optional[:class:`str`]
+        The directory of the lock files, by default the temporary directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or tempfile.gettempdir()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", key) + ".lock")
+
+    def _update(self, key: str, update: Callable[[Optional[Tuple[str, float]]], Optional[str]]) -> Any:
+        """Runs `update` with the current lease and writes the content it returns, if any."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self._path(key), os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+", encoding="utf-8") as file, _locked(file):
+            file.seek(0)
+            parts = file.read().split()
+            lease = (parts[0], float(parts[1])) if len(parts) == 2 else None
+            content = update(lease)
+            if content is not None:
+                file.seek(0)
+                file.truncate()
+                file.write(content)
+                file.flush()
+            return content is not None
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        def update(lease: Optional[Tuple[str, float]]) -> Optional[str]:
+            now = time.time()
+            if lease is not None and lease[0] != token and lease[1] > now:
+                return None
+            return f"{token} {now + ttl}"
+
+        return self._update(key, update)
+
+    def _release(self, key: str, token: str) -> None:
+        def update(lease: Optional[Tuple[str, float]]) -> Optional[str]:
+            # The file is emptied rather than removed, so it is always the one being locked.
+            return "" if lease is not None and lease[0] == token else None
+
+        self._update(key, update)
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self._acquire, key, token, ttl)
+
+    async def release(self, key: str, token: str) -> None:
+        await asyncio.to_thread(self._release, key, token)
+
+
+class LeaderElection:
+    """
+    Elects a single leader among the workers sharing a :class:`LockBackend`.
+
+    The leader holds a lease that it renews every third of `ttl`. The other workers
+    try to take the lease at the same pace, so one of them becomes the leader once
+    the leader shuts down or stops renewing it.
+
+    Parameters
+    ----------
+    backend: :class:`LockBackend`
+        The storage of the lease.
+    key: :class:`str`
+        The lease key, shared by every worker of the deployment.
+    ttl: :class:`float`
+        Seconds until the lease of a leader that stopped renewing it expires, by default 30.
+    on_elected: Optional[Callable[[], None]]
+        Called every time this worker becomes the leader.
+
+    Attributes
+    ----------
+    token: :class:`str`
+        The token identifying this worker.
+    is_leader: :class:`bool`
+        Whether this worker is the leader.
+    """
+
+    def __init__(
+        self,
+        backend: LockBackend,
+        key: str,
+        ttl: float = 30.0,
+        on_elected: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.backend = backend
+        self.key = key
+        self.ttl = ttl
+        self.on_elected = on_elected
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+        self._expires_at = 0.0
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def start(self) -> bool:
+        """
+        Runs an election and keeps taking part in them in the background.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether this worker was elected.
+        """
+        await self._elect()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self.is_leader
+
+    async def stop(self) -> None:
+        """Stops taking part in elections and releases the lease if this worker holds it."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                await self.backend.release(self.key, self.token)
+            except Exception as e:
+                log.warning("Could not release the leader lease: %s", e)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await self._elect()
+
+    async def _elect(self) -> None:
+        now = time.monotonic()
+        try:
+            acquired = await self.backend.acquire(self.key, self.token, self.ttl)
+        except Exception as e:
+            log.warning("Could not reach the lock backend: %s", e)
+            # The lease is still ours until it expires.
+            acquired = self.is_leader and now < self._expires_at
+        else:
+            if acquired:
+                self._expires_at = now + self.ttl
+        if acquired and not self.is_leader:
+            self.is_leader = True
+            log.info("This worker was elected leader.")
+            if self.on_elected is not None:
+                self.on_elected()
+        elif not acquired and self.is_leader:
+            self.is_leader = False
+            log.warning("This worker lost the leader lease.")
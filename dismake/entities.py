@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TYPE_CHECKING, Union
+
+from httpx import Response
+from pydantic import parse_obj_as
+
+from .cache import TTLCache
+from .models import Channel, Guild, Member, Role
+
+if TYPE_CHECKING:
+    from .http import HttpClient
+
+
+__all__ = ("EntityCache",)
+
+_KINDS = ("guild", "channel", "role", "member")
+
+_DEFAULT_TTL = {"guild": 300.0, "channel": 300.0, "role": 300.0, "member": 60.0}
+
+_DEFAULT_MAXSIZE = {"guild": 1000, "channel": 10000, "role": 10000, "member": 10000}
+
+_MODELS = {"guild": Guild, "role": Role, "member": Member}
+
+
+def _snowflake(value: Any) -> Optional[int]:
+    """Returns an ID of a payload as an int, or None if it is missing or malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Entry:
+    __slots__ = ("raw", "parse", "_model")
+
+    def __init__(self, raw: Dict[str, Any], parse: Callable[[Dict[str, Any]], Any]) -> None:
+        self.raw = raw
+        self.parse = parse
+        self._model: Any = None
+
+    @property
+    def model(self) -> Any:
+        # Entries are parsed on first read, so warming the cache costs no model build.
+        if self._model is None:
+            self._model = self.parse(self.raw)
+        return self._model
+
+
+class _NotFound:
+    __slots__ = ("response",)
+
+    def __init__(self, response: Response) -> None:
+        self.response = response
+
+
+class EntityCache:
+    """
+    Caches the guilds, channels, roles and members fetched from Discord.
+
+    Every kind of entity has its own least recently used cache with its own expiry.
+    Entities that do not exist are remembered too, for `negative_ttl` seconds, and
+    concurrent fetches of the same missing entity share a single request.
+
+    The cache is also filled with the member of every guild interaction and with the
+    roles and members of its resolved data, so looking them up costs no request.
+    Resolved members lack the ``deaf`` and ``mute`` fields. Resolved channels are
+    partial and are not cached.
+
+    Parameters
+    ----------
+    http: :class:`HttpClient`
+        The client used to fetch the entities.
+    ttl: Optional[dict[:class:`str`, Optional[:class:`float`]]]
+        Seconds the entities of a kind are cached for, by ``"guild"``, ``"channel"``,
+        ``"role"`` or ``"member"``. By default 300, and 60 for members.
+    maxsize: Optional[dict[:class:`str`, :class:`int`]]
+        The maximum number of cached entities of a kind, by default 1000 guilds
+        and 10000 channels, roles and members.
+    negative_ttl: :class:`float`
+        Seconds an entity that was not found is remembered for, by default 30.
+    strict: :class:`bool`
+        Whether fetched entities are fully validated, see :meth:`BaseModel.from_payload`.
+    warm_interactions: :class:`bool`
+        Whether the bot caches the entities of every interaction it receives, see :meth:`warm`.
+        By default True.
+    """
+
+    __slots__ = (
+        "negative_ttl",
+        "strict",
+        "warm_interactions",
+        "_http",
+        "_caches",
+        "_pending",
+        "_counters",
+    )
+
+    def __init__(
+        self,
+        http: HttpClient,
+        ttl: Optional[Dict[str, Optional[float]]] = None,
+        maxsize: Optional[Dict[str, int]] = None,
+        negative_ttl: float = 30.0,
+        strict: bool = False,
+        warm_interactions: bool = True,
+    ) -> None:
+        for kind in (*(ttl or ()), *(maxsize or ())):
+            if kind not in _KINDS:
+                raise ValueError(f"Unknown entity kind {kind!r}, expected one of {', '.join(_KINDS)}.")
+        ttl = {**_DEFAULT_TTL, **(ttl or {})}
+        maxsize = {**_DEFAULT_MAXSIZE, **(maxsize or {})}
+        self.negative_ttl = negative_ttl
+        self.strict = strict
+        self.warm_interactions = warm_interactions
+        self._http = http
+        self._caches: Dict[str, TTLCache[Hashable, Union[_Entry, _NotFound]]] = {
+            kind: TTLCache(maxsize[kind], ttl=ttl[kind]) for kind in _KINDS
+        }
+        self._pending: Dict[Tuple[str, Hashable], asyncio.Task[Union[_Entry, _NotFound]]] = {}
+        self._counters: Dict[str, Counter[str]] = {kind: Counter() for kind in _KINDS}
+
+    def _parser(self, kind: str, partial: bool = False) -> Callable[[Dict[str, Any]], Any]:
+        if kind == "channel":
+            return lambda data: parse_obj_as(Channel, data)  # type: ignore
+        model = _MODELS[kind]
+        if partial:
+            return lambda data: model.from_payload(data, partial=True)  # type: ignore
+        return model if self.strict else model.from_payload  # type: ignore
+
+    async def fetch_guild(self, guild_id: int) -> Guild:
+        """
+        Returns a guild, fetched from Discord if it is not cached.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+
+        Raises
+        ------
+        HTTPStatusError
+            The guild does not exist or the request failed.
+        """
+        guild_id = int(guild_id)
+        return await self._get("guild", guild_id, f"/guilds/{guild_id}")
+
+    async def fetch_channel(self, channel_id: int) -> Channel:
+        """
+        Returns a channel, fetched from Discord if it is not cached.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The ID of the channel.
+
+        Raises
+        ------
+        HTTPStatusError
+            The channel does not exist or the request failed.
+        """
+        channel_id = int(channel_id)
+        return await self._get("channel", channel_id, f"/channels/{channel_id}")
+
+    async def fetch_role(self, guild_id: int, role_id: int) -> Role:
+        """
+        Returns a role of a guild, fetched from Discord if it is not cached.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        role_id: :class:`int`
+            The ID of the role.
+
+        Raises
+        ------
+        HTTPStatusError
+            The role does not exist or the request failed.
+        """
+        guild_id, role_id = int(guild_id), int(role_id)
+        return await self._get("role", (guild_id, role_id), f"/guilds/{guild_id}/roles/{role_id}")
+
+    async def fetch_member(self, guild_id: int, user_id: int) -> Member:
+        """
+        Returns a member of a guild, fetched from Discord if it is not cached.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The ID of the guild.
+        user_id: :class:`int`
+            The ID of the user.
+
+        Raises
+        ------
+        HTTPStatusError
+            The member does not exist or the request failed.
+        """
+        guild_id, user_id = int(guild_id), int(user_id)
+        return await self._get(
+            "member", (guild_id, user_id), f"/guilds/{guild_id}/members/{user_id}"
+        )
+
+    async def _get(self, kind: str, key: Hashable, url: str) -> Any:
+        entry = self._caches[kind].get(key)
+        if entry is None:
+            pending = self._pending.get((kind, key))
+            if pending is None:
+                pending = asyncio.ensure_future(self._fetch(kind, key, url))
+                self._pending[(kind, key)] = pending
+                pending.add_done_callback(lambda task: self._done(kind, key, task))
+            else:
+                self._counters[kind]["coalesced"] += 1
+            # Shielded so a caller that goes away does not cancel the callers sharing the fetch.
+            entry = await asyncio.shield(pending)
+        elif isinstance(entry, _NotFound):
+            self._counters[kind]["negative_hits"] += 1
+        if isinstance(entry, _NotFound):
+            entry.response.raise_for_status()
+        return entry.model
+
+    async def _fetch(self, kind: str, key: Hashable, url: str) -> Union[_Entry, _NotFound]:
+        self._counters[kind]["fetches"] += 1
+        res = await self._http.request(method="GET", url=url)
+        entry: Union[_Entry, _NotFound]
+        if res.status_code == 404:
+            entry = _NotFound(res)
+            self._caches[kind].set(key, entry, ttl=self.negative_ttl)
+            return entry
+        res.raise_for_status()
+        entry = _Entry(self._http.json(res), self._parser(kind))
+        self._caches[kind].set(key, entry)
+        return entry
+
+    def _done(self, kind: str, key: Hashable, task: asyncio.Task[Any]) -> None:
+        del self._pending[(kind, key)]
+        if not task.cancelled():
+            # Retrieved so that an error nobody waits for anymore is not reported.
+            task.exception()
+
+    def _warm(self, kind: str, key: Hashable, data: Dict[str, Any]) -> None:
+        self._caches[kind].set(key, _Entry(data, self._parser(kind, partial=True)))
+        self._counters[kind]["warmed"] += 1
+
+    def warm(self, payload: Dict[str, Any]) -> None:
+        """
+        Caches the member and the resolved roles and members of an interaction.
+
+        Entries whose ID is missing or malformed are skipped.
+
+        Parameters
+        ----------
+        payload: dict[str, Any]
+            The raw interaction payload.
+        """
+        guild_id = _snowflake(payload.get("guild_id"))
+        if guild_id is None:
+            return
+        member = payload.get("member")
+        if member is not None and (user := member.get("user")) is not None:
+            if (user_id := _snowflake(user.get("id"))) is not None:
+                self._warm("member", (guild_id, user_id), member)
+        data = payload.get("data")
+        resolved = data.get("resolved") if data else None
+        if not resolved:
+            return
+        for role_id, role in (resolved.get("roles") or {}).items():
+            if (id := _snowflake(role_id)) is not None:
+                self._warm("role", (guild_id, id), role)
+        users = resolved.get("users") or {}
+        for user_id, member in (resolved.get("members") or {}).items():
+            user = users.get(user_id)
+            if user is not None and (id := _snowflake(user_id)) is not None:
+                self._warm("member", (guild_id, id), {**member, "user": user})
+
+    def invalidate(self, kind: str, *key: int) -> None:
+        """
+        Removes an entity from the cache.
+
+        Parameters
+        ----------
+        kind: :class:`str`
+            ``"guild"``, ``"channel"``, ``"role"`` or ``"member"``.
+        *key: :class:`int`
+            The ID of the guild or channel, or the IDs of the guild and of the role or user.
+        """
+        ids = tuple(int(id) for id in key)
+        self._caches[kind].pop(ids[0] if len(ids) == 1 else ids)
+
+    def expire(self) -> int:
+        """
+        Removes every expired entity.
+
+        Returns
+        -------
+        :class:`int`
+            The number of removed entities.
+        """
+        return sum(cache.expire() for cache in self._caches.values())
+
+    def clear(self) -> None:
+        """Removes every cached entity."""
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the size and the counters of the cache of every kind of entity.
+
+        Returns
+        -------
+        dict[str, dict[str, int]]
+            The :meth:`TTLCache.stats` of every kind, with the number of ``fetches``,
+            of ``coalesced`` fetches, of ``negative_hits`` on entities that were not
+            found and of entities ``warmed`` from interactions.
+        """
+        stats = {}
+        for kind, cache in self._caches.items():
+            counters = self._counters[kind]
+            stats[kind] = {
+                **cache.stats(),
+                **{
+                    name: counters[name]
+                    for name in ("fetches", "coalesced", "negative_hits", "warmed")
+                },
+            }
+        return stats
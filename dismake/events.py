@@ -0,0 +1,478 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import deque
+from logging import getLogger
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from .enums import InteractionType
+
+if TYPE_CHECKING:
+    from .models import Interaction
+    from .types import AsyncFunction
+
+
+log = getLogger("dismake")
+
+__all__ = ("EventBus",)
+
+_OVERFLOW_POLICIES = ("drop", "block", "sample")
+
+_Call = Tuple["AsyncFunction", Tuple[Any, ...], Dict[str, Any]]
+
+
+def _interaction_filter(
+    types: Optional[Iterable[Union[InteractionType, int]]] = None,
+    commands: Optional[Iterable[str]] = None,
+    filter: Optional[Callable[..., bool]] = None,
+) -> Optional[Callable[..., bool]]:
+    """
+    Builds the filter of a listener whose first argument is an :class:`Interaction`.
+
+    Returns None if there is nothing to filter on.
+    """
+    if types is None and commands is None:
+        return filter
+    type_values = (
+        None
+        if types is None
+        else frozenset(t.value if isinstance(t, InteractionType) else t for t in types)
+    )
+    names = None if commands is None else frozenset(commands)
+
+    def check(interaction: Interaction, *args: Any, **kwargs: Any) -> bool:
+        if type_values is not None and interaction.type not in type_values:
+            return False
+        if names is not None and getattr(interaction.data, "name", None) not in names:
+            return False
+        return filter is None or filter(interaction, *args, **kwargs)
+
+    return check
+
+
+class _Listener:
+    __slots__ = ("coro", "sample", "filter")
+
+    def __init__(
+        self,
+        coro: AsyncFunction,
+        sample: float = 1.0,
+        filter: Optional[Callable[..., bool]] = None,
+    ) -> None:
+        if not 0.0 <= sample <= 1.0:
+            raise ValueError("sample must be between 0 and 1.")
+        self.coro = coro
+        self.sample = sample
+        self.filter = filter
+
+    def accepts(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bool:
+        # Sampling is independent of the filter, so the cheaper check runs first.
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return False
+        if self.filter is None:
+            return True
+        try:
+            return self.filter(*args, **kwargs)
+        except Exception as e:
+            # A broken filter skips its listener rather than failing the dispatch.
+            log.error("An error occured in the filter of %s", self.coro.__name__, exc_info=e)
+            return False
+
+
+class _EventQueue:
+    __slots__ = (
+        "queue",
+        "backlog",
+        "loop",
+        "concurrency",
+        "max_queue",
+        "overflow",
+        "workers",
+        "queued",
+        "processed",
+        "dropped",
+        "failed",
+        "skipped",
+    )
+
+    def __init__(self, concurrency: int, max_queue: int, overflow: str) -> None:
+        # The queue is created in the loop its workers run in. Calls dispatched
+        # before that loop runs wait in the backlog.
+        self.queue: Optional[asyncio.Queue[_Call]] = None
+        self.backlog: Deque[_Call] = deque()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.workers: Set[asyncio.Task[None]] = set()
+        self.queued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def qsize(self) -> int:
+        return len(self.backlog) + (self.queue.qsize() if self.queue is not None else 0)
+
+    def full(self) -> bool:
+        return 0 < self.max_queue <= self.qsize()
+
+    def put_nowait(self, call: _Call) -> None:
+        if self.queue is None:
+            self.backlog.append(call)
+        else:
+            self.queue.put_nowait(call)
+
+
+class EventBus:
+    """
+    Runs event listeners from bounded queues.
+
+    Every event has its own queue, consumed by a fixed number of worker tasks, so
+    a burst of events never schedules more listener calls than the queue holds.
+    Queues and workers are created in the running event loop when the event is first
+    dispatched there. Events dispatched before the loop runs wait until then.
+    Listeners can be sampled and filtered, which is checked before anything is queued.
+    What happens to an event dispatched to a full queue is set by the overflow policy:
+
+    - ``"drop"``: the event is dropped.
+    - ``"block"``: :meth:`emit` waits for room in the queue. :meth:`dispatch` cannot
+      wait and drops the event.
+    - ``"sample"``: once the queue is half full, events are dropped at random, with a
+      probability growing from 0 to 1 as the queue fills up.
+
+    Parameters
+    ----------
+    concurrency: :class:`int`
+        The number of listener calls of an event running at once, by default 4.
+    max_queue: :class:`int`
+        The number of listener calls of an event waiting to run, by default 1000.
+    overflow: :class:`str`
+        The overflow policy, one of ``"drop"``, ``"block"`` and ``"sample"``, by default ``"drop"``.
+    """
+
+    def __init__(self, concurrency: int = 4, max_queue: int = 1000, overflow: str = "drop") -> None:
+        self._check_overflow(overflow)
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.listeners: Dict[str, List[_Listener]] = {}
+        self._config: Dict[str, Tuple[int, int, str]] = {}
+        self._queues: Dict[str, _EventQueue] = {}
+        self._closed = False
+
+    @staticmethod
+    def _check_overflow(overflow: str) -> None:
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {', '.join(_OVERFLOW_POLICIES)}, not {overflow!r}."
+            )
+
+    @staticmethod
+    def _name(event: str) -> str:
+        return event if event.startswith("on_") else "on_" + event
+
+    def add_listener(
+        self,
+        event: str,
+        coro: AsyncFunction,
+        *,
+        sample: float = 1.0,
+        filter: Optional[Callable[..., bool]] = None,
+    ) -> None:
+        """
+        Registers a listener.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        coro: AsyncFunction
+            The coroutine function called with the arguments of the event.
+        sample: :class:`float`
+            The fraction of the events the listener is called for, by default 1.
+        filter: Optional[Callable[..., :class:`bool`]]
+            Called with the arguments of the event, the listener is only called if it returns True.
+            If it raises, the error is logged and the listener is not called.
+
+        Raises
+        ------
+        ValueError
+            `sample` is not between 0 and 1.
+        """
+        listener = _Listener(coro, sample, filter)
+        self.listeners.setdefault(self._name(event), []).append(listener)
+
+    def has_listeners(self, event: str) -> bool:
+        """
+        Returns whether an event has listeners.
+
+        Checking it first lets callers skip building the arguments of events nobody listens to.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        """
+        return bool(self.listeners.get(self._name(event)))
+
+    def remove_listener(self, event: str, coro: AsyncFunction) -> None:
+        """
+        Unregisters a listener.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        coro: AsyncFunction
+            The registered coroutine function.
+        """
+        listeners = self.listeners.get(self._name(event))
+        if listeners is None:
+            return
+        for listener in listeners:
+            if listener.coro is coro:
+                listeners.remove(listener)
+                return
+
+    def configure(
+        self,
+        event: str,
+        *,
+        concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        overflow: Optional[str] = None,
+    ) -> None:
+        """
+        Overrides the queue settings of an event.
+
+        This must be called before the event is first dispatched.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        concurrency: Optional[:class:`int`]
+            The number of listener calls running at once.
+        max_queue: Optional[:class:`int`]
+            The number of listener calls waiting to run.
+        overflow: Optional[:class:`str`]
+            The overflow policy.
+
+        Raises
+        ------
+        RuntimeError
+            The event was already dispatched.
+        """
+        name = self._name(event)
+        if name in self._queues:
+            raise RuntimeError(f"The event {name!r} was already dispatched.")
+        if overflow is not None:
+            self._check_overflow(overflow)
+        self._config[name] = (
+            concurrency or self.concurrency,
+            max_queue or self.max_queue,
+            overflow or self.overflow,
+        )
+
+    def _get_queue(self, name: str) -> _EventQueue:
+        queue = self._queues.get(name)
+        if queue is None:
+            config = self._config.get(name, (self.concurrency, self.max_queue, self.overflow))
+            queue = self._queues[name] = _EventQueue(*config)
+        self._start(queue)
+        return queue
+
+    def _start(self, queue: _EventQueue) -> None:
+        """Creates the queue and the workers of an event in the running loop, if any."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Queued calls run once the workers start on the next dispatch in the loop.
+            return
+        if queue.loop is not loop:
+            # Calls left in the queue of a previous loop are moved to the new one,
+            # whose workers replace the ones that ran in the previous loop.
+            calls = list(queue.backlog)
+            queue.backlog.clear()
+            if queue.queue is not None:
+                while not queue.queue.empty():
+                    calls.append(queue.queue.get_nowait())
+            queue.queue = asyncio.Queue(queue.max_queue)
+            queue.loop = loop
+            queue.workers = set()
+            # A bus closed in a previous loop runs again in this one.
+            self._closed = False
+            for call in calls:
+                queue.queue.put_nowait(call)
+        if not queue.workers:
+            for _ in range(queue.concurrency):
+                queue.workers.add(asyncio.ensure_future(self._work(queue, queue.queue)))
+
+    async def _work(self, queue: _EventQueue, calls: asyncio.Queue[_Call]) -> None:
+        while True:
+            coro, args, kwargs = await calls.get()
+            try:
+                await coro(*args, **kwargs)
+            except Exception as e:
+                queue.failed += 1
+                log.error("An error occured in %s", coro.__name__, exc_info=e)
+            else:
+                queue.processed += 1
+            finally:
+                calls.task_done()
+
+    def _admit(self, queue: _EventQueue) -> bool:
+        if queue.full():
+            return False
+        if queue.overflow == "sample" and queue.max_queue > 0:
+            fill = queue.qsize() / queue.max_queue
+            return fill < 0.5 or random.random() < 2 * (1 - fill)
+        return True
+
+    def dispatch(self, event: str, *args: Any, **kwargs: Any) -> int:
+        """
+        Queues a call of every listener of an event without waiting.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        *args: Any
+            Positional arguments passed to the listeners.
+        **kwargs: Any
+            Keyword arguments passed to the listeners.
+
+        Returns
+        -------
+        :class:`int`
+            The number of queued listener calls.
+        """
+        name = self._name(event)
+        listeners = self.listeners.get(name)
+        if not listeners:
+            return 0
+        queue = self._get_queue(name)
+        count = 0
+        for listener in listeners:
+            if not listener.accepts(args, kwargs):
+                queue.skipped += 1
+                continue
+            if self._closed or not self._admit(queue):
+                queue.dropped += 1
+                continue
+            queue.put_nowait((listener.coro, args, kwargs))
+            queue.queued += 1
+            count += 1
+        return count
+
+    async def emit(self, event: str, *args: Any, **kwargs: Any) -> int:
+        """
+        Queues a call of every listener of an event.
+
+        Unlike :meth:`dispatch`, this waits for room in the queue when the overflow
+        policy of the event is ``"block"``.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name, with or without the ``on_`` prefix.
+        *args: Any
+            Positional arguments passed to the listeners.
+        **kwargs: Any
+            Keyword arguments passed to the listeners.
+
+        Returns
+        -------
+        :class:`int`
+            The number of queued listener calls.
+        """
+        name = self._name(event)
+        listeners = self.listeners.get(name)
+        if not listeners:
+            return 0
+        queue = self._get_queue(name)
+        if queue.overflow != "block":
+            return self.dispatch(name, *args, **kwargs)
+        count = 0
+        for listener in listeners:
+            if not listener.accepts(args, kwargs):
+                queue.skipped += 1
+                continue
+            if self._closed:
+                queue.dropped += 1
+                continue
+            assert queue.queue is not None
+            await queue.queue.put((listener.coro, args, kwargs))
+            queue.queued += 1
+            count += 1
+        return count
+
+    def start(self) -> None:
+        """Accepts events again after :meth:`close`."""
+        self._closed = False
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops accepting events, until :meth:`start` is called, and waits for the queued listener calls to run.
+
+        Parameters
+        ----------
+        timeout: Optional[:class:`float`]
+            Seconds to wait before cancelling the calls that are still queued or running.
+        """
+        self._closed = True
+        queues = list(self._queues.values())
+        for queue in queues:
+            self._start(queue)
+        if queues:
+            joins = [asyncio.ensure_future(queue.queue.join()) for queue in queues]  # type: ignore
+            _, pending = await asyncio.wait(joins, timeout=timeout)
+            for join in pending:
+                join.cancel()
+            if pending:
+                log.warning(
+                    "Event listeners did not finish in time, cancelling them and %s queued calls.",
+                    sum(queue.qsize() for queue in queues),
+                )
+        workers = [worker for queue in queues for worker in queue.workers]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in queues:
+            queue.workers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the counters of every dispatched event.
+
+        Returns
+        -------
+        dict[str, dict[str, int]]
+            The number of queued, pending, processed, dropped and failed listener calls
+            per event, and the number of calls skipped by sampling or filters.
+        """
+        return {
+            name: {
+                "queued": queue.queued,
+                "pending": queue.qsize(),
+                "processed": queue.processed,
+                "dropped": queue.dropped,
+                "failed": queue.failed,
+                "skipped": queue.skipped,
+            }
+            for name, queue in self._queues.items()
+        }
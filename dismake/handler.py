@@ -1,13 +1,13 @@
 from __future__ import annotations
+import asyncio
 from logging import getLogger
-from typing import Any, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
 from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from nacl.exceptions import BadSignatureError
-from nacl.signing import VerifyKey
+from starlette.background import BackgroundTask
 
-from .commands import Command, Group
+from .autocomplete import AutocompleteCoalescer
+from .commands import Command
 from .enums import InteractionResponseType, InteractionType
 from .models import (
     ApplicationCommandData,
@@ -15,6 +15,7 @@ from .models import (
     MessageComponentData,
     ModalSubmitData,
 )
+from .verification import SignatureVerifier
 
 if TYPE_CHECKING:
     from .client import Bot
@@ -22,6 +23,16 @@ if TYPE_CHECKING:
 log = getLogger("uvicorn")
 
 
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def _acknowledge(future: asyncio.Future[None]) -> None:
+    # A coroutine, Starlette runs plain functions in a thread.
+    _resolve(future)
+
+
 class InteractionHandler:
     """
     Handles interactions.
@@ -30,17 +41,21 @@ class InteractionHandler:
     ----------
     client: :class:`Bot`
         The bot object.
+    verifier: Optional[:class:`SignatureVerifier`]
+        Verifies the requests, by default a :class:`SignatureVerifier` with the public key of the bot.
     """
 
-    __slots__ = ("client", "verification_key")
+    __slots__ = ("client", "verifier", "autocompletes", "_in_flight")
 
-    def __init__(self, client: Bot) -> None:
+    def __init__(self, client: Bot, verifier: Optional[SignatureVerifier] = None) -> None:
         self.client = client
-        self.verification_key = VerifyKey(bytes.fromhex(client._client_public_key))
+        self.verifier = verifier or SignatureVerifier(client._client_public_key)
+        self.autocompletes = AutocompleteCoalescer()
+        self._in_flight = 0
 
-    def verify_key(self, body: bytes, signature: str, timestamp: str) -> bool | None:
+    def verify_key(self, body: bytes, signature: str, timestamp: str) -> bool:
         """
-        Verifies the signature of the request.
+        Verifies the signature, the timestamp and the freshness of the request.
 
         Parameters
         ----------
@@ -53,155 +68,205 @@ class InteractionHandler:
 
         Returns
         -------
-        Whether the signature is valid.
+        Whether the request is valid.
         """
-        message = timestamp.encode() + body
-        try:
-            self.verification_key.verify(message, bytes.fromhex(signature))
-            return True
-        except BadSignatureError:
-            log.error("Bad signature request.")
-            return None
-        except Exception as e:
-            log.exception(e)
-            return False
+        return self.verifier.check(body, signature, timestamp)
 
-    async def _handle_command(self, request: Request) -> None:
+    async def verify_request(self, body: bytes, signature: str, timestamp: str) -> bool:
         """
-        Handles a command request.
+        Verifies a request before it is handled.
+
+        By default the :attr:`verifier` checks it, in its executor if many requests are
+        being handled. If a subclass overrides :meth:`verify_key`, it is used instead.
 
         Parameters
         ----------
-        request: :class:`Request`
-            The request object.
+        body: :class:`bytes`
+            The body of the request.
+        signature: :class:`str`
+            The signature of the request.
+        timestamp: :class:`str`
+            The timestamp of the request.
 
         Returns
         -------
-        The response object.
+        Whether the request is valid.
+        """
+        if type(self).verify_key is not InteractionHandler.verify_key:
+            return self.verify_key(body, signature, timestamp)
+        return await self.verifier.verify(body, signature, timestamp, load=self._in_flight)
+
+    def _json_response(
+        self, content: Any, background: Optional[BackgroundTask] = None
+    ) -> Response:
+        """
+        Encodes a JSON response body with the bot's :class:`JSONCodec`.
+
+        Parameters
+        ----------
+        content: Any
+            The JSON serializable content.
+        background: Optional[:class:`BackgroundTask`]
+            Run once the response is sent.
+        """
+        return Response(
+            content=self.client._codec.dumps(content),
+            media_type="application/json",
+            background=background,
+        )
+
+    async def _handle_command(self, interaction: Interaction) -> None:
+        """
+        Handles a command request.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
         """
-        payload: dict[str, Any] = await request.json()
-        interaction = Interaction(request=request, data=payload)
         assert isinstance(interaction.data, ApplicationCommandData)
-        if (data := interaction.data) is not None:
-            command = self.client._commands.get(data.name)
-            if command is not None:
-                if isinstance(command, Command):
-                    await command.invoke(interaction)
-                elif isinstance(command, Group):
-                    assert data.options is not None, "Invalid data recieved."
-                    child_2 = command.commands.get(data.options[0].name)
-                    if isinstance(child_2, Group):
-                        assert (
-                            data.options[0].options is not None
-                        ), "Invalid data recieved."
-                        child_3 = child_2.commands.get(data.options[0].options[0].name)
-                        assert isinstance(
-                            child_3, Command
-                        ), f"command {child_3} is too nested."
-                        await child_3.invoke(interaction)
-                    if isinstance(child_2, Command):
-                        await child_2.invoke(interaction)
-
-    async def _handle_autocomplete(self, request: Request) -> Any:
+        resolved = self.client._command_table.resolve(interaction.data)
+        if resolved is not None:
+            await self._invoke_command(resolved[0], interaction)
+
+    async def _invoke_command(self, command: Command, interaction: Interaction) -> Any:
         """
-        Handles an autocomplete request.
+        Invokes a command, deferring the interaction on the callback's behalf
+        if it has not responded by the command's or the bot's `defer_after` deadline.
+
+        Once deferred, the callback keeps running in the background.
 
         Parameters
         ----------
-        request: :class:`Request`
-            The request object.
+        command: :class:`Command`
+            The command to invoke.
+        interaction: :class:`Interaction`
+            The interaction that triggered the command.
+        """
+        deadline = (
+            command.defer_after
+            if command.defer_after is not None
+            else self.client.defer_after
+        )
+        if deadline is None:
+            return await command.invoke(interaction)
+
+        task = asyncio.ensure_future(command.invoke(interaction))
+        await asyncio.wait((task,), timeout=deadline)
+        if task.done():
+            return task.result()
+        if not interaction.is_responded:
+            log.debug("Deferring %r after %ss.", command.name, deadline)
+            ephemeral = (
+                command.defer_ephemeral
+                if command.defer_ephemeral is not None
+                else self.client.defer_ephemeral
+            )
+            inline = (
+                interaction._inline_response is not None
+                and not interaction._inline_response.done()
+            )
+            # The responses of the callback wait for this: the original
+            # response only exists once the deferral reached Discord.
+            deferral: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            interaction._deferral = deferral
+            interaction._deferred_ephemeral = ephemeral
+            interaction._auto_deferred = True
+            try:
+                await interaction._defer(ephemeral=ephemeral)
+            finally:
+                # An inline deferral is only sent with the webhook response, see _respond_inline.
+                if not inline:
+                    _resolve(deferral)
+            self.client.metrics["auto_defers"] += 1
+        self.client._track_task(task)
+
+    async def _handle_autocomplete(self, interaction: Interaction) -> Any:
         """
-        payload: dict[str, Any] = await request.json()
-        interaction = Interaction(request=request, data=payload)
+        Handles an autocomplete request.
 
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
+        """
         if not (
             interaction.data is not None
             and isinstance(interaction.data, ApplicationCommandData)
             and interaction.is_autocomplete
         ):
             return
-        if not (command := self.client.get_command(interaction.data.name)):
+        if (resolved := self.client._command_table.resolve(interaction.data)) is None:
             return
+        command, options = resolved
+        if not options:
+            return
+        focused = next((option for option in options if option.focused), None)
+        if focused is None:
+            raise ValueError("No focus items! Probably this is a discord bug.")
+        if focused.name in command.autocomplete_indexes:
+            # Answered at once from the index, there is nothing to coalesce.
+            return await command.invoke_autocomplete(interaction, focused.name)
+        return await self.autocompletes.run(interaction, command, focused.name)
 
-        if isinstance(command, Command) and interaction.data.options is not None:
-            options = interaction.data.options
-            focused = list(filter(lambda x: x.focused is True, options))
-            if not focused:
-                raise ValueError("No focus items! Probably this is a discord bug.")
-            return await command.invoke_autocomplete(interaction, name=focused[0].name)
-
-        if isinstance(command, Group) and interaction.data.options is not None:
-            child_2 = command.commands.get(interaction.data.options[0].name)
-            if (
-                isinstance(child_2, Command)
-                and interaction.data.options[0].options is not None
-            ):
-                options = interaction.data.options[0].options
-                focused = list(filter(lambda x: x.focused is True, options))
-                if not focused:
-                    raise ValueError("No focus items! Probably this is a discord bug.")
-                return await child_2.invoke_autocomplete(
-                    interaction, name=focused[0].name
-                )
-            if isinstance(child_2, Group) and interaction.data.options[0].options:
-                child_3 = child_2.commands.get(
-                    interaction.data.options[0].options[0].name
-                )
-                if (
-                    isinstance(child_3, Command)
-                    and interaction.data.options[0].options[0].options is not None
-                ):
-                    options = interaction.data.options[0].options[0].options
-                    focused = list(filter(lambda x: x.focused is True, options))
-                    if not focused:
-                        raise ValueError(
-                            "No focus items! Probably this is a discord bug."
-                        )
-                    return await child_3.invoke_autocomplete(
-                        interaction, name=focused[0].name
-                    )
-
-    async def _handle_message_component(self, request: Request) -> Any:
+    async def _handle_message_component(self, interaction: Interaction) -> Any:
         """
         Handles a message component request.
 
         Parameters
         ----------
-        request: :class:`Request`
-            The request object.
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
 
         Returns
         -------
         The response object.
         """
-        payload: dict[str, Any] = await request.json()
-        interaction = Interaction(request=request, data=payload)
         if interaction.data and isinstance(interaction.data, MessageComponentData):
-            comp = self.client._components.get(interaction.data.custom_id)
-            if comp:
-                callback = comp._callback
-                if callback is None:
-                    return
-                try:
-                    return await callback(interaction)
-                except Exception as e:
-                    return await comp.view.on_error(interaction, e)
-
-    async def _handle_modal_submit(self, request: Request) -> None:
+            comp = self.client._registry.get_component(interaction.data.custom_id)
+            if comp is None:
+                return await self._handle_component_route(interaction)
+            callback = comp._callback
+            if callback is None:
+                return
+            try:
+                return await callback(interaction)
+            except Exception as e:
+                return await comp.view._error_handler(interaction, e)
+
+    async def _handle_component_route(self, interaction: Interaction) -> Any:
+        """
+        Handles a message component request through the component routes of the bot.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
+        """
+        custom_id = interaction.data.custom_id  # type: ignore
+        resolved = self.client._router.resolve(custom_id)
+        if resolved is None:
+            log.debug("No view or route matches the component %r.", custom_id)
+            return
+        route, params = resolved
+        try:
+            return await route.invoke(interaction, params)
+        except Exception as e:
+            log.error("An error occured in component route %r", route.template, exc_info=e)
+
+    async def _handle_modal_submit(self, interaction: Interaction) -> None:
         """
         Handles a modal submit request.
 
         Parameters
         ----------
-        request: :class:`Request`
-            The request object.
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
         """
-        payload: dict[str, Any] = await request.json()
-        interaction = Interaction(request=request, data=payload)
         if interaction.data is not None and isinstance(
             interaction.data, ModalSubmitData
         ):
-            modal = self.client._modals.get(interaction.data.custom_id)
+            modal = self.client._registry.get_modal(interaction.data.custom_id)
             if modal:
                 await modal._invoke(interaction)
 
@@ -219,30 +284,86 @@ class InteractionHandler:
         -------
         (Response)
         """
-        signature = request.headers["X-Signature-Ed25519"]
-        timestamp = request.headers["X-Signature-Timestamp"]
-        if (
-            signature is None
-            or timestamp is None
-            or not self.verify_key(await request.body(), signature, timestamp)
-        ):
+        signature = request.headers.get("X-Signature-Ed25519")
+        timestamp = request.headers.get("X-Signature-Timestamp")
+        if signature is None or timestamp is None:
             return Response(content="Bad Signature", status_code=401)
+        self._in_flight += 1
+        try:
+            return await self._handle_request(request, signature, timestamp)
+        finally:
+            self._in_flight -= 1
 
-        payload: dict[str, Any] = await request.json()
-        interaction = Interaction(request=request, data=payload)
-        self.client.dispatch(
-            "interaction_create",
-            interaction,
-            payload=payload,
-        )
+    async def _handle_request(self, request: Request, signature: str, timestamp: str) -> Response:
+        # The raw body is read once: it is verified and then decoded from the
+        # same buffer, so the payload is never parsed more than once.
+        body = await request.body()
+        if not await self.verify_request(body, signature, timestamp):
+            log.debug("Rejected a request with a bad signature.")
+            return Response(content="Bad Signature", status_code=401)
+
+        payload: dict[str, Any] = self.client._codec.loads(body)
         if payload["type"] == InteractionType.PING.value:
-            return JSONResponse({"type": InteractionResponseType.PONG.value})
-        if payload["type"] == InteractionType.APPLICATION_COMMAND.value:
-            await self._handle_command(request)
-        elif payload["type"] == InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE.value:
-            await self._handle_autocomplete(request)
-        elif payload["type"] == InteractionType.MESSAGE_COMPONENT.value:
-            await self._handle_message_component(request)
-        elif payload["type"] == InteractionType.MODAL_SUBMIT.value:
-            await self._handle_modal_submit(request)
-        return JSONResponse({"ack": InteractionResponseType.PONG.value})
+            return self._json_response({"type": InteractionResponseType.PONG.value})
+
+        interaction = Interaction(request=request, data=payload, strict=self.client.strict)
+        if self.client.cache.warm_interactions:
+            self.client.cache.warm(payload)
+        if self.client._bus.has_listeners("on_interaction_create"):
+            await self.client.emit(
+                "interaction_create",
+                interaction,
+                payload=payload,
+            )
+        if self.client.inline_responses:
+            return await self._respond_inline(interaction)
+        await self._dispatch(interaction)
+        return self._json_response({"ack": InteractionResponseType.PONG.value})
+
+    async def _dispatch(self, interaction: Interaction) -> None:
+        """
+        Routes an interaction to the handler for its type.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
+        """
+        if interaction.is_application_command:
+            await self._handle_command(interaction)
+        elif interaction.is_autocomplete:
+            await self._handle_autocomplete(interaction)
+        elif interaction.is_message_component:
+            await self._handle_message_component(interaction)
+        elif interaction.is_modal_submit:
+            await self._handle_modal_submit(interaction)
+
+    async def _respond_inline(self, interaction: Interaction) -> Response:
+        """
+        Runs the interaction callback until it produces its first response and
+        returns that response as the body of the webhook HTTP response.
+
+        The callback keeps running in the background after its first response,
+        its follow-ups are sent through the REST API.
+
+        Parameters
+        ----------
+        interaction: :class:`Interaction`
+            The interaction built from the request payload.
+        """
+        loop = asyncio.get_running_loop()
+        response: asyncio.Future[dict[str, Any]] = loop.create_future()
+        interaction._inline_response = response
+        task = asyncio.ensure_future(self._dispatch(interaction))
+        await asyncio.wait((task, response), return_when=asyncio.FIRST_COMPLETED)
+        if response.done():
+            self.client._track_task(task)
+            background = None
+            if interaction._deferral is not None and not interaction._deferral.done():
+                # The deferral reaches Discord with this response.
+                background = BackgroundTask(_acknowledge, interaction._deferral)
+            return self._json_response(response.result(), background)
+        # The callback finished without responding.
+        response.cancel()
+        task.result()
+        return self._json_response({"ack": InteractionResponseType.PONG.value})
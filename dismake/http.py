@@ -1,17 +1,24 @@
 from __future__ import annotations
-from typing import List, Optional, Union, TYPE_CHECKING
+import asyncio
+import random
+import time
+from typing import Any, List, Optional, Union, TYPE_CHECKING
 from logging import getLogger
-from httpx import AsyncClient
-from .models import User
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, PoolTimeout, Timeout
+from .codec import JSONCodec, get_codec
+from .models import AppCommand, User
+from .ratelimit import RateLimitBackend, RateLimiter
 if TYPE_CHECKING:
     from .commands import Command, Group
-    from .models import AppCommand
     from httpx import Response
 
 log = getLogger(__name__)
 
 __all__ = ("HttpClient",)
 
+# Methods a request can be sent again with, when Discord failed to answer it.
+_IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
 
 class HttpClient:
     def __init__(
@@ -19,14 +26,49 @@ class HttpClient:
         *,
         token: str,
         client_id: int,
+        codec: Optional[JSONCodec] = None,
+        max_retries: int = 5,
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        limits: Optional[Limits] = None,
+        timeout: Union[float, Timeout] = 10.0,
+        http2: bool = False,
     ) -> None:
         self.token = token
         self.client_id = client_id
         self.api_version = 10
         self.app_command_endpoint = f"/applications/{client_id}/commands"
-        self.client = AsyncClient(base_url=self.base_url, headers=self.headers)
+        self.codec = codec or get_codec()
+        self.ratelimiter = RateLimiter(ratelimit_backend)
+        self.max_retries = max_retries
+        self.limits = limits or Limits(max_connections=100, max_keepalive_connections=20)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                log.warning("HTTP/2 requires the h2 package, falling back to HTTP/1.1.")
+                http2 = False
+        self.http2 = http2
+        self.timeout = timeout
+        self._build_client()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._pool_timeouts = 0
         self._user: User
 
+    def _build_client(self) -> None:
+        self._transport = AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+        self.client = AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+
+    def start(self) -> None:
+        """Opens a new connection pool if the client was closed, so it can be used again."""
+        if self.client.is_closed:
+            self._build_client()
+
     @property
     def base_url(self) -> str:
         return "https://discord.com/api/v%s/" % self.api_version
@@ -35,28 +77,206 @@ class HttpClient:
     def headers(self) -> dict[str, str]:
         return {"Authorization": "Bot %s" % self.token}
 
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        headers: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Response:
+        """
+        Sends a request to the Discord API.
+
+        Requests are queued per rate limit bucket. Responses with a 429 status
+        are retried once the rate limit resets and 5xx responses to idempotent
+        methods are retried with an exponential backoff, up to :attr:`max_retries`
+        times. A POST or PATCH may have been applied despite the 5xx, so it is not
+        sent again.
+
+        The ``json`` body is encoded with the client's :class:`JSONCodec`
+        rather than httpx's own encoder.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method.
+        url: :class:`str`
+            The endpoint, relative to :attr:`base_url`.
+        json: Any
+            An optional JSON serializable body.
+        headers: Optional[dict[:class:`str`, :class:`str`]]
+            Extra headers to send with the request.
+        """
+        if json is not None:
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+            kwargs["content"] = self.codec.dumps(json)
+        # Interaction responses are not bound to the global rate limit.
+        ignore_global = url.lstrip("/").startswith(("interactions", "webhooks"))
+        ratelimiter = self.ratelimiter
+        for attempt in range(self.max_retries + 1):
+            key = ratelimiter.bucket_key(method, url)
+            unknown = await ratelimiter.acquire(key, ignore_global=ignore_global)
+            try:
+                res = await self._send(method, url, headers=headers, **kwargs)
+                await ratelimiter.update(method, url, res.headers)
+            finally:
+                if unknown:
+                    ratelimiter.release(key)
+            if attempt == self.max_retries:
+                break
+            if res.status_code == 429:
+                retry_after, is_global = self._parse_ratelimit(res)
+                log.warning(
+                    "%s %s is rate limited, retrying in %.2fs.", method, url, retry_after
+                )
+                await ratelimiter.block(key, retry_after, is_global=is_global)
+                continue
+            if res.status_code >= 500 and method.upper() in _IDEMPOTENT_METHODS:
+                delay = 2**attempt + random.uniform(0, 1)
+                log.warning(
+                    "%s %s failed with %s, retrying in %.2fs.",
+                    method,
+                    url,
+                    res.status_code,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            break
+        return res
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> Response:
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except PoolTimeout:
+            self._pool_timeouts += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Returns statistics about the connection pool.
+
+        ``in_flight`` close to ``max_connections``, or a growing
+        ``pool_timeouts``, means the pool is saturated.
+
+        Returns
+        -------
+        dict[str, Any]
+        """
+        connections = getattr(getattr(self._transport, "_pool", None), "connections", [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "http2": self.http2,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "pool_timeouts": self._pool_timeouts,
+        }
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Waits for in-flight requests to finish, then closes the connection pool
+        and the rate limit backend. :meth:`start` opens a new pool afterwards.
+
+        Parameters
+        ----------
+        timeout: :class:`float`
+            Seconds to wait for in-flight requests.
+        """
+        deadline = time.monotonic() + timeout
+        while self._in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._in_flight:
+            log.warning("Closing the HTTP client with %s requests in flight.", self._in_flight)
+        await self.client.aclose()
+        await self.ratelimiter.backend.close()
+
+    def _parse_ratelimit(self, response: Response) -> tuple[float, bool]:
+        """Returns the retry delay and whether the global limit was hit for a 429 response."""
+        try:
+            data = self.json(response)
+            return float(data["retry_after"]), bool(data.get("global", False))
+        except Exception:
+            is_global = response.headers.get("X-RateLimit-Global") is not None
+            return float(response.headers.get("Retry-After", 1)), is_global
+
+    def json(self, response: Response) -> Any:
+        """Decodes the body of a response with the client's :class:`JSONCodec`."""
+        return self.codec.loads(response.content)
+
     async def get_global_commands(self) -> list[AppCommand]:
-        res = await self.client.request(
+        res = await self.request(
             method="GET",
             url=f"/applications/{self.client_id}/commands",
         )
         res.raise_for_status()
-        return [AppCommand(**command) for command in res.json()]
+        return [AppCommand(**command) for command in self.json(res)]
+
+    def _commands_url(self, guild_id: Optional[int] = None) -> str:
+        if guild_id is None:
+            return f"/applications/{self.client_id}/commands"
+        return f"/applications/{self.client_id}/guilds/{guild_id}/commands"
+
+    async def get_commands(self, guild_id: Optional[int] = None) -> list[dict[str, Any]]:
+        """
+        Fetches the raw payloads of the global commands, or of a guild's commands.
+
+        Parameters
+        ----------
+        guild_id: Optional[:class:`int`]
+            The guild, or None for the global commands.
+        """
+        res = await self.request(method="GET", url=self._commands_url(guild_id))
+        res.raise_for_status()
+        return self.json(res)
+
+    async def create_command(
+        self, payload: dict[str, Any], guild_id: Optional[int] = None
+    ) -> AppCommand:
+        res = await self.request(
+            method="POST", url=self._commands_url(guild_id), json=payload
+        )
+        res.raise_for_status()
+        return AppCommand.parse_obj(self.json(res))
+
+    async def edit_command(
+        self, command_id: int, payload: dict[str, Any], guild_id: Optional[int] = None
+    ) -> AppCommand:
+        res = await self.request(
+            method="PATCH", url=f"{self._commands_url(guild_id)}/{command_id}", json=payload
+        )
+        res.raise_for_status()
+        return AppCommand.parse_obj(self.json(res))
+
+    async def delete_command(self, command_id: int, guild_id: Optional[int] = None) -> None:
+        res = await self.request(
+            method="DELETE", url=f"{self._commands_url(guild_id)}/{command_id}"
+        )
+        res.raise_for_status()
 
     async def bulk_override_commands(
         self, commands: List[Union[Command, Group]], guild_id: Optional[int] = None
     ) -> list[AppCommand]:
-        res = await self.client.request(
+        res = await self.request(
             method="PUT",
-            url=f"/applications/{self.client_id}/commands",
+            url=self._commands_url(guild_id),
             json=[command.to_dict() for command in commands],
-            headers=self.headers,
         )
         res.raise_for_status()
-        return [AppCommand.parse_obj(cmd) for cmd in res.json()]
+        return [AppCommand.parse_obj(cmd) for cmd in self.json(res)]
 
     async def remove_all_commands(self) -> Response:
-        res = await self.client.request(
+        res = await self.request(
             method="PUT",
             url=f"/applications/{self.client_id}/commands",
             json=[],
@@ -64,9 +284,9 @@ class HttpClient:
         res.raise_for_status()
         return res
 
-    async def fetch_me(self) -> None:
-        res = await self.client.request(
-            method="GET", url="/users/@me", headers=self.headers
-        )
+    async def fetch_me(self) -> dict[str, Any]:
+        res = await self.request(method="GET", url="/users/@me")
         res.raise_for_status()
-        self._user = User(**res.json())
+        data = self.json(res)
+        self._user = User(**data)
+        return data
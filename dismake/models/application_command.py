@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from .base import BaseModel
 from typing import Dict, List, Optional, Union
 from ..types import SnowFlake
 
@@ -35,7 +35,7 @@ class AppCommandOption(BaseModel):
 class AppCommand(BaseModel):
     id: SnowFlake
     type: int = 1
-    App_id: SnowFlake
+    application_id: SnowFlake
     guild_id: Optional[SnowFlake]
     name: str
     name_localizations: Optional[Dict[str, str]]
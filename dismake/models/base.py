@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, Union, get_args, get_origin
+
+import pydantic
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_MAPPING, SHAPE_SINGLETON, ModelField
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+__all__ = ("BaseModel",)
+
+# Field kinds of a parsing plan.
+_SCALAR, _INT, _MODEL, _MODEL_LIST, _MODEL_DICT, _VALIDATE = range(6)
+
+_scalar_types = (str, int, float, bool)
+
+_MISSING: Any = object()
+
+# model class -> [(name, alias, kind, types, default, field)]
+_Plan = List[Tuple[str, str, int, Any, Any, ModelField]]
+_plans: Dict[type, _Plan] = {}
+
+
+def _exact_types(type_: Any) -> Optional[Tuple[type, ...]]:
+    """Returns the scalar types a value can have to skip validation, None if it must be validated."""
+    if type_ is Any:
+        return ()
+    if type_ in _scalar_types:
+        return (type_,)
+    if get_origin(type_) is Union:
+        types = tuple(arg for arg in get_args(type_) if arg in _scalar_types)
+        return types or None
+    return None
+
+
+def _compile(cls: type[BaseModel]) -> _Plan:
+    plan: _Plan = []
+    for name, field in cls.__fields__.items():
+        type_ = field.type_
+        is_model = isinstance(type_, type) and issubclass(type_, BaseModel)
+        # Immutable defaults are shared, the others are copied on every use.
+        default = (
+            field.default
+            if field.default_factory is None
+            and (field.default is None or type(field.default) in _scalar_types)
+            else _MISSING
+        )
+        if field.shape == SHAPE_SINGLETON and is_model:
+            kind, types = _MODEL, type_
+        elif field.shape == SHAPE_LIST and is_model:
+            kind, types = _MODEL_LIST, type_
+        elif field.shape in (SHAPE_DICT, SHAPE_MAPPING) and is_model:
+            kind, types = _MODEL_DICT, type_
+        elif field.shape == SHAPE_SINGLETON and (types := _exact_types(type_)) is not None:
+            # Discord sends snowflakes as strings.
+            kind = _INT if types == (int,) else _SCALAR
+        else:
+            kind, types = _VALIDATE, None
+        plan.append((name, field.alias, kind, types, default, field))
+    _plans[cls] = plan
+    return plan
+
+
+class BaseModel(pydantic.BaseModel):
+    """
+    The base class of the dismake models.
+
+    This is the compatibility layer between the models and their validation backend:
+    the models only rely on the attributes, :meth:`dict` and :meth:`from_payload`.
+    """
+
+    class Config:
+        # Keeps e.g. integer values of Union[str, int] fields as integers.
+        smart_union = True
+        copy_on_model_validation = "none"
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], partial: bool = False) -> Self:
+        """
+        Builds a model from a payload sent by Discord.
+
+        Unlike the constructor, values that already have the declared type are not validated
+        and nested models are built the same way, which is several times faster. Other values,
+        such as timestamps, enums and flags, are still converted. Missing optional fields are
+        set to their default.
+
+        The ``@validator`` and ``@root_validator`` methods of the model are not run, so
+        models whose validators must see every payload should be built with the constructor.
+
+        Parameters
+        ----------
+        data: dict[str, Any]
+            The payload.
+        partial: :class:`bool`
+            Whether the payload is a partial object, such as the members of the resolved
+            data of an interaction. Its missing required fields are set to None instead
+            of raising.
+
+        Raises
+        ------
+        ValidationError
+            A required field is missing, or a value could not be converted to the type of its field.
+        """
+        plan = _plans.get(cls) or _compile(cls)
+        values: Dict[str, Any] = {}
+        fields_set = set()
+        for name, alias, kind, types, default, field in plan:
+            value = data.get(alias, _MISSING)
+            if value is _MISSING:
+                if field.required and not partial:
+                    raise ValidationError([ErrorWrapper(MissingError(), loc=alias)], cls)  # type: ignore
+                values[name] = field.get_default() if default is _MISSING else default
+                continue
+            fields_set.add(name)
+            if value is None:
+                values[name] = None
+            elif kind == _SCALAR and (not types or type(value) in types):
+                values[name] = value
+            elif kind == _INT and type(value) is int:
+                values[name] = value
+            elif kind == _INT and type(value) is str and value.isascii() and value.isdigit():
+                values[name] = int(value)
+            elif kind == _MODEL and type(value) is dict:
+                values[name] = types.from_payload(value, partial)
+            elif kind == _MODEL_LIST and type(value) is list:
+                values[name] = [types.from_payload(v, partial) for v in value]
+            elif kind == _MODEL_DICT and type(value) is dict:
+                values[name] = {k: types.from_payload(v, partial) for k, v in value.items()}
+            else:
+                value, errors = field.validate(value, values, loc=alias, cls=cls)  # type: ignore
+                if errors:
+                    raise ValidationError([errors], cls)  # type: ignore
+                values[name] = value
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__fields_set__", fields_set)
+        if cls.__private_attributes__:
+            model._init_private_attributes()
+        return model
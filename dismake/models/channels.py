@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import Optional, Union
-from pydantic import BaseModel, PrivateAttr
+from pydantic import PrivateAttr
+from .base import BaseModel
 from fastapi import Request
 
 from .user import User
@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import Any, Optional, Union
 
-from pydantic import BaseModel, validator
+from pydantic import validator
+from .base import BaseModel
 from ..enums import ComponentType
 from .emoji import PartialEmoji
 
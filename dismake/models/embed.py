@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List, Literal, Optional, TYPE_CHECKING
 from datetime import datetime
-from pydantic import BaseModel
+from .base import BaseModel
 
 if TYPE_CHECKING:
     from typing_extensions import Self
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from typing import Optional, TYPE_CHECKING
-from pydantic import BaseModel
+from .base import BaseModel
 from ..types import SnowFlake
 from .user import User
 
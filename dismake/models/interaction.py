@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, TYPE_CHECKING, TYPE_CHECKING, Union
+import asyncio
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterator, List, Optional, TYPE_CHECKING, Union
 
 from fastapi import Request
-from pydantic import BaseModel
+from pydantic import parse_obj_as
+from .base import BaseModel
 
 from ..enums import InteractionResponseType, InteractionType, MessageFlags, OptionType
 from ..errors import InteractionNotResponded, InteractionResponded
@@ -22,6 +25,11 @@ if TYPE_CHECKING:
     from httpx import Response as HttpxResponse
 
 
+log = getLogger("dismake")
+
+# Seconds a response waits for an automatic deferral to reach Discord.
+_DEFERRAL_TIMEOUT = 3.0
+
 __all__ = (
     "Interaction",
     "ApplicationCommandData",
@@ -32,46 +40,112 @@ __all__ = (
 )
 
 
-def _extract_options(
-    option: ApplicationCommandOption,
-) -> list[ApplicationCommandOption]:
-    """Recursively extract options from commands"""
-    if option.type == OptionType.SUB_COMMAND.value and option.options is not None:
-        return [o for sub_opt in option.options for o in _extract_options(sub_opt)]
-    elif (
-        option.type == OptionType.SUB_COMMAND_GROUP.value and option.options is not None
-    ):
-        return [o for sub_group in option.options for o in _extract_options(sub_group)]
-    else:
-        return [option]
-
-
-def _options_to_dict(
-    options: List[ApplicationCommandOption], resolved_data: Optional[ResolvedData]
-) -> dict[str, Any]:
-    """Convert options to a dictionary"""
-    namespace_dict: dict[str, Any] = {}
-    for option in options:
-        if option.type == OptionType.USER.value and resolved_data is not None:
-            if resolved_data.users is not None:
-                namespace_dict[option.name.replace("-", "_")] = resolved_data.users.get(
-                    str(option.value)
-                )
-        elif option.type == OptionType.ROLE.value and resolved_data is not None:
-            if resolved_data.roles is not None:
-                namespace_dict[option.name.replace("-", "_")] = resolved_data.roles.get(
-                    str(option.value)
-                )
-        elif option.type == OptionType.CHANNEL.value and resolved_data is not None:
-            if resolved_data.channels is not None:
-                namespace_dict[
-                    option.name.replace("-", "_")
-                ] = resolved_data.channels.get(
-                    str(option.value)
-                )
-        else:
-            namespace_dict[option.name.replace("-", "_")] = option.value
-    return namespace_dict
+_sub_command_types = (OptionType.SUB_COMMAND.value, OptionType.SUB_COMMAND_GROUP.value)
+
+_command_types = (
+    InteractionType.APPLICATION_COMMAND.value,
+    InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE.value,
+)
+
+
+# Option types whose value is an id to look up in the resolved data.
+_resolved_attributes = {
+    OptionType.USER.value: "users",
+    OptionType.ROLE.value: "roles",
+    OptionType.CHANNEL.value: "channels",
+}
+
+
+class _LazyModels(Dict[str, Any]):
+    """A dict of raw payloads that are parsed with `parse` the first time they are read."""
+
+    __slots__ = ("_parse",)
+
+    def __init__(self, parse: Callable[[dict[str, Any]], Any], raw: dict[str, Any]) -> None:
+        super().__init__(raw)
+        self._parse = parse
+
+    def __getitem__(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        if isinstance(value, dict):
+            value = self._parse(value)
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def values(self) -> list[Any]:  # type: ignore
+        return [self[key] for key in self]
+
+    def items(self) -> list[tuple[str, Any]]:  # type: ignore
+        return [(key, self[key]) for key in self]
+
+
+def _construct_options(
+    options: Optional[list[dict[str, Any]]]
+) -> Optional[list[ApplicationCommandOption]]:
+    if options is None:
+        return None
+    return [
+        ApplicationCommandOption.construct(
+            name=option["name"],
+            type=option["type"],
+            value=option.get("value"),
+            options=_construct_options(option.get("options")),
+            focused=option.get("focused", False),
+        )
+        for option in options
+    ]
+
+
+def _parse_channel(data: dict[str, Any]) -> Channel:
+    return parse_obj_as(Channel, data)  # type: ignore
+
+
+def _construct_resolved(resolved: Optional[dict[str, Any]]) -> Optional[ResolvedData]:
+    if resolved is None:
+        return None
+    users, channels, roles = (resolved.get(k) for k in ("users", "channels", "roles"))
+    return ResolvedData.construct(
+        users=_LazyModels(User.from_payload, users) if users is not None else None,
+        members=resolved.get("members"),
+        channels=_LazyModels(_parse_channel, channels) if channels is not None else None,
+        roles=_LazyModels(Role.from_payload, roles) if roles is not None else None,
+        messages=resolved.get("messages"),
+        attachments=resolved.get("attachments"),
+    )
+
+
+def _construct_data(
+    type: int, data: dict[str, Any]
+) -> Union[ApplicationCommandData, MessageComponentData, ModalSubmitData]:
+    """Builds the data of an interaction without validating it."""
+    if type in _command_types:
+        return ApplicationCommandData.construct(
+            id=data["id"],
+            name=data["name"],
+            type=data["type"],
+            resolved=_construct_resolved(data.get("resolved")),
+            options=_construct_options(data.get("options")),
+            guild_id=data.get("guild_id"),
+            target_id=data.get("target_id"),
+        )
+    if type == InteractionType.MESSAGE_COMPONENT.value:
+        return MessageComponentData.construct(
+            custom_id=data["custom_id"],
+            component_type=data["component_type"],
+            values=data.get("values"),
+        )
+    return ModalSubmitData.construct(
+        custom_id=data["custom_id"],
+        components=[
+            ModalSubmitActionRowData.construct(
+                components=[TextInput.construct(**c) for c in row["components"]]
+            )
+            for row in data["components"]
+        ],
+    )
 
 
 class ResolvedData(BaseModel):
@@ -129,11 +203,19 @@ class Interaction:
         The request object.
     data: Dict[str, Any]
         The interaction data
+    strict: bool
+        If set to True, the whole payload is validated when the interaction is created.
+        Otherwise :attr:`user`, :attr:`message` and the resolved data are only
+        built when they are first accessed, with :meth:`BaseModel.from_payload`.
     """
 
     __slots__ = (
         "_request",
         "_is_response_done",
+        "_inline_response",
+        "_auto_deferred",
+        "_deferral",
+        "_deferred_ephemeral",
         "id",
         "application_id",
         "type",
@@ -144,17 +226,26 @@ class Interaction:
         "app_permissions",
         "locale",
         "guild_locale",
-        "user",
+        "_raw",
+        "_strict",
+        "_user",
         "_data",
         "data",
         "channel",
-        "__message",
-        "message",
+        "_message",
+        "_namespace",
     )
 
-    def __init__(self, request: Request, data: Dict[str, Any]) -> None:
+    def __init__(self, request: Request, data: Dict[str, Any], strict: bool = False) -> None:
+        self._raw = data
+        self._strict = strict
         self._request = request
         self._is_response_done = False
+        self._inline_response: Optional[asyncio.Future[dict[str, Any]]] = None
+        self._auto_deferred = False
+        self._deferral: Optional[asyncio.Future[None]] = None
+        self._deferred_ephemeral = False
+        self._namespace: Optional[Namespace] = None
         self.id: int = int(data["id"])
         self.application_id: SnowFlake = data["application_id"]
         self.type: int = data["type"]
@@ -165,31 +256,53 @@ class Interaction:
         self.app_permissions: Optional[int] = data.get("app_permissions")
         self.locale: Optional[str] = data.get("locale")
         self.guild_locale: Optional[str] = data.get("guild_locale")
-        self.user: Union[User, Member]
+        self._user: Optional[Union[User, Member]] = None
+        self._message: Optional[Message] = None
         self._data: Optional[dict[str, Any]] = data.get("data")
         self.data: Optional[
             Union[ApplicationCommandData, ModalSubmitData, MessageComponentData]
         ]
-        if self.is_application_command or self.is_autocomplete:
-            self.data = ApplicationCommandData(**self._data) if self._data else None
+        if not self._data:
+            self.data = None
+        elif not strict:
+            self.data = _construct_data(self.type, self._data)
+        elif self.type in _command_types:
+            self.data = ApplicationCommandData(**self._data)
         elif self.is_message_component:
-            self.data = MessageComponentData(**self._data) if self._data else None
+            self.data = MessageComponentData(**self._data)
         else:
-            self.data = ModalSubmitData(**self._data) if self._data else None
-        if self.guild_id:
-            try:
-                member = data["member"]
-            except:
-                pass
-            else:
-                self.user = Member(**member)
-        else:
-            self.user = User(**data["user"])
+            self.data = ModalSubmitData(**self._data)
         self.channel: Optional[Any] = data.get("channel")
-        self.__message: Optional[dict[str, Any]] = data.get("message")
-        self.message: Optional[Message]
-        if self.__message is not None:
-            self.message = Message(_request=self._request, **self.__message)
+        if strict:
+            # Validates the fields that are otherwise built on first access.
+            self.user
+            self.message
+
+    @property
+    def user(self) -> Union[User, Member]:
+        """
+        Union[:class:`User`, :class:`Member`]: The user who triggered the interaction,
+        a :class:`Member` if it happened in a guild.
+        """
+        if self._user is None:
+            if self.guild_id and (member := self._raw.get("member")) is not None:
+                self._user = Member(**member) if self._strict else Member.from_payload(member)
+            else:
+                user = self._raw["user"]
+                self._user = User(**user) if self._strict else User.from_payload(user)
+        return self._user
+
+    @property
+    def message(self) -> Optional[Message]:
+        """
+        Optional[:class:`Message`]: The message the component was attached to, if any.
+        """
+        if self._message is None and (message := self._raw.get("message")) is not None:
+            if self._strict:
+                self._message = Message(_request=self._request, **message)
+            else:
+                self._message = Message.from_payload(message)
+        return self._message
 
     @property
     def bot(self) -> Bot:
@@ -243,16 +356,21 @@ class Interaction:
 
     @property
     def namespace(self) -> Namespace:
-        if not isinstance(self.data, ApplicationCommandData):
-            return Namespace(**{})
-        if (data := self.data) is None or (options := data.options) is None:
-            return Namespace(**{})
-
-        options = [o for option in options for o in _extract_options(option)]
-        if not options:
-            return Namespace(**{})
-
-        return Namespace(**_options_to_dict(options, data.resolved))
+        """
+        :class:`Namespace`: The options of the application command, built once per interaction.
+        """
+        if self._namespace is not None:
+            return self._namespace
+        data = self.data
+        if isinstance(data, ApplicationCommandData) and data.options:
+            # Sub commands and groups wrap the options of the invoked command.
+            options = data.options
+            while options and options[0].type in _sub_command_types:
+                options = options[0].options
+            self._namespace = Namespace(options, data.resolved)
+        else:
+            self._namespace = Namespace()
+        return self._namespace
 
     async def fetch_guild(self) -> Optional[Guild]:
         """
@@ -268,6 +386,45 @@ class Interaction:
             return None
         return await self.bot.fetch_guild(self.guild_id)
 
+    async def _send_callback(
+        self, payload: dict[str, Any]
+    ) -> Optional[HttpxResponse]:
+        """
+        Sends the initial response to this interaction.
+
+        If the bot answers interactions inline, the first response is handed to
+        the interaction handler and returned as the body of the webhook response.
+        Otherwise it is posted to the interaction callback endpoint.
+
+        Parameters
+        ----------
+        payload: dict[str, Any]
+            The interaction response payload.
+        """
+        if self._inline_response is not None and not self._inline_response.done():
+            self._inline_response.set_result(payload)
+            return None
+        return await self.bot._http.request(
+            method="POST",
+            url=f"/interactions/{self.id}/{self.token}/callback",
+            json=payload,
+        )
+
+    def _message_payload(
+        self, params: Callable[..., dict[str, Any]], view: Optional[View], **kwargs: Any
+    ) -> dict[str, Any]:
+        """
+        Builds a message payload that is about to be encoded.
+
+        The components of a frozen view are encoded once with the bot's
+        :class:`JSONCodec` and inserted as is when the payload is encoded.
+        """
+        if view and view.is_frozen:
+            payload = params(**kwargs)
+            payload["components"] = view._encode(self.bot._codec)
+            return payload
+        return params(view=view, **kwargs)
+
     async def respond(
         self,
         content: str,
@@ -275,39 +432,59 @@ class Interaction:
         tts: bool = False,
         ephemeral: bool = False,
         view: Optional[View] = None,
-    ) -> HttpxResponse:
+    ) -> Optional[HttpxResponse]:
+        if self._auto_deferred:
+            # The interaction was deferred on the callback's behalf,
+            # its first response replaces the loading message.
+            self._auto_deferred = False
+            if ephemeral != self._deferred_ephemeral:
+                log.warning(
+                    "The interaction %s was deferred automatically as %s, so its response is too. "
+                    "Set defer_ephemeral to match.",
+                    self.id,
+                    "ephemeral" if self._deferred_ephemeral else "public",
+                )
+            return await self.edit_original_response(content, tts=tts, view=view)
         if self.is_responded:
             raise InteractionResponded(self)
 
         if view:
             self.bot.add_view(view)
-        res = await self.bot._http.client.request(
-            method="POST",
-            url=f"/interactions/{self.id}/{self.token}/callback",
-            json={
+        self._is_response_done = True
+        return await self._send_callback(
+            {
                 "type": InteractionResponseType.CHANNEL_MESSAGE_WITH_SOURCE.value,
-                "data": handle_send_params(
-                    content=content, tts=tts, ephemeral=ephemeral, view=view
+                "data": self._message_payload(
+                    handle_send_params, view, content=content, tts=tts, ephemeral=ephemeral
                 ),
-            },
-            headers=self.bot._http.headers,
+            }
         )
-        self._is_response_done = True
-        return res
 
-    async def defer(self, thinking: bool = True) -> HttpxResponse:
+    async def defer(self, thinking: bool = True) -> Optional[HttpxResponse]:
+        if self._auto_deferred:
+            return None
         if self.is_responded:
             raise InteractionResponded(self)
-        return await self.bot._http.client.request(
-            method="POST",
-            url=f"/interactions/{self.id}/{self.token}/callback",
-            json={
+        return await self._defer(thinking)
+
+    async def _defer(
+        self, thinking: bool = True, ephemeral: bool = False
+    ) -> Optional[HttpxResponse]:
+        self._is_response_done = True
+        flags = (MessageFlags.LOADING.value if not thinking else 0) | (
+            MessageFlags.EPHEMERAL.value if ephemeral else 0
+        )
+        return await self._send_callback(
+            {
                 "type": InteractionResponseType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE.value,
-                "data": {"flags": MessageFlags.LOADING.value} if not thinking else None,
-            },
-            headers=self.bot._http.headers,
+                "data": {"flags": flags} if flags else None,
+            }
         )
-        self._is_response_done = True
+
+    async def _wait_deferral(self) -> None:
+        """Waits for an automatic deferral to reach Discord, so the original response exists."""
+        if self._deferral is not None and not self._deferral.done():
+            await asyncio.wait((self._deferral,), timeout=_DEFERRAL_TIMEOUT)
 
     async def send_followup(
         self,
@@ -322,11 +499,12 @@ class Interaction:
 
         if view:
             self.bot.add_view(view)
-        return await self.bot._http.client.request(
+        await self._wait_deferral()
+        return await self.bot._http.request(
             method="POST",
             url=f"/webhooks/{self.application_id}/{self.token}",
-            json=handle_send_params(
-                content=content, tts=tts, view=view, ephemeral=ephemeral
+            json=self._message_payload(
+                handle_send_params, view, content=content, tts=tts, ephemeral=ephemeral
             ),
         )
 
@@ -335,19 +513,20 @@ class Interaction:
     ) -> HttpxResponse:
         if view:
             self.bot.add_view(view)
-        return await self.bot._http.client.request(
+        await self._wait_deferral()
+        return await self.bot._http.request(
             method="PATCH",
             url=f"/webhooks/{self.application_id}/{self.token}/messages/@original",
-            json=handle_edit_params(content=content, tts=tts, view=view),
+            json=self._message_payload(handle_edit_params, view, content=content, tts=tts),
         )
 
     async def get_original_response(self) -> Message:
-        res = await self.bot._http.client.request(
+        res = await self.bot._http.request(
             method="GET",
             url=f"/webhooks/{self.application_id}/{self.token}/messages/@original",
         )
         res.raise_for_status()
-        return Message(**res.json())
+        return Message(**self.bot._http.json(res))
 
     async def send(
         self,
@@ -357,7 +536,7 @@ class Interaction:
         view: Optional[View] = None,
         ephemeral: bool = False,
     ) -> HttpxResponse | None:
-        if self.is_responded:
+        if self.is_responded and not self._auto_deferred:
             return await self.send_followup(
                 content, tts=tts, view=view, ephemeral=ephemeral
             )
@@ -372,48 +551,108 @@ class Interaction:
             raise InteractionResponded(self)
         if view:
             self.bot.add_view(view)
-        payload: dict[str, Any] = handle_edit_params(content=content, tts=tts, view=view)
-        return await self.bot._http.client.request(
-            method="POST",
-            url=f"/interactions/{self.id}/{self.token}/callback",
-            json={
-                "type": InteractionResponseType.UPDATE_MESSAGE.value,
-                "data": payload,
-            },
+        payload: dict[str, Any] = self._message_payload(
+            handle_edit_params, view, content=content, tts=tts
+        )
+        self._is_response_done = True
+        return await self._send_callback(
+            {"type": InteractionResponseType.UPDATE_MESSAGE.value, "data": payload}
         )
 
     async def autocomplete(self, choices: List[Choice]) -> HttpxResponse | None:
         if not self.is_autocomplete:
             return None
+        return await self._send_autocomplete([choice.to_dict() for choice in choices])
 
-        return await self.bot._http.client.request(
-            method="POST",
-            url=f"/interactions/{self.id}/{self.token}/callback",
-            json={
+    async def _send_autocomplete(self, choices: List[dict[str, Any]]) -> HttpxResponse | None:
+        """Responds to an autocomplete with already serialized choices."""
+        if not self.is_autocomplete:
+            return None
+        return await self._send_callback(
+            {
                 "type": InteractionResponseType.APPLICATION_COMMAND_AUTOCOMPLETE_RESULT.value,
-                "data": {"choices": [choice.to_dict() for choice in choices]},
-            },
+                "data": {"choices": choices},
+            }
         )
 
-    async def respond_with_modal(self, modal: Modal) -> HttpxResponse:
+    async def respond_with_modal(self, modal: Modal) -> Optional[HttpxResponse]:
         if self.is_responded:
             raise InteractionResponded(self)
         self.bot.add_modal(modal)
-        return await self.bot._http.client.request(
-            method="POST",
-            url=f"/interactions/{self.id}/{self.token}/callback",
-            json={"type": InteractionResponseType.MODAL.value, "data": modal.to_dict()},
+        self._is_response_done = True
+        return await self._send_callback(
+            {
+                "type": InteractionResponseType.MODAL.value,
+                "data": modal._encode(self.bot._codec) if modal.is_frozen else modal.to_dict(),
+            }
         )
 
 
 class Namespace:
     """
+    Holds the options of an application command as attributes. Dashes in
+    option names are replaced with underscores, and options that were not
+    given are None.
+
+    User, role and channel options are looked up in the resolved data the
+    first time they are accessed.
+
     Inspired from discord.py
     """
 
-    def __init__(self, **kwargs: dict[str, Any]) -> None:
-        for k, v in kwargs.items():
-            self.__dict__[k] = v
+    __slots__ = ("_options", "_resolved", "_values")
 
-    def __getattr__(self, value: Any) -> None:
-        return None
+    def __init__(
+        self,
+        options: Optional[List[ApplicationCommandOption]] = None,
+        resolved: Optional[ResolvedData] = None,
+    ) -> None:
+        self._options = {
+            option.name.replace("-", "_"): option for option in options or ()
+        }
+        self._resolved = resolved
+        self._values: dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name.replace("-", "_") in self._options
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._options)
+
+    def __repr__(self) -> str:
+        return f"<Namespace {' '.join(f'{k}={self.get(k)!r}' for k in self._options)}>"
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Returns the value of an option.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The name of the option.
+        default: Any
+            Returned if the option was not given.
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        name = name.replace("-", "_")
+        option = self._options.get(name)
+        if option is None:
+            return default
+        attribute = _resolved_attributes.get(option.type)
+        if attribute is None:
+            value = option.value
+        elif self._resolved is None:
+            value = None
+        else:
+            items = getattr(self._resolved, attribute)
+            value = items.get(str(option.value)) if items is not None else None
+        self._values[name] = value
+        return value
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from typing import Any, List, Union, Optional
 from datetime import datetime
-from pydantic import BaseModel, PrivateAttr
+from pydantic import PrivateAttr
+from .base import BaseModel
 from fastapi import Request
 from .embed import Embed
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Literal
-from pydantic import BaseModel
+from .base import BaseModel
 from ..permissions import Permissions
 from ..types import SnowFlake
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Any, Optional
 
-from pydantic import BaseModel
+from .base import BaseModel
 from ..types import SnowFlake
 
 __all__ = ("Role",)
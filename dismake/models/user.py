@@ -5,7 +5,7 @@ from ..enums import DefaultAvatar
 from ..asset import Asset
 from ..flags import UserFlags, GuildMemberFlags
 from ..permissions import Permissions
-from pydantic import BaseModel
+from .base import BaseModel
 
 if TYPE_CHECKING:
     from typing_extensions import Self
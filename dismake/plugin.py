@@ -1,16 +1,19 @@
 from __future__ import annotations
 import asyncio
 from functools import wraps
-from typing import Any, Callable, Optional, TYPE_CHECKING
+from typing import Any, Callable, Optional, Sequence, Tuple, TYPE_CHECKING, Union
 
 from .commands import Command, Group
 from .errors import PluginException
+from .events import _interaction_filter
+from .ui.router import ComponentRoute
 
 if TYPE_CHECKING:
     from .commands import Command, Group
     from .client import Bot
     from .types import AsyncFunction
     from .permissions import Permissions
+    from .enums import InteractionType
 
 __all__ = ("Plugin",)
 
@@ -45,7 +48,9 @@ class Plugin:
         self._commands: dict[str, Command | Group] = {}
         self.error_handler: Optional[AsyncFunction] = None
         self._on_load: AsyncFunction | None = None
-        self._events: dict[str, list[AsyncFunction]] = {}
+        # event name -> [(listener, sample, filter)]
+        self._events: dict[str, list[Tuple[AsyncFunction, float, Optional[Callable[..., bool]]]]] = {}
+        self._component_routes: list[ComponentRoute] = []
         self.default_member_permissions = default_member_permissions
 
     def on_load(self, coro: AsyncFunction) -> AsyncFunction:
@@ -58,7 +63,15 @@ class Plugin:
 
         return wrapper()
 
-    def event(self, event_name: str | None = None) -> Callable[[AsyncFunction], AsyncFunction]:
+    def event(
+        self,
+        event_name: str | None = None,
+        *,
+        sample: float = 1.0,
+        types: Optional[Sequence[Union[InteractionType, int]]] = None,
+        commands: Optional[Sequence[str]] = None,
+        filter: Optional[Callable[..., bool]] = None,
+    ) -> Callable[[AsyncFunction], AsyncFunction]:
         """
         A decorator that registers an event to listen to.
 
@@ -66,6 +79,14 @@ class Plugin:
         ----------
         event_name: :class:`str`
             The event name you want to listen.
+        sample: :class:`float`
+            The fraction of the events the listener is called for, by default 1.
+        types: Optional[Sequence[Union[:class:`InteractionType`, :class:`int`]]]
+            Only call the listener for interactions of these types.
+        commands: Optional[Sequence[:class:`str`]]
+            Only call the listener for interactions of these commands.
+        filter: Optional[Callable[..., :class:`bool`]]
+            Called with the arguments of the event, the listener is only called if it returns True.
 
         Example usage
         -------------
@@ -77,6 +98,7 @@ class Plugin:
             async def on_interaction():
                 print(f"A new interaction received.")
         """
+        check = _interaction_filter(types, commands, filter)
 
         def decorator(coro: AsyncFunction) -> AsyncFunction:
             @wraps(coro)
@@ -86,16 +108,40 @@ class Plugin:
                         f"{coro.__name__!r} is not coroutine function."
                     )
                 name = event_name or coro.__name__
-                if self._events.get(name) is not None:
-                    self._events[name].append(coro)
-                else:
-                    self._events[name] = [coro]
+                self._events.setdefault(name, []).append((coro, sample, check))
                 return coro
 
             return wrapper()
 
         return decorator
 
+    def component(self, custom_id: str) -> Callable[[AsyncFunction], ComponentRoute]:
+        """
+        A decorator that registers a component callback for every custom_id matching a template.
+
+        See :meth:`Bot.component` for the template syntax.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom_id template.
+        """
+
+        def decorator(coro: AsyncFunction) -> ComponentRoute:
+            @wraps(coro)
+            def wrapper(*_: Any, **__: Any) -> ComponentRoute:
+                if not asyncio.iscoroutinefunction(coro):
+                    raise PluginException(
+                        f"{coro.__name__!r} is not coroutine function."
+                    )
+                route = ComponentRoute(custom_id, coro)
+                self._component_routes.append(route)
+                return route
+
+            return wrapper()
+
+        return decorator
+
     def command(
         self,
         name: str,
@@ -108,6 +154,8 @@ class Plugin:
         name_localizations: dict[str, str] | None = None,
         description_localizations: dict[str, str] | None = None,
         plugin_permissions: bool = True,
+        defer_after: float | None = None,
+        defer_ephemeral: bool | None = None,
     ) -> Callable[[AsyncFunction], Command]:
         """
         The `command` function is a decorator that registers a function as an application command.
@@ -132,6 +180,10 @@ class Plugin:
             Localization dictionary for description field. Values follow the same restrictions as description.
         plugin_permissions: :class:`bool`
             If this set to false then the plugin won't override permissions for this command.
+        defer_after: :class:`float | None`
+            Seconds after which the interaction is deferred automatically if the command has not responded.
+        defer_ephemeral: :class:`bool | None`
+            Whether the automatic deferral is ephemeral.
         """
 
         def decorator(coro: AsyncFunction) -> Command:
@@ -156,6 +208,8 @@ class Plugin:
                     guild_only=guild_only,
                     name_localizations=name_localizations,
                     description_localizations=description_localizations,
+                    defer_after=defer_after,
+                    defer_ephemeral=defer_ephemeral,
                 )
                 command.plugin = self
                 self._commands[command.name] = command
@@ -229,8 +283,13 @@ class Plugin:
         bot: :class:`Bot`
             The bot instance.
         """
-        bot._commands.update(self._commands)
-        bot._events.update(self._events)
+        for command in self._commands.values():
+            bot.add_command(command)
+        for name, listeners in self._events.items():
+            for listener, sample, check in listeners:
+                bot._bus.add_listener(name, listener, sample=sample, filter=check)
+        for route in self._component_routes:
+            bot._router.add_route(route)
         if self._on_load is not None:
             asyncio.create_task(self._on_load())
         self.bot = bot
@@ -0,0 +1,710 @@
+from __future__ import annotations
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from logging import getLogger
+from typing import Any, Mapping, Optional, Union
+from urllib.parse import unquote, urlsplit
+
+from .cache import TTLCache
+
+log = getLogger("dismake")
+
+__all__ = (
+    "RateLimiter",
+    "RateLimitBackend",
+    "MemoryBackend",
+    "SQLiteBackend",
+    "RedisBackend",
+)
+
+
+# Path segments whose following ID is a major parameter.
+_MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+# The number of buckets a RateLimiter remembers having seen a response for.
+_MAX_DISCOVERED = 4096
+
+
+def _split_route(method: str, url: str) -> tuple[str, str]:
+    """
+    Splits an endpoint into its route and major parameters.
+
+    IDs are replaced by a placeholder unless they are a major parameter,
+    so ``/guilds/1/members/2`` and ``/guilds/1/members/3`` share a route.
+    Interaction callbacks are limited per interaction, their ID is a major parameter.
+
+    Returns
+    -------
+    tuple[:class:`str`, :class:`str`]
+        The route and its major parameters.
+    """
+    parts = url.split("?", 1)[0].strip("/").split("/")
+    route: list[str] = []
+    major: list[str] = []
+    for index, part in enumerate(parts):
+        if index in (1, 2) and parts[0] == "interactions":
+            # The ID identifies the interaction, the token is left out of the key.
+            if index == 1:
+                major.append(part)
+            route.append("{interaction}" if index == 1 else "{token}")
+            continue
+        if index in (1, 2) and parts[0] == "webhooks":
+            # Webhook (and interaction follow-up) tokens are major parameters too.
+            major.append(part)
+        elif index and parts[index - 1] in _MAJOR_PARAMETERS and part.isdigit():
+            major.append(part)
+        elif part.isdigit():
+            part = "{id}"
+        route.append(part)
+    return f"{method.upper()} /{'/'.join(route)}", ":".join(major)
+
+
+def _reserve(
+    limit: Optional[int],
+    remaining: Optional[int],
+    reset_at: float,
+    window: float,
+    now: float,
+) -> tuple[float, Optional[int], float]:
+    """
+    Tries to reserve a request in a bucket.
+
+    Once a bucket has reset, a new window of the last known length starts.
+
+    Returns
+    -------
+    tuple[:class:`float`, Optional[:class:`int`], :class:`float`]
+        The seconds to wait before trying again (0 if the request was reserved),
+        the new remaining count and the new reset time of the bucket.
+    """
+    if reset_at <= now:
+        remaining, reset_at = limit, now + window
+    if remaining is None:
+        return 0.0, None, reset_at
+    if remaining > 0:
+        return 0.0, remaining - 1, reset_at
+    return reset_at - now, remaining, reset_at
+
+
+class RateLimitBackend:
+    """
+    Base class for the storage of rate limit state.
+
+    The default :class:`MemoryBackend` keeps the state in the current process.
+    Backends that store it outside of the process let several workers, or
+    several hosts, running the same bot token share their rate limits.
+    """
+
+    async def reserve(self, key: str, *, ignore_global: bool = False) -> float:
+        """
+        Tries to reserve a request in a bucket.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The bucket key.
+        ignore_global: :class:`bool`
+            Whether the request is exempt from the global rate limit.
+
+        Returns
+        -------
+        :class:`float`
+            0 if the request was reserved, otherwise the seconds to wait before trying again.
+        """
+        raise NotImplementedError
+
+    async def update(
+        self, key: str, limit: Optional[int], remaining: int, reset_after: float
+    ) -> None:
+        """
+        Stores the state of a bucket as reported by Discord.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The bucket key.
+        limit: Optional[:class:`int`]
+            The number of requests that can be made per window.
+        remaining: :class:`int`
+            The number of requests left in the current window.
+        reset_after: :class:`float`
+            Seconds until the window resets.
+        """
+        raise NotImplementedError
+
+    async def block(self, key: Optional[str], retry_after: float) -> None:
+        """
+        Blocks a bucket after a 429 response.
+
+        Parameters
+        ----------
+        key: Optional[:class:`str`]
+            The bucket key, or None to block every request (the global rate limit).
+        retry_after: :class:`float`
+            Seconds to block for.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Releases the resources held by the backend.
+
+        The backend can still be used afterwards, it reconnects when it is next used.
+        """
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Keeps rate limit state in the current process.
+
+    Parameters
+    ----------
+    max_buckets: :class:`int`
+        Buckets past their reset are pruned once there are more than this many.
+    """
+
+    def __init__(self, max_buckets: int = 1024) -> None:
+        self.max_buckets = max_buckets
+        # key -> [limit, remaining, reset_at, window]
+        self._buckets: dict[str, list[Any]] = {}
+        self._global_reset_at = 0.0
+
+    def _prune(self, now: float) -> None:
+        for key, (_, _, reset_at, _) in list(self._buckets.items()):
+            if reset_at <= now:
+                del self._buckets[key]
+
+    async def reserve(self, key: str, *, ignore_global: bool = False) -> float:
+        now = time.time()
+        if not ignore_global and self._global_reset_at > now:
+            return self._global_reset_at - now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        delay, bucket[1], bucket[2] = _reserve(*bucket, now)
+        return delay
+
+    async def update(
+        self, key: str, limit: Optional[int], remaining: int, reset_after: float
+    ) -> None:
+        now = time.time()
+        if key not in self._buckets and len(self._buckets) >= self.max_buckets:
+            self._prune(now)
+        bucket = self._buckets.get(key)
+        window = reset_after
+        if bucket is not None:
+            limit = bucket[0] if limit is None else limit
+            window = max(bucket[3], reset_after)
+        self._buckets[key] = [limit, remaining, now + reset_after, window]
+
+    async def block(self, key: Optional[str], retry_after: float) -> None:
+        reset_at = time.time() + retry_after
+        if key is None:
+            self._global_reset_at = max(self._global_reset_at, reset_at)
+            return
+        bucket = self._buckets.setdefault(key, [None, 0, 0.0, 0.0])
+        bucket[1] = 0
+        bucket[2] = max(bucket[2], reset_at)
+
+
+class SQLiteBackend(RateLimitBackend):
+    """
+    Keeps rate limit state in a SQLite database file.
+
+    Every process on a host that points at the same file shares its rate limits.
+    Queries run in a worker thread so lock contention never blocks the event loop.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The path of the database file.
+    timeout: :class:`float`
+        Seconds to wait for the database lock.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ratelimits "
+                "(key TEXT PRIMARY KEY, lim INTEGER, remaining INTEGER, "
+                "reset_at REAL, window REAL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _transaction(self, func: Any, *args: Any) -> Any:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+    def _reserve(
+        self, connection: sqlite3.Connection, key: str, ignore_global: bool
+    ) -> float:
+        now = time.time()
+        if not ignore_global:
+            # The global rate limit is stored under the empty key.
+            row = connection.execute(
+                "SELECT reset_at FROM ratelimits WHERE key = ''"
+            ).fetchone()
+            if row is not None and row[0] > now:
+                return float(row[0] - now)
+        row = connection.execute(
+            "SELECT lim, remaining, reset_at, window FROM ratelimits WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return 0.0
+        delay, remaining, reset_at = _reserve(*row, now)
+        if remaining != row[1]:
+            connection.execute(
+                "UPDATE ratelimits SET remaining = ?, reset_at = ? WHERE key = ?",
+                (remaining, reset_at, key),
+            )
+        return delay
+
+    def _update(
+        self,
+        connection: sqlite3.Connection,
+        key: str,
+        limit: Optional[int],
+        remaining: int,
+        reset_after: float,
+    ) -> None:
+        connection.execute(
+            "INSERT INTO ratelimits (key, lim, remaining, reset_at, window) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET lim = coalesce(excluded.lim, lim), "
+            "remaining = excluded.remaining, reset_at = excluded.reset_at, "
+            "window = max(window, excluded.window)",
+            (key, limit, remaining, time.time() + reset_after, reset_after),
+        )
+
+    def _block(self, connection: sqlite3.Connection, key: str, reset_at: float) -> None:
+        connection.execute(
+            "INSERT INTO ratelimits (key, lim, remaining, reset_at, window) "
+            "VALUES (?, NULL, 0, ?, 0) "
+            "ON CONFLICT(key) DO UPDATE SET remaining = 0, "
+            "reset_at = max(reset_at, excluded.reset_at)",
+            (key, reset_at),
+        )
+
+    async def reserve(self, key: str, *, ignore_global: bool = False) -> float:
+        return await asyncio.to_thread(
+            self._transaction, self._reserve, key, ignore_global
+        )
+
+    async def update(
+        self, key: str, limit: Optional[int], remaining: int, reset_after: float
+    ) -> None:
+        await asyncio.to_thread(
+            self._transaction,
+            self._update,
+            key,
+            limit,
+            remaining,
+            reset_after,
+        )
+
+    async def block(self, key: Optional[str], retry_after: float) -> None:
+        await asyncio.to_thread(
+            self._transaction, self._block, key or "", time.time() + retry_after
+        )
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _ReplyError(RuntimeError):
+    """An error reply of the Redis server."""
+
+
+def _find_error(reply: Any) -> Optional[_ReplyError]:
+    if isinstance(reply, _ReplyError):
+        return reply
+    if isinstance(reply, list):
+        for item in reply:
+            error = _find_error(item)
+            if error is not None:
+                return error
+    return None
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Keeps rate limit state in a Redis server, so every host running the bot shares it.
+
+    This speaks the Redis protocol directly and only relies on the ``GET``, ``SET``,
+    ``INCR``, ``DECR``, ``PTTL``, ``DEL``, ``MULTI`` and ``EXEC`` commands, so any
+    server implementing them works. Each bucket is a counter of the remaining
+    requests that expires when the bucket resets, next to a key holding the
+    bucket's limit and window length.
+
+    Parameters
+    ----------
+    url: :class:`str`
+        The server URL, e.g. ``redis://:password@localhost:6379/0``.
+    prefix: :class:`str`
+        The prefix of every key written by the backend.
+    """
+
+    def __init__(
+        self, url: str = "redis://localhost:6379/0", prefix: str = "dismake:ratelimit:"
+    ) -> None:
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.prefix = prefix
+        # Created in the running loop, a lock made here is bound to another loop on Python 3.9.
+        self._lock: Optional[asyncio.Lock] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # key -> (limit, window in milliseconds)
+        self._limits: dict[str, tuple[int, int]] = {}
+
+    @staticmethod
+    def _encode(*args: Union[str, int, bytes]) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    async def _read_reply(self) -> Any:
+        assert self._reader is not None
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the Redis server.")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            # Returned rather than raised, so the replies that follow are still read.
+            return _ReplyError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            if int(rest) == -1:
+                return None
+            data = await self._reader.readexactly(int(rest) + 2)
+            return data[:-2]
+        if kind == b"*":
+            if int(rest) == -1:
+                return None
+            return [await self._read_reply() for _ in range(int(rest))]
+        raise RuntimeError(f"Unexpected reply from the Redis server: {line!r}")
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _execute(self, *commands: tuple[Union[str, int, bytes], ...]) -> list[Any]:
+        """
+        Sends a pipeline of commands and returns their replies.
+
+        Every reply is read before an error reply is raised, so the connection stays
+        in sync. It is dropped if anything interrupts the pipeline, including a cancellation.
+        """
+        async with self._get_lock():
+            setup: list[tuple[Union[str, int, bytes], ...]] = []
+            try:
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.open_connection(
+                        self.host, self.port
+                    )
+                    if self.password is not None:
+                        setup.append(("AUTH", self.password))
+                    if self.db:
+                        setup.append(("SELECT", self.db))
+                commands = (*setup, *commands)
+                self._writer.write(b"".join(self._encode(*c) for c in commands))
+                await self._writer.drain()
+                replies = [await self._read_reply() for _ in commands]
+            except BaseException:
+                self._drop()
+                raise
+            for reply in replies[: len(setup)]:
+                if isinstance(reply, _ReplyError):
+                    # A failed AUTH or SELECT leaves the connection unusable.
+                    self._drop()
+                    raise reply
+            replies = replies[len(setup) :]
+            for reply in replies:
+                error = _find_error(reply)
+                if error is not None:
+                    raise error
+            return replies
+
+    def _drop(self) -> None:
+        """Closes the connection without waiting, usable while being cancelled."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def _get_limit(self, key: str) -> Optional[tuple[int, int]]:
+        limit = self._limits.get(key)
+        if limit is None:
+            (value,) = await self._execute(("GET", self.prefix + key + ":limit"))
+            if value is None:
+                return None
+            count, window = value.split(b":")
+            limit = self._limits[key] = (int(count), int(window))
+        return limit
+
+    async def reserve(self, key: str, *, ignore_global: bool = False) -> float:
+        bucket = self.prefix + key
+        limit = await self._get_limit(key)
+        commands: list[tuple[Union[str, int, bytes], ...]] = [("MULTI",)]
+        if limit is not None:
+            # Starts a new window if the bucket has reset.
+            commands.append(("SET", bucket, limit[0], "PX", max(1, limit[1]), "NX"))
+        commands += [("DECR", bucket), ("PTTL", bucket)]
+        if not ignore_global:
+            commands.append(("PTTL", self.prefix + "global"))
+        replies = await self._execute(*commands, ("EXEC",))
+        results = replies[-1][1:] if limit is not None else replies[-1]
+        remaining, ttl, *global_ttl = results
+        global_delay = global_ttl[0] if global_ttl and global_ttl[0] > 0 else 0
+        if ttl < 0:
+            # The bucket is unknown, DECR just created it.
+            await self._execute(("DEL", bucket))
+        elif global_delay:
+            # Give the reservation back, the caller will try again.
+            await self._execute(("INCR", bucket))
+        if global_delay:
+            return float(global_delay / 1000)
+        if ttl < 0 or remaining >= 0:
+            return 0.0
+        return float(ttl / 1000)
+
+    async def update(
+        self, key: str, limit: Optional[int], remaining: int, reset_after: float
+    ) -> None:
+        reset_ms = max(1, int(reset_after * 1000))
+        commands: list[tuple[Union[str, int, bytes], ...]] = [
+            ("SET", self.prefix + key, remaining, "PX", reset_ms)
+        ]
+        if limit is not None:
+            known = self._limits.get(key)
+            window = max(reset_ms, known[1]) if known is not None else reset_ms
+            if known != (limit, window):
+                self._limits[key] = (limit, window)
+                commands.append(
+                    ("SET", self.prefix + key + ":limit", f"{limit}:{window}", "EX", 86400)
+                )
+        await self._execute(*commands)
+
+    async def block(self, key: Optional[str], retry_after: float) -> None:
+        name = self.prefix + (key if key is not None else "global")
+        await self._execute(("SET", name, 0, "PX", max(1, int(retry_after * 1000))))
+
+    async def close(self) -> None:
+        async with self._get_lock():
+            await self._disconnect()
+        # The lock belongs to the current event loop, a restarted bot gets a new one.
+        self._lock = None
+
+
+class RateLimiter:
+    """
+    Keeps track of Discord's rate limits.
+
+    Requests are queued per rate limit bucket. A bucket is identified by the
+    ``X-RateLimit-Bucket`` hash Discord returns for a route, combined with the
+    route's major parameters (channel, guild, webhook or interaction).
+
+    Until a response told the limits of a bucket, its requests are sent one at a time:
+    the first one keeps the bucket until :meth:`release` is called once it is answered.
+
+    Parameters
+    ----------
+    backend: :class:`RateLimitBackend`
+        Where the state of the buckets is stored, by default a :class:`MemoryBackend`.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None) -> None:
+        self.backend = backend or MemoryBackend()
+        self._hashes: dict[str, str] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._waiters: dict[str, int] = {}
+        # The key a request was queued with -> the key of the bucket its response reported.
+        self._discovered: TTLCache[str, str] = TTLCache(_MAX_DISCOVERED)
+
+    def bucket_key(self, method: str, url: str) -> str:
+        """
+        Returns the key of the bucket an endpoint belongs to.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method.
+        url: :class:`str`
+            The endpoint.
+        """
+        route, major = _split_route(method, url)
+        return f"{self._hashes.get(route, route)}:{major}"
+
+    async def acquire(self, key: str, *, ignore_global: bool = False) -> bool:
+        """
+        Waits until a request can be made in the given bucket and reserves it.
+
+        If the backend fails, the request is let through.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The bucket key, see :meth:`bucket_key`.
+        ignore_global: :class:`bool`
+            Whether the request is exempt from the global rate limit,
+            which is the case for interaction responses.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the limits of the bucket are unknown. The other requests of the
+            bucket then wait until :meth:`release` is called with the key, which must
+            be done once the response updated the bucket or the request failed.
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._leave(key)
+            raise
+        bucket = self._discovered.get(key)
+        try:
+            while True:
+                try:
+                    delay = await self.backend.reserve(
+                        bucket or key, ignore_global=ignore_global
+                    )
+                except Exception as e:
+                    log.error("Rate limit backend failed.", exc_info=e)
+                    break
+                if delay <= 0:
+                    break
+                log.debug("Bucket %s is rate limited for %.2fs.", key, delay)
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.release(key)
+            raise
+        if bucket is None:
+            return True
+        self.release(key)
+        return False
+
+    def release(self, key: str) -> None:
+        """
+        Lets the next request of a bucket through.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The bucket key :meth:`acquire` returned True for.
+        """
+        self._locks[key].release()
+        self._leave(key)
+
+    def _leave(self, key: str) -> None:
+        self._waiters[key] -= 1
+        if not self._waiters[key]:
+            del self._waiters[key], self._locks[key]
+
+    async def update(self, method: str, url: str, headers: Mapping[str, str]) -> None:
+        """
+        Updates a bucket from the ``X-RateLimit-*`` headers of a response.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The HTTP method of the request.
+        url: :class:`str`
+            The endpoint of the request.
+        headers: Mapping[:class:`str`, :class:`str`]
+            The response headers.
+        """
+        route, major = _split_route(method, url)
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash is not None and self._hashes.get(route) != bucket_hash:
+            self._hashes[route] = bucket_hash
+        key = f"{self._hashes.get(route, route)}:{major}"
+        # Requests queued under the route before its hash was known use the bucket too.
+        self._discovered.set(f"{route}:{major}", key)
+        self._discovered.set(key, key)
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        limit = headers.get("X-RateLimit-Limit")
+        try:
+            await self.backend.update(
+                key,
+                int(limit) if limit is not None else None,
+                int(remaining),
+                float(reset_after),
+            )
+        except Exception as e:
+            log.error("Rate limit backend failed.", exc_info=e)
+
+    async def block(self, key: str, retry_after: float, is_global: bool = False) -> None:
+        """
+        Blocks a bucket, or every bucket, after a 429 response.
+
+        Parameters
+        ----------
+        key: :class:`str`
+            The bucket key.
+        retry_after: :class:`float`
+            Seconds to wait before retrying.
+        is_global: :class:`bool`
+            Whether the global rate limit was hit.
+        """
+        retry_after += random.uniform(0, 0.25)
+        key = self._discovered.get(key, key)
+        if is_global:
+            log.warning("Hit the global rate limit, retrying in %.2fs.", retry_after)
+        try:
+            await self.backend.block(None if is_global else key, retry_after)
+        except Exception as e:
+            log.error("Rate limit backend failed.", exc_info=e)
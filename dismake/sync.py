@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from logging import getLogger
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union, TYPE_CHECKING
+
+from .models import AppCommand
+
+if TYPE_CHECKING:
+    from .commands import Command, Group
+    from .http import HttpClient
+
+
+log = getLogger("dismake")
+
+__all__ = ("CommandSyncer", "SyncResult", "command_hash")
+
+
+_MISSING: Any = object()
+
+# The fields Discord stores for a command or an option, and the defaults it fills in.
+_command_fields = {
+    "type": 1,
+    "name": _MISSING,
+    "description": _MISSING,
+    "options": _MISSING,
+    "default_member_permissions": _MISSING,
+    "dm_permission": True,
+    "nsfw": False,
+    "name_localizations": _MISSING,
+    "description_localizations": _MISSING,
+}
+_option_fields = {
+    "type": _MISSING,
+    "name": _MISSING,
+    "description": _MISSING,
+    "required": False,
+    "choices": _MISSING,
+    "options": _MISSING,
+    "channel_types": _MISSING,
+    "min_value": _MISSING,
+    "max_value": _MISSING,
+    "min_length": _MISSING,
+    "max_length": _MISSING,
+    "autocomplete": False,
+    "name_localizations": _MISSING,
+    "description_localizations": _MISSING,
+}
+_choice_fields = {"name": _MISSING, "value": _MISSING, "name_localizations": _MISSING}
+
+
+def _canonical(data: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    ret = {}
+    for key, default in fields.items():
+        value = data.get(key)
+        if value is None or value == default or value == [] or value == {}:
+            continue
+        if key == "options":
+            value = [_canonical(option, _option_fields) for option in value]
+        elif key == "choices":
+            value = [_canonical(choice, _choice_fields) for choice in value]
+        elif key == "default_member_permissions":
+            value = str(value)
+        ret[key] = value
+    return ret
+
+
+def command_hash(data: Dict[str, Any]) -> str:
+    """
+    Hashes the canonical form of a command payload.
+
+    Fields Discord does not store and fields set to their default value are ignored,
+    so a local :meth:`Command.to_dict` and the command returned by Discord have the
+    same hash when they are equivalent.
+
+    Parameters
+    ----------
+    data: dict[str, Any]
+        A command payload.
+
+    Returns
+    -------
+    :class:`str`
+    """
+    canonical = json.dumps(
+        _canonical(data, _command_fields), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _key(data: Dict[str, Any]) -> str:
+    # Commands of different types can share a name.
+    return f"{data.get('type', 1)}:{data['name']}"
+
+
+class SyncResult:
+    """
+    The outcome of the sync of a scope.
+
+    Attributes
+    ----------
+    guild_id: Optional[:class:`int`]
+        The guild, or None for the global commands.
+    created: list[:class:`AppCommand`]
+        The created commands.
+    edited: list[:class:`AppCommand`]
+        The edited commands.
+    deleted: :class:`int`
+        The number of deleted commands.
+    unchanged: :class:`int`
+        The number of commands that were already up to date.
+    skipped: :class:`bool`
+        Whether the scope was skipped because the sync cache was up to date.
+    error: Optional[:class:`Exception`]
+        The error that stopped the sync of the scope, if any.
+    """
+
+    __slots__ = ("guild_id", "created", "edited", "deleted", "unchanged", "skipped", "error")
+
+    def __init__(self, guild_id: Optional[int] = None) -> None:
+        self.guild_id = guild_id
+        self.created: List[AppCommand] = []
+        self.edited: List[AppCommand] = []
+        self.deleted: int = 0
+        self.unchanged: int = 0
+        self.skipped: bool = False
+        self.error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncResult guild_id={self.guild_id} created={len(self.created)} "
+            f"edited={len(self.edited)} deleted={self.deleted} unchanged={self.unchanged} "
+            f"skipped={self.skipped} error={self.error!r}>"
+        )
+
+    @property
+    def ok(self) -> bool:
+        """:class:`bool`: Whether the scope was synced without error."""
+        return self.error is None
+
+    @property
+    def changed(self) -> List[AppCommand]:
+        """list[:class:`AppCommand`]: The created and edited commands."""
+        return self.created + self.edited
+
+
+class CommandSyncer:
+    """
+    Synchronizes application commands incrementally.
+
+    The commands of a scope, either global or a guild, are compared to the remote ones
+    by :func:`command_hash` and only the commands that were added, changed or removed are
+    created, edited or deleted.
+
+    Parameters
+    ----------
+    http: :class:`HttpClient`
+        The HTTP client.
+    cache_path: Optional[:class:`str`]
+        A JSON file remembering the hashes of the last sync. When the local commands of
+        a scope match it, the scope is skipped without fetching the remote commands.
+        Changes made to the commands outside of this bot are then only noticed with `force`.
+    """
+
+    def __init__(self, http: HttpClient, cache_path: Optional[str] = None) -> None:
+        self.http = http
+        self.cache_path = cache_path
+        self._cache: Dict[str, Dict[str, Dict[str, str]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring the command cache %s: %s", self.cache_path, e)
+            return {}
+        if data.get("application_id") != str(self.http.client_id):
+            return {}
+        return data.get("scopes", {})
+
+    def save(self) -> None:
+        """Writes the sync cache to its file, if any."""
+        if self.cache_path is None:
+            return
+        data = {"application_id": str(self.http.client_id), "scopes": self._cache}
+        # A file per process, so workers saving at once never write to the same one.
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            log.warning("Could not write the command cache %s: %s", self.cache_path, e)
+
+    async def sync(
+        self,
+        commands: Sequence[Union[Command, Group]],
+        guild_id: Optional[int] = None,
+        *,
+        force: bool = False,
+        save: bool = True,
+    ) -> SyncResult:
+        """
+        Makes the remote commands of a scope match `commands`.
+
+        Parameters
+        ----------
+        commands: Sequence[Union[:class:`Command`, :class:`Group`]]
+            Every command of the scope.
+        guild_id: Optional[:class:`int`]
+            The guild to sync, or None for the global commands.
+        force: :class:`bool`
+            If set to True, the remote commands are fetched even if the cache is up to date.
+        save: :class:`bool`
+            Whether to write the cache file once the scope is synced.
+
+        Returns
+        -------
+        :class:`SyncResult`
+
+        Raises
+        ------
+        httpx.HTTPStatusError
+            A request failed. The commands synced so far are not cached.
+        """
+        result = SyncResult(guild_id)
+        scope = "global" if guild_id is None else str(guild_id)
+        payloads = {}
+        for command in commands:
+            payload = command.to_dict()
+            payload.pop("guild_id", None)
+            payloads[_key(payload)] = payload
+        hashes = {key: command_hash(payload) for key, payload in payloads.items()}
+
+        cached = self._cache.get(scope)
+        if not force and cached is not None and hashes == {
+            key: entry["hash"] for key, entry in cached.items()
+        }:
+            log.debug("Commands of scope %s are up to date.", scope)
+            result.unchanged = len(payloads)
+            result.skipped = True
+            return result
+
+        remote = {_key(data): data for data in await self.http.get_commands(guild_id)}
+        state: Dict[str, Dict[str, str]] = {}
+        for key, payload in payloads.items():
+            current = remote.pop(key, None)
+            if current is None:
+                command = await self.http.create_command(payload, guild_id)
+                result.created.append(command)
+            elif command_hash(current) != hashes[key]:
+                command = await self.http.edit_command(current["id"], payload, guild_id)
+                result.edited.append(command)
+            else:
+                state[key] = {"id": str(current["id"]), "hash": hashes[key]}
+                result.unchanged += 1
+                continue
+            state[key] = {"id": str(command.id), "hash": hashes[key]}
+        for data in remote.values():
+            await self.http.delete_command(data["id"], guild_id)
+            result.deleted += 1
+        log.info(
+            "Synced the commands of scope %s: %s created, %s edited, %s deleted, %s unchanged.",
+            scope,
+            len(result.created),
+            len(result.edited),
+            result.deleted,
+            result.unchanged,
+        )
+        self._cache[scope] = state
+        if save:
+            self.save()
+        return result
+
+    async def sync_many(
+        self,
+        scopes: Mapping[Optional[int], Sequence[Union[Command, Group]]],
+        *,
+        concurrency: int = 8,
+        force: bool = False,
+        checkpoint: int = 50,
+    ) -> List[SyncResult]:
+        """
+        Syncs several scopes concurrently.
+
+        At most `concurrency` scopes are synced at once. Their requests go through the
+        rate limiter of the HTTP client, where every guild has its own buckets. A scope
+        that fails does not stop the others, its error is set on its result.
+
+        The cache is written every `checkpoint` synced scopes and when the sync ends or
+        is cancelled, so an interrupted sync resumes where it stopped: the scopes that
+        were already synced are skipped by the next one.
+
+        Parameters
+        ----------
+        scopes: Mapping[Optional[:class:`int`], Sequence[Union[:class:`Command`, :class:`Group`]]]
+            The commands of every guild, None being the global commands.
+        concurrency: :class:`int`
+            The maximum number of scopes synced at once, by default 8.
+        force: :class:`bool`
+            If set to True, the remote commands are fetched even if the cache is up to date.
+        checkpoint: :class:`int`
+            The number of synced scopes between two writes of the cache file.
+
+        Returns
+        -------
+        list[:class:`SyncResult`]
+            The result of every scope, in the order of `scopes`.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        pending = 0
+
+        async def run(guild_id: Optional[int], commands: Sequence[Union[Command, Group]]) -> SyncResult:
+            nonlocal pending
+            async with semaphore:
+                try:
+                    result = await self.sync(commands, guild_id, force=force, save=False)
+                except Exception as e:
+                    scope = "global" if guild_id is None else guild_id
+                    log.error("Could not sync the commands of scope %s", scope, exc_info=e)
+                    result = SyncResult(guild_id)
+                    result.error = e
+                    return result
+            if not result.skipped:
+                pending += 1
+                if pending >= checkpoint:
+                    pending = 0
+                    self.save()
+            return result
+
+        try:
+            return await asyncio.gather(
+                *(run(guild_id, commands) for guild_id, commands in scopes.items())
+            )
+        finally:
+            if pending:
+                self.save()
@@ -3,3 +3,5 @@ from .view import *
 from .button import *
 from .select import *
 from .modal import *
+from .registry import *
+from .router import *
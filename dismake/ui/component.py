@@ -1,11 +1,12 @@
 from __future__ import annotations
 import uuid
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING, Union
 
 from dismake.types import AsyncFunction
 from ..enums import ComponentType
 
 if TYPE_CHECKING:
+    from .modal import Modal
     from .view import View
 
 __all__ = ("Component",)
@@ -40,8 +41,20 @@ class Component:
         self.custom_id = custom_id or str(uuid.uuid4())
         self.disabled = disabled
         self._view: View
+        self._parent: Optional[Union[View, Modal]] = None
         self._callback: AsyncFunction | None = None
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._changed()
+
+    def _changed(self) -> None:
+        # A frozen view or modal encodes its components again once one of them changes.
+        parent = self.__dict__.get("_parent")
+        if parent is not None:
+            parent._invalidate()
+
     @property
     def view(self) -> View:
         """
@@ -50,9 +63,8 @@ class Component:
         return self._view
 
     @view.setter
-    def view(self, v: View) -> View:
-        self.view = v
-        return self.view
+    def view(self, v: View) -> None:
+        self._view = v
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -3,6 +3,7 @@ from __future__ import annotations
 import uuid
 
 from typing import Any, TYPE_CHECKING
+from ..codec import JSONCodec, RawJSON
 from ..enums import ComponentType, TextInputStyle
 from .component import Component
 from ..models import ModalSubmitData
@@ -27,6 +28,10 @@ class Modal:
     custom_id: :class:`str`
         The custom ID of the modal. If not provided, a random UUID will be generated.
         Must be 100 characters or fewer.
+    timeout: :class:`float` | None
+        Seconds after which the modal stops listening for submissions.
+        By default None, the modal listens until :meth:`Bot.remove_modal` is called or
+        until it is evicted as the least recently used of the bot's `max_modals` modals.
 
     Attributes
     ----------
@@ -34,10 +39,15 @@ class Modal:
         A list of :class:`TextInput` components.
     """
 
-    def __init__(self, title: str, custom_id: str | None = None) -> None:
+    def __init__(
+        self, title: str, custom_id: str | None = None, timeout: float | None = None
+    ) -> None:
         self._title = title
+        self.timeout = timeout
         self._custom_id = custom_id or str(uuid.uuid4())
         self._children: list[TextInput] = list()
+        self._frozen = False
+        self._encoded: tuple[JSONCodec, RawJSON] | None = None
 
         if len(title) > 45:
             raise ValueError("Modal title must be 45 characters or fewer.")
@@ -49,9 +59,52 @@ class Modal:
             raise ValueError("Modal cannot have more than 5 children.")
 
     def add_item(self, item: TextInput) -> Self:
+        item._parent = self
         self._children.append(item)
+        self._invalidate()
         return self
 
+    def freeze(self) -> Self:
+        """
+        Marks the modal as static, so it is encoded once and the encoded JSON
+        is reused every time it is sent.
+
+        Setting an attribute of a text input, including the value filled in on
+        submission, or adding one encodes it again on next use.
+
+        Returns
+        -------
+        Self
+        """
+        self._frozen = True
+        return self
+
+    def unfreeze(self) -> Self:
+        """
+        Stops reusing the encoded JSON of a frozen modal.
+
+        Returns
+        -------
+        Self
+        """
+        self._frozen = False
+        self._encoded = None
+        return self
+
+    @property
+    def is_frozen(self) -> bool:
+        """:class:`bool`: Whether the modal is frozen."""
+        return self._frozen
+
+    def _invalidate(self) -> None:
+        self._encoded = None
+
+    def _encode(self, codec: JSONCodec) -> RawJSON:
+        """Returns the modal encoded with a codec, reused until a text input changes."""
+        if self._encoded is None or self._encoded[0] is not codec:
+            self._encoded = (codec, RawJSON(codec.dumps(self.to_dict())))
+        return self._encoded[1]
+
     @property
     def title(self) -> str:
         return self._title
@@ -92,6 +145,12 @@ class Modal:
     async def on_submit(self, interaction: Interaction) -> Any:
         pass
 
+    async def on_timeout(self) -> Any:
+        """
+        Called when the modal times out or is evicted from the bot's registry.
+        """
+        pass
+
     def __repr__(self) -> str:
         return f"<Modal title={self.title!r}>"
 
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Set, Union, TYPE_CHECKING
+
+from ..cache import TTLCache
+
+if TYPE_CHECKING:
+    from .component import Component
+    from .modal import Modal
+    from .view import View
+
+
+__all__ = ("ComponentRegistry",)
+
+
+class ComponentRegistry:
+    """
+    Stores the views and modals that are listening for interactions.
+
+    Views and modals expire after their `timeout` and the least recently used ones
+    are evicted once the registry is full. Views without a timeout are persistent,
+    they are kept until :meth:`remove_view` is called and do not count towards `max_views`.
+
+    Parameters
+    ----------
+    max_views: :class:`int`
+        The maximum number of views with a timeout, by default 1000.
+    max_modals: :class:`int`
+        The maximum number of modals, by default 1000.
+    on_timeout: Callable[[Union[:class:`View`, :class:`Modal`]], None]
+        Called with every view or modal that expires or is evicted.
+    """
+
+    def __init__(
+        self,
+        max_views: int = 1000,
+        max_modals: int = 1000,
+        on_timeout: Optional[Callable[[Union[View, Modal]], None]] = None,
+    ) -> None:
+        self.on_timeout = on_timeout
+        self._views: TTLCache[View, View] = TTLCache(max_views, on_evict=self._evict_view)
+        self._persistent_views: Set[View] = set()
+        self._components: Dict[str, Component] = {}
+        self._modals: TTLCache[str, Modal] = TTLCache(max_modals, on_evict=self._evict_modal)
+
+    def add_view(self, view: View) -> None:
+        """
+        Registers a view, or resets its timeout if it is already registered.
+
+        Parameters
+        ----------
+        view: :class:`View`
+            The view to register.
+        """
+        components = [
+            component
+            for row in view.rows
+            for component in row.components
+            if component._callback is not None
+        ]
+        if not components:
+            return
+        if view.timeout is None:
+            self._views.pop(view)
+            self._persistent_views.add(view)
+        else:
+            self._persistent_views.discard(view)
+            self._views.set(view, view, view.timeout)
+        for component in components:
+            self._components[component.custom_id] = component
+
+    def remove_view(self, view: View) -> None:
+        """
+        Unregisters a view without calling its timeout hook.
+
+        Parameters
+        ----------
+        view: :class:`View`
+            The view to unregister.
+        """
+        self._views.pop(view)
+        self._persistent_views.discard(view)
+        self._remove_components(view)
+
+    def get_component(self, custom_id: str) -> Optional[Component]:
+        """
+        Returns the component with the given custom id if its view is still registered.
+
+        The timeout of the view is reset.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom id of the component.
+        """
+        component = self._components.get(custom_id)
+        if component is None:
+            return None
+        view = component.view
+        if view in self._persistent_views:
+            return component
+        if self._views.get(view) is None:
+            return None
+        self._views.set(view, view, view.timeout)
+        return component
+
+    def add_modal(self, modal: Modal) -> None:
+        """
+        Registers a modal, or resets its timeout if it is already registered.
+
+        Parameters
+        ----------
+        modal: :class:`Modal`
+            The modal to register.
+        """
+        self._modals.set(modal.custom_id, modal, modal.timeout)
+
+    def remove_modal(self, modal: Modal) -> None:
+        """
+        Unregisters a modal without calling its timeout hook.
+
+        Parameters
+        ----------
+        modal: :class:`Modal`
+            The modal to unregister.
+        """
+        self._modals.pop(modal.custom_id)
+
+    def get_modal(self, custom_id: str) -> Optional[Modal]:
+        """
+        Returns the modal with the given custom id.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom id of the modal.
+        """
+        return self._modals.get(custom_id)
+
+    def expire(self) -> int:
+        """
+        Removes the expired views and modals, calling their timeout hooks.
+
+        Returns
+        -------
+        :class:`int`
+            The number of removed views and modals.
+        """
+        return self._views.expire() + self._modals.expire()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the size and the counters of the registry.
+
+        Returns
+        -------
+        dict[str, Any]
+        """
+        return {
+            "views": self._views.stats(),
+            "persistent_views": len(self._persistent_views),
+            "components": len(self._components),
+            "modals": self._modals.stats(),
+        }
+
+    def _remove_components(self, view: View) -> None:
+        for row in view.rows:
+            for component in row.components:
+                if self._components.get(component.custom_id) is component:
+                    del self._components[component.custom_id]
+
+    def _evict_view(self, _: View, view: View) -> None:
+        self._remove_components(view)
+        if self.on_timeout is not None:
+            self.on_timeout(view)
+
+    def _evict_modal(self, _: str, modal: Modal) -> None:
+        if self.on_timeout is not None:
+            self.on_timeout(modal)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..types import AsyncFunction
+
+
+__all__ = ("ComponentRoute", "ComponentRouter")
+
+_PARAM_RE = re.compile(r"{([a-zA-Z_][a-zA-Z0-9_]*)(?::(str|int|float))?}")
+
+_CONVERTERS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "str": (r".+?", str),
+    "int": (r"-?\d+", int),
+    "float": (r"-?\d+(?:\.\d+)?", float),
+}
+
+
+class ComponentRoute:
+    """
+    Represents a component callback bound to a custom_id template.
+
+    Parameters are written as ``{name}`` or ``{name:type}``, where type is one of
+    ``str``, ``int`` and ``float``. They are parsed from the custom_id of incoming
+    interactions and passed to the callback as keyword arguments.
+
+    Parameters
+    ----------
+    template: :class:`str`
+        The custom_id template, e.g. ``"vote:{poll_id:int}:{choice}"``.
+    callback: AsyncFunction
+        The coroutine called with the interaction and the parsed parameters.
+
+    Attributes
+    ----------
+    prefix: :class:`str`
+        The static part of the template before the first parameter.
+    """
+
+    def __init__(self, template: str, callback: AsyncFunction) -> None:
+        self.template = template
+        self.callback = callback
+        self._converters: Dict[str, Callable[[str], Any]] = {}
+        pattern, position = [], 0
+        for match in _PARAM_RE.finditer(template):
+            name, kind = match.group(1), match.group(2) or "str"
+            if name in self._converters:
+                raise ValueError(f"Duplicate parameter {name!r} in {template!r}.")
+            regex, self._converters[name] = _CONVERTERS[kind]
+            pattern.append(re.escape(template[position : match.start()]))
+            pattern.append(f"(?P<{name}>{regex})")
+            position = match.end()
+        pattern.append(re.escape(template[position:]))
+        match = _PARAM_RE.search(template)
+        self.prefix = template[: match.start()] if match else template
+        self._regex = re.compile("".join(pattern))
+
+    def __repr__(self) -> str:
+        return f"<ComponentRoute template={self.template!r}>"
+
+    def match(self, custom_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Parses a custom_id against the template.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom_id of the component.
+
+        Returns
+        -------
+        Optional[dict[str, Any]]
+            The converted parameters, or None if the custom_id does not match.
+        """
+        match = self._regex.fullmatch(custom_id)
+        if match is None:
+            return None
+        return {name: self._converters[name](value) for name, value in match.groupdict().items()}
+
+    def format(self, **params: Any) -> str:
+        """
+        Builds a custom_id from the template.
+
+        Parameters
+        ----------
+        **params: Any
+            The value of every parameter of the template.
+
+        Returns
+        -------
+        :class:`str`
+        """
+        custom_id = _PARAM_RE.sub(lambda m: str(params[m.group(1)]), self.template)
+        if len(custom_id) > 100:
+            raise ValueError("custom_id must be 100 characters or fewer.")
+        return custom_id
+
+    async def invoke(self, interaction: Any, params: Dict[str, Any]) -> Any:
+        return await self.callback(interaction, **params)
+
+
+class _Node:
+    __slots__ = ("children", "routes")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.routes: List[ComponentRoute] = []
+
+
+class ComponentRouter:
+    """
+    Matches custom_ids against :class:`ComponentRoute` templates.
+
+    Routes are indexed in a trie keyed by their static prefix, so a lookup only walks
+    the custom_id once and tries the routes whose prefix matches, longest prefix first.
+    """
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._static: Dict[str, ComponentRoute] = {}
+        self.routes: List[ComponentRoute] = []
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def add_route(self, route: ComponentRoute) -> ComponentRoute:
+        """
+        Adds a route to the router.
+
+        Parameters
+        ----------
+        route: :class:`ComponentRoute`
+            The route to add.
+        """
+        self.routes.append(route)
+        if route.prefix == route.template:
+            self._static[route.template] = route
+            return route
+        node = self._root
+        for char in route.prefix:
+            node = node.children.setdefault(char, _Node())
+        node.routes.append(route)
+        return route
+
+    def resolve(self, custom_id: str) -> Optional[Tuple[ComponentRoute, Dict[str, Any]]]:
+        """
+        Finds the route of a custom_id.
+
+        Parameters
+        ----------
+        custom_id: :class:`str`
+            The custom_id of the component.
+
+        Returns
+        -------
+        Optional[tuple[:class:`ComponentRoute`, dict[str, Any]]]
+            The route and the parsed parameters, or None if no route matches.
+        """
+        route = self._static.get(custom_id)
+        if route is not None:
+            return route, {}
+        node = self._root
+        candidates = [node.routes] if node.routes else []
+        for char in custom_id:
+            node = node.children.get(char)  # type: ignore
+            if node is None:
+                break
+            if node.routes:
+                candidates.append(node.routes)
+        for routes in reversed(candidates):
+            for route in routes:
+                params = route.match(custom_id)
+                if params is not None:
+                    return route, params
+        return None
@@ -182,6 +182,7 @@ class StringSelectMenu(BaseSelect):
         Self
         """
         self.options.append(option)
+        self._changed()
         return self
 
     def to_dict(self) -> dict[str, Any]:
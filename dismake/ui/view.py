@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Callable, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, List, Optional, Tuple, TYPE_CHECKING
 from functools import wraps
 
+from ..codec import JSONCodec, RawJSON
 from ..enums import ButtonStyles, ComponentType
 from ..types import AsyncFunction
 from .component import Component
@@ -50,6 +51,13 @@ class View:
     """
     Represents a view that contains message components.
 
+    Parameters
+    ----------
+    timeout: Optional[:class:`float`]
+        Seconds without any interaction after which the view stops listening.
+        By default None, the view is persistent and listens until :meth:`Bot.remove_view`
+        is called. Give views sent with many messages a timeout, so they do not pile up.
+
     Example
     --------
         view = View()
@@ -58,9 +66,12 @@ class View:
             await ctx.respond("Clicked")
     """
 
-    def __init__(self) -> None:
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.timeout = timeout
         self.rows: List[Row] = list()
         self._error_handler: AsyncFunction = self.on_error
+        self._frozen = False
+        self._encoded: Optional[Tuple[JSONCodec, RawJSON]] = None
 
     @property
     def is_full(self) -> bool:
@@ -69,10 +80,19 @@ class View:
     async def on_error(self, interaction: Interaction, e: Exception) -> Any:
         pass
 
+    async def on_timeout(self) -> Any:
+        """
+        Called when the view times out or is evicted from the bot's registry.
+        """
+        pass
+
     def add_component(self, component: Component) -> Self:
         if self.is_full:
             raise ValueError("can't able to find free space to add the component.")
 
+        component.view = self
+        component._parent = self
+        self._invalidate()
         if isinstance(component, Button):
             if not self.rows or self.rows[-1].is_full:
                 self.rows.append(Row())
@@ -159,5 +179,46 @@ class View:
 
         return wrapper()
 
+    def freeze(self) -> Self:
+        """
+        Marks the view as static, so its components are encoded once and the
+        encoded JSON is reused by every message sent with it.
+
+        Setting an attribute of a component or adding one encodes them again on next use.
+        Call :meth:`unfreeze` before changing :attr:`rows` or the options of a select in place.
+
+        Returns
+        -------
+        Self
+        """
+        self._frozen = True
+        return self
+
+    def unfreeze(self) -> Self:
+        """
+        Stops reusing the encoded components of a frozen view.
+
+        Returns
+        -------
+        Self
+        """
+        self._frozen = False
+        self._encoded = None
+        return self
+
+    @property
+    def is_frozen(self) -> bool:
+        """:class:`bool`: Whether the view is frozen."""
+        return self._frozen
+
+    def _invalidate(self) -> None:
+        self._encoded = None
+
+    def _encode(self, codec: JSONCodec) -> RawJSON:
+        """Returns the components encoded with a codec, reused until a component changes."""
+        if self._encoded is None or self._encoded[0] is not codec:
+            self._encoded = (codec, RawJSON(codec.dumps(self.to_dict())))
+        return self._encoded[1]
+
     def to_dict(self) -> list[dict[str, Any]]:
         return [row.to_dict() for row in self.rows]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Optional
+
+from nacl.bindings import crypto_sign_open
+from nacl.exceptions import BadSignatureError
+
+from .cache import TTLCache
+
+__all__ = ("SignatureVerifier",)
+
+
+class SignatureVerifier:
+    """
+    Verifies the Ed25519 signature of interaction requests.
+
+    Besides the signature, a request is rejected if its timestamp is older than `max_age`,
+    or if its signature was already seen within `max_age`, i.e. the request is replayed.
+    The cheap checks run first, so malformed, stale and replayed requests never reach the
+    signature verification.
+
+    Parameters
+    ----------
+    public_key: :class:`str`
+        The hex encoded public key of the application.
+    max_age: Optional[:class:`float`]
+        Seconds a request timestamp is accepted for, in the past or the future, by default
+        300. None disables the timestamp and replay checks.
+    replay_cache_size: :class:`int`
+        The number of recent signatures remembered to detect replays, by default 10000.
+        0 disables the replay check.
+    executor: Optional[:class:`concurrent.futures.Executor`]
+        If set, signatures are verified in this executor while the event loop is busy,
+        i.e. while at least `offload_threshold` requests are being handled. libsodium
+        releases the GIL, so a thread pool verifies in parallel with the event loop.
+    offload_threshold: :class:`int`
+        The number of requests handled at once from which verifications are offloaded,
+        by default 4.
+
+    Attributes
+    ----------
+    stats: :class:`collections.Counter`
+        The number of ``valid``, ``invalid``, ``malformed``, ``stale``, ``replayed``
+        and ``offloaded`` verifications.
+    """
+
+    __slots__ = (
+        "public_key",
+        "max_age",
+        "executor",
+        "offload_threshold",
+        "stats",
+        "_replays",
+    )
+
+    def __init__(
+        self,
+        public_key: str,
+        max_age: Optional[float] = 300.0,
+        replay_cache_size: int = 10000,
+        executor: Optional[Executor] = None,
+        offload_threshold: int = 4,
+    ) -> None:
+        self.public_key = bytes.fromhex(public_key)
+        self.max_age = max_age
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.stats: Counter[str] = Counter()
+        self._replays: Optional[TTLCache[bytes, bool]] = (
+            TTLCache(replay_cache_size, ttl=max_age)
+            if max_age is not None and replay_cache_size > 0
+            else None
+        )
+
+    def _precheck(self, signature: str, timestamp: str) -> Optional[bytes]:
+        """Returns the decoded signature, or None if the request is rejected without verifying it."""
+        if len(signature) != 128:
+            self.stats["malformed"] += 1
+            return None
+        try:
+            raw = bytes.fromhex(signature)
+            if self.max_age is not None and abs(time.time() - int(timestamp)) > self.max_age:
+                self.stats["stale"] += 1
+                return None
+        except ValueError:
+            self.stats["malformed"] += 1
+            return None
+        if self._replays is not None and raw in self._replays:
+            self.stats["replayed"] += 1
+            return None
+        return raw
+
+    def _verify(self, signature: bytes, timestamp: str, body: bytes) -> bool:
+        # libsodium takes the signature and the message as one buffer, built with a single copy.
+        try:
+            crypto_sign_open(b"".join((signature, timestamp.encode(), body)), self.public_key)
+        except BadSignatureError:
+            return False
+        return True
+
+    def _finish(self, signature: bytes, valid: bool) -> bool:
+        if not valid:
+            self.stats["invalid"] += 1
+            return False
+        if self._replays is not None:
+            # Concurrent deliveries of the same request are only accepted once.
+            if signature in self._replays:
+                self.stats["replayed"] += 1
+                return False
+            self._replays.set(signature, True)
+        self.stats["valid"] += 1
+        return True
+
+    def check(self, body: bytes, signature: str, timestamp: str) -> bool:
+        """
+        Verifies a request in the current thread.
+
+        Parameters
+        ----------
+        body: :class:`bytes`
+            The body of the request.
+        signature: :class:`str`
+            The ``X-Signature-Ed25519`` header.
+        timestamp: :class:`str`
+            The ``X-Signature-Timestamp`` header.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the request is authentic and fresh.
+        """
+        raw = self._precheck(signature, timestamp)
+        if raw is None:
+            return False
+        return self._finish(raw, self._verify(raw, timestamp, body))
+
+    async def verify(self, body: bytes, signature: str, timestamp: str, load: int = 0) -> bool:
+        """
+        Verifies a request, in the executor if the event loop is busy.
+
+        Parameters
+        ----------
+        body: :class:`bytes`
+            The body of the request.
+        signature: :class:`str`
+            The ``X-Signature-Ed25519`` header.
+        timestamp: :class:`str`
+            The ``X-Signature-Timestamp`` header.
+        load: :class:`int`
+            The number of requests being handled, compared to `offload_threshold`.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the request is authentic and fresh.
+        """
+        raw = self._precheck(signature, timestamp)
+        if raw is None:
+            return False
+        if self.executor is None or load < self.offload_threshold:
+            return self._finish(raw, self._verify(raw, timestamp, body))
+        self.stats["offloaded"] += 1
+        valid = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._verify, raw, timestamp, body
+        )
+        return self._finish(raw, valid)
@@ -36,6 +36,7 @@ setup(
     license="MIT",
     entry_points={"console_scripts": ["dismake=dismake.cli:main"]},
     install_requires=requirements,
+    extras_require={"speed": ["orjson"]},
 )
 
 
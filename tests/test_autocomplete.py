@@ -0,0 +1,12 @@
+from dismake import Choice, ChoiceIndex
+
+
+def test_choice_index_case_collisions():
+    index = ChoiceIndex(["Apple", "apple", "APPLE", "Banana"])
+    assert [c["name"] for c in index.search("app")] == ["Apple", "apple", "APPLE"]
+
+
+def test_choice_index_duplicate_choices():
+    index = ChoiceIndex([Choice(name="Red", value=1), Choice(name="Red", value=2)])
+    assert [c["value"] for c in index.search("re")] == [1, 2]
+    assert len(index) == 2
@@ -0,0 +1,97 @@
+import json
+import time
+
+import httpx
+import pytest
+from nacl.signing import SigningKey
+from starlette.testclient import TestClient
+
+import dismake
+import dismake.http
+
+USER = {"id": "1", "username": "bot", "discriminator": "0001", "avatar": None}
+
+SIGNING_KEY = SigningKey.generate()
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.path)
+        if request.url.path.endswith("/users/@me"):
+            return httpx.Response(200, json=USER)
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(
+        dismake.http, "AsyncHTTPTransport", lambda **_: httpx.MockTransport(handler)
+    )
+    return sent
+
+
+def make_bot(**kwargs):
+    public_key = SIGNING_KEY.verify_key.encode().hex()
+    return dismake.Bot(token="t", client_public_key=public_key, client_id=1, **kwargs)
+
+
+def test_bot_restarts_after_shutdown(requests):
+    bot = make_bot()
+    for _ in range(2):
+        with TestClient(bot):
+            assert bot.user.username == "bot"
+    assert requests == ["/api/v10/users/@me", "/api/v10/users/@me"]
+
+
+def test_ready_dispatched_after_restart(requests):
+    bot = make_bot()
+    ready = []
+
+    @bot.event()
+    async def on_ready():
+        ready.append(bot.user.username)
+
+    for _ in range(2):
+        with TestClient(bot):
+            pass
+    assert ready == ["bot", "bot"]
+
+
+def test_leader_dispatched_on_every_startup(requests):
+    bot = make_bot()
+    elected = []
+
+    @bot.event()
+    async def on_leader():
+        elected.append(True)
+
+    for _ in range(2):
+        with TestClient(bot):
+            pass
+    assert elected == [True, True]
+
+
+def post_interaction(client, payload):
+    body = json.dumps(payload).encode()
+    timestamp = str(int(time.time()))
+    signature = SIGNING_KEY.sign(timestamp.encode() + body).signature.hex()
+    headers = {"X-Signature-Ed25519": signature, "X-Signature-Timestamp": timestamp}
+    return client.post("/interactions", content=body, headers=headers)
+
+
+@pytest.mark.parametrize("cache_warm, warmed", [(True, 1), (False, 0)])
+def test_cache_warm(requests, cache_warm, warmed):
+    bot = make_bot(cache_warm=cache_warm)
+    payload = {
+        "id": "10",
+        "application_id": "1",
+        "type": 2,
+        "token": "token",
+        "version": 1,
+        "guild_id": "20",
+        "member": {"user": USER, "roles": [], "joined_at": "2015-04-26T06:26:56.936000+00:00"},
+        "data": {"id": "30", "name": "unknown", "type": 1},
+    }
+    with TestClient(bot) as client:
+        assert post_interaction(client, payload).status_code == 200
+    assert bot.cache.stats()["member"]["warmed"] == warmed
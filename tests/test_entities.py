@@ -0,0 +1,24 @@
+from dismake.entities import EntityCache
+
+USER = {"id": "2", "username": "Nelly", "discriminator": "1337"}
+
+
+def test_warm_skips_malformed_ids():
+    cache = EntityCache(None)  # type: ignore
+    cache.warm(
+        {
+            "guild_id": "1",
+            "member": {"user": {"username": "no id"}, "roles": []},
+            "data": {
+                "resolved": {
+                    "roles": {"not-an-id": {"name": "r"}, "3": {"id": "3", "name": "r"}},
+                    "users": {"x": USER, "2": USER},
+                    "members": {"x": {"roles": []}, "2": {"roles": []}},
+                }
+            },
+        }
+    )
+    cache.warm({"guild_id": "not-an-id", "member": {"user": USER}})
+    stats = cache.stats()
+    assert stats["role"]["warmed"] == 1
+    assert stats["member"]["warmed"] == 1
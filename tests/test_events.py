@@ -0,0 +1,46 @@
+import asyncio
+
+from dismake.events import EventBus
+
+
+def test_dispatch_after_close_and_start():
+    bus = EventBus()
+    calls = []
+
+    async def listener(value):
+        calls.append(value)
+
+    bus.add_listener("tick", listener)
+
+    async def main():
+        bus.dispatch("tick", 1)
+        await bus.close()
+        assert bus.dispatch("tick", 2) == 0
+        bus.start()
+        bus.dispatch("tick", 3)
+        await bus.close()
+
+    asyncio.run(main())
+    assert calls == [1, 3]
+
+
+def test_failing_filter_skips_listener():
+    bus = EventBus()
+    calls = []
+
+    async def listener(value):
+        calls.append(value)
+
+    def broken(value):
+        raise KeyError("user")
+
+    bus.add_listener("tick", listener, filter=broken)
+    bus.add_listener("tick", listener)
+
+    async def main():
+        assert bus.dispatch("tick", 1) == 1
+        await bus.close()
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert bus.stats()["on_tick"]["skipped"] == 1
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+
+import dismake.http
+from dismake.http import HttpClient
+from dismake.ratelimit import RateLimiter
+
+
+def test_interaction_callbacks_limited_per_interaction():
+    limiter = RateLimiter()
+    first = limiter.bucket_key("POST", "/interactions/1/token-a/callback")
+    second = limiter.bucket_key("POST", "/interactions/2/token-b/callback")
+    assert first != second
+    assert "token-a" not in first
+
+
+def test_unknown_bucket_serialized_until_first_response():
+    limiter = RateLimiter()
+    key = limiter.bucket_key("GET", "/channels/1/messages")
+    order = []
+
+    async def request(name):
+        unknown = await limiter.acquire(key)
+        order.append(f"{name} sent")
+        await asyncio.sleep(0.01)
+        await limiter.update("GET", "/channels/1/messages", {})
+        order.append(f"{name} answered")
+        if unknown:
+            limiter.release(key)
+
+    async def main():
+        await asyncio.gather(request("first"), request("second"), request("third"))
+
+    asyncio.run(main())
+    assert order[:2] == ["first sent", "first answered"]
+    # Once the bucket is known, the others are not held for the response.
+    assert order[2:4] == ["second sent", "third sent"]
+
+
+def test_server_errors_only_retried_for_idempotent_methods(monkeypatch):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.method)
+        return httpx.Response(502)
+
+    monkeypatch.setattr(
+        dismake.http, "AsyncHTTPTransport", lambda **_: httpx.MockTransport(handler)
+    )
+
+    async def main():
+        http = HttpClient(token="t", client_id=1, max_retries=1)
+        await http.request("POST", "/channels/1/messages", json={"content": "hi"})
+        await http.request("GET", "/channels/1/messages")
+        await http.close()
+
+    asyncio.run(main())
+    assert sent == ["POST", "GET", "GET"]